@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+压缩包导入基准测试
+同一批标签页分别以目录、.zip、.tar.gz 形式导入，对比耗时与峰值内存，并确认结果一致
+
+用法: python benchmarks/bench_archives.py [文件数] [每页标签数]
+"""
+
+import os
+import resource
+import sys
+import tarfile
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic import write_tag_page  # noqa: E402
+from deerpipe.archives import iter_sources, extract_source_timed  # noqa: E402
+
+
+def run(path):
+    """在独立进程中执行，返回 (pairs, 耗时, 等待读取耗时, 峰值内存 MB)"""
+    start = time.perf_counter()
+    pairs = []
+    read = 0.0
+    for source in iter_sources([path]):
+        result, timings = extract_source_timed(source)
+        pairs.extend(result)
+        read += timings['read']
+    elapsed = time.perf_counter() - start
+    # Linux 上 ru_maxrss 单位为 KB
+    return pairs, elapsed, read, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    n_files = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    n_tags = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    with tempfile.TemporaryDirectory() as tmp:
+        pages = os.path.join(tmp, 'pages')
+        os.mkdir(pages)
+        for i in range(n_files):
+            write_tag_page(os.path.join(pages, f"page{i:04d}.html"), n_tags, seed=i)
+        names = sorted(os.listdir(pages))
+
+        zip_path = os.path.join(tmp, 'pages.zip')
+        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for name in names:
+                zf.write(os.path.join(pages, name), name)
+        tar_path = os.path.join(tmp, 'pages.tar.gz')
+        with tarfile.open(tar_path, 'w:gz') as tar:
+            for name in names:
+                tar.add(os.path.join(pages, name), name)
+
+        raw = sum(os.path.getsize(os.path.join(pages, name)) for name in names)
+        print(f"{n_files} 个文件 x {n_tags} 个标签, 原始 {raw / 1e6:.1f} MB, "
+              f"zip {os.path.getsize(zip_path) / 1e6:.1f} MB, tar.gz {os.path.getsize(tar_path) / 1e6:.1f} MB")
+
+        expected = None
+        for label, path in (('目录', pages), ('zip', zip_path), ('tar.gz', tar_path)):
+            # 每种形式使用新的进程，峰值内存互不影响
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as pool:
+                pairs, elapsed, read, rss = pool.submit(run, path).result()
+            if expected is None:
+                expected = pairs
+            assert pairs == expected, label
+            print(f"  {label:7s} {elapsed:.2f}s  等待读取 {read:.2f}s  {len(pairs)} 个标签  "
+                  f"峰值内存 {rss:.0f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+解析后端对照与基准测试
+1. 对照语料（tests/test_backends.py，pytest 中同样检查）：所有可用后端的结果必须与 stream 一致，
+   scan 不认识的写法必须返回 None
+2. 吞吐量：合成标签页上各后端的 MB/s
+
+用法: python benchmarks/bench_backends.py [标签数量]
+"""
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+
+from synthetic import make_tags  # noqa: E402
+from test_backends import CORPUS, check_corpus, tag_page  # noqa: E402
+from deerpipe.backends import available_backends, parse_tags, scan_tags, BACKEND_AUTO, BACKEND_STREAM  # noqa: E402
+
+
+def main():
+    n_tags = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    backends = available_backends() + [BACKEND_AUTO]
+    print(f"可用后端: {', '.join(backends)}")
+
+    failures = check_corpus(backends)
+    fallback = sorted(case for case, html in CORPUS.items() if scan_tags(html) is None)
+    print(f"对照语料 {len(CORPUS)} 例，scan 回退 {len(fallback)} 例: {', '.join(fallback)}")
+    for case, backend, detail in failures:
+        print(f"  不一致 [{backend}] {case}: {detail}")
+
+    html = tag_page(make_tags(n_tags))
+    size_mb = len(html.encode('utf-8')) / 1024 / 1024
+    expected = parse_tags(html, BACKEND_STREAM)
+    print(f"标签页: {n_tags} 个 <a>, {size_mb:.1f} MB")
+    for backend in backends:
+        start = time.perf_counter()
+        pairs = parse_tags(html, backend)
+        elapsed = time.perf_counter() - start
+        assert pairs == expected, backend
+        print(f"{backend:>8}: {elapsed:.3f}s  {size_mb / elapsed:.1f} MB/s")
+
+    # 一致性是这个脚本的主要目的，不一致时以非零状态退出
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多文件提取基准测试
+对比逐个解析与进程池并行解析一批标签页的耗时
+
+用法: python benchmarks/bench_batch.py [文件数] [每页标签数]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic import write_tag_page  # noqa: E402
+from deerpipe.batch import ImportJob, extract_file, EVENT_FILE, EVENT_FINISHED  # noqa: E402
+
+
+def run_sequential(paths):
+    return [extract_file(path) for path in paths]
+
+
+def run_parallel(paths, max_workers=None):
+    job = ImportJob(paths, max_workers=max_workers).start()
+    results = [None] * len(paths)
+    while True:
+        event = job.events.get()
+        if event[0] == EVENT_FINISHED:
+            break
+        if event[0] == EVENT_FILE:
+            results[event[1]] = event[3]
+    return results
+
+
+def main():
+    n_files = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    n_tags = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(n_files):
+            path = os.path.join(tmp, f"page{i}.html")
+            write_tag_page(path, n_tags, seed=i)
+            paths.append(path)
+        print(f"{n_files} 个文件 x {n_tags} 个标签, CPU 核心数 {os.cpu_count()}")
+
+        start = time.perf_counter()
+        expected = run_sequential(paths)
+        base = time.perf_counter() - start
+        print(f"  顺序解析: {base:.2f}s")
+
+        workers = 1
+        while workers <= (os.cpu_count() or 1):
+            start = time.perf_counter()
+            results = run_parallel(paths, workers)
+            elapsed = time.perf_counter() - start
+            assert results == expected
+            print(f"  进程池 x{workers}: {elapsed:.2f}s  加速比 {base / elapsed:.2f}")
+            workers *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+共现索引基准测试
+合成标签库与本子样本，测量构建耗时、索引大小和单次查询延迟
+
+用法: python benchmarks/bench_cooccur.py [标签数] [本子数]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from deerpipe.cooccur import CooccurrenceIndex, build_cooccurrence, write_index  # noqa: E402
+from deerpipe.library import TagLibrary  # noqa: E402
+
+
+def main():
+    n_tags = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    n_docs = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    rng = random.Random(0)
+    names = [f"tag {i}" for i in range(n_tags)]
+    library = TagLibrary.from_tags(f"{name} ({n_tags - i})" for i, name in enumerate(names))
+    # 标签流行度近似 Zipf 分布，每本 5~25 个标签
+    weights = [1 / (i + 1) for i in range(n_tags)]
+    documents = [rng.choices(names, weights, k=rng.randint(5, 25)) for _ in range(n_docs)]
+
+    start = time.perf_counter()
+    df, pairs, docs = build_cooccurrence(library, documents)
+    build = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'tags.txt.cooccur')
+        write_index(path, library, df, pairs, docs)
+        size_mb = os.path.getsize(path) / 1024 / 1024
+
+        start = time.perf_counter()
+        index = CooccurrenceIndex(path, library)
+        load = time.perf_counter() - start
+
+        combos = [rng.sample(range(n_tags), 3) for _ in range(100000)]
+        start = time.perf_counter()
+        dead = sum(index.is_dead(combo) for combo in combos)
+        lookup = (time.perf_counter() - start) / len(combos)
+        index.close()
+
+    print(f"{n_tags} 个标签, {docs} 个本子, {len(pairs)} 个标签对")
+    print(f"  构建: {build:.2f}s  索引: {size_mb:.1f} MB  打开: {load * 1000:.2f} ms")
+    print(f"  3 标签组合判断: {lookup * 1e6:.1f} µs/次  ({dead / len(combos):.1%} 判定为无结果)")
+
+
+if __name__ == '__main__':
+    main()
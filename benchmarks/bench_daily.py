@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+每日推荐基准测试
+1. 各采样方式下 batch() 为大量用户计算当天组合的吞吐量（用户 / 秒）
+2. 确定性：另起一个进程（不同的 PYTHONHASHSEED）重新加载标签库计算同一批用户，结果必须完全一致；
+   batch() 与逐个 indices() 一致；换日期后大部分用户的组合改变；
+   大批量抽样后采样表（Fenwick 树）与抽样前逐位相同
+
+用法: python benchmarks/bench_daily.py [用户数量] [标签数量]
+"""
+
+import hashlib
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic import write_tags_file  # noqa: E402
+from deerpipe.daily import DailyPicker  # noqa: E402
+from deerpipe.library import TagLibrary  # noqa: E402
+from deerpipe.sampling import SAMPLE_MODES  # noqa: E402
+
+DAY = '2026-10-18'
+CHECK_USERS = 20000
+
+
+def digest(path, mode, users, day=DAY):
+    """users 个用户当天组合的摘要"""
+    picker = DailyPicker(TagLibrary.load(path, use_cache=False), mode)
+    h = hashlib.sha256()
+    for indices in picker.batch(range(users), day):
+        h.update(repr(indices).encode('ascii'))
+    return h.hexdigest()
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    n_tags = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'tags.txt')
+        write_tags_file(path, n_tags)
+        library = TagLibrary.load(path, use_cache=False)
+        print(f"{n_tags} 个标签, {users} 个用户")
+
+        failures = []
+        for mode in SAMPLE_MODES:
+            start = time.perf_counter()
+            picker = DailyPicker(library, mode)
+            build = time.perf_counter() - start
+            table = picker.sampler.tree.tree.tobytes()
+            start = time.perf_counter()
+            for _ in picker.batch(range(users), DAY):
+                pass
+            elapsed = time.perf_counter() - start
+            print(f"{mode:>9}: 构建 {build * 1000:.0f} ms, {elapsed:.2f}s  "
+                  f"{users / elapsed:,.0f} 用户/秒  {elapsed / users * 1e6:.2f} µs/用户")
+            if picker.sampler.tree.tree.tobytes() != table:
+                failures.append(f"{mode}: 抽样后采样表被改变")
+
+        for mode in SAMPLE_MODES:
+            picker = DailyPicker(library, mode)
+            sample = range(0, CHECK_USERS, 97)
+            if list(picker.batch(sample, DAY)) != [picker.indices(user, DAY) for user in sample]:
+                failures.append(f"{mode}: batch() 与 indices() 不一致")
+            changed = sum(picker.indices(user, DAY) != picker.indices(user, '2026-10-19') for user in sample)
+            if changed < len(sample) * 0.9:
+                failures.append(f"{mode}: 换日期后只有 {changed}/{len(sample)} 个用户的组合改变")
+
+            local = digest(path, mode, CHECK_USERS)
+            env = dict(os.environ, PYTHONHASHSEED='12345')
+            code = (f"import sys; sys.path[:0] = [{ROOT!r}, {os.path.dirname(__file__)!r}]\n"
+                    f"from bench_daily import digest\n"
+                    f"print(digest({path!r}, {mode!r}, {CHECK_USERS}))")
+            remote = subprocess.run([sys.executable, '-c', code], env=env, check=True,
+                                    capture_output=True, text=True).stdout.strip()
+            if remote != local:
+                failures.append(f"{mode}: 子进程结果不同")
+        print(f"确定性检查 ({CHECK_USERS} 个用户, 子进程): {'通过' if not failures else '失败'}")
+        for failure in failures:
+            print(f"  {failure}")
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
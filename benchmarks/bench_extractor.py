@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+标签提取基准测试
+对比 BeautifulSoup 整树解析、流式解析器与 auto 后端（正则快速路径）的吞吐量和峰值内存（RSS）
+
+用法: python benchmarks/bench_extractor.py [标签数量]
+每种实现在独立子进程中运行，峰值 RSS 互不干扰
+"""
+
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic import write_tag_page  # noqa: E402
+
+
+def run_bs4(path):
+    from bs4 import BeautifulSoup
+
+    with open(path, 'r', encoding='utf-8') as f:
+        soup = BeautifulSoup(f.read(), 'html.parser')
+    tags = []
+    seen = set()
+    for a_tag in soup.find_all('a', href=True):
+        name_span = a_tag.find('span', class_='name')
+        count_span = a_tag.find('span', class_='count')
+        if name_span:
+            tag_text = name_span.get_text().strip()
+            if count_span:
+                full_tag = f"{tag_text} ({count_span.get_text().strip()})"
+            else:
+                full_tag = tag_text
+            if full_tag and full_tag not in seen:
+                seen.add(full_tag)
+                tags.append(full_tag)
+    return tags
+
+
+def run_stream(path):
+    from deerpipe.extractor import extract_tags
+
+    with open(path, 'r', encoding='utf-8') as f:
+        return extract_tags(f)
+
+
+def run_auto(path):
+    from deerpipe.backends import extract_pairs
+    from deerpipe.tagset import TagSet
+
+    with open(path, 'r', encoding='utf-8') as f:
+        return TagSet(extract_pairs(f)).tags()
+
+
+RUNNERS = {'bs4': run_bs4, 'stream': run_stream, 'auto': run_auto}
+
+
+def child(method, path):
+    start = time.perf_counter()
+    tags = RUNNERS[method](path)
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({'method': method, 'tags': len(tags), 'seconds': elapsed,
+                      'peak_rss_mb': peak_kb / 1024}))
+
+
+def main():
+    if len(sys.argv) >= 2 and sys.argv[1] == '--child':
+        child(sys.argv[2], sys.argv[3])
+        return
+
+    n_tags = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'tags.html')
+        write_tag_page(path, n_tags)
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        print(f"标签页: {n_tags} 个 <a>, {size_mb:.1f} MB")
+
+        for method in RUNNERS:
+            proc = subprocess.run([sys.executable, __file__, '--child', method, path],
+                                  capture_output=True, text=True)
+            if proc.returncode != 0:
+                print(f"{method:>8}: 跳过 ({proc.stderr.strip().splitlines()[-1]})")
+                continue
+            r = json.loads(proc.stdout)
+            print(f"{method:>8}: {r['seconds']:.3f}s  {size_mb / r['seconds']:.1f} MB/s  "
+                  f"峰值 RSS {r['peak_rss_mb']:.1f} MB  ({r['tags']} 个标签)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+冷启动导入时间基准测试
+用 -X importtime 在新进程中多次导入核心模块，取中位数，并检查没有加载 tkinter / bs4
+
+用法: python benchmarks/bench_import.py [重复次数]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 核心模块的导入时间预算（毫秒）
+BUDGET_MS = 10.0
+CORE_MODULES = ('deerpipe', 'deerpipe.library', 'deerpipe.sampling', 'deerpipe.generator',
+                'deerpipe.extractor')
+FORBIDDEN = ('tkinter', 'bs4')
+# 作为参照：一个空模块的导入时间反映了当前机器的文件系统开销
+BASELINE = 'json'
+
+
+def import_time_us(module):
+    """返回 (累计导入时间微秒, 是否加载了禁止的模块)"""
+    code = (f"import sys, {module}; "
+            f"print(any(m in sys.modules for m in {FORBIDDEN!r}))")
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          capture_output=True, text=True, cwd=ROOT, check=True)
+    cumulative = None
+    for line in proc.stderr.splitlines():
+        parts = [p.strip() for p in line.split('|')]
+        if len(parts) == 3 and parts[2] == module:
+            cumulative = int(parts[1])
+    return cumulative, proc.stdout.strip() == 'True'
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    baseline = statistics.median(import_time_us(BASELINE)[0] for _ in range(repeat)) / 1000
+    print(f"参照 import {BASELINE}: {baseline:.2f} ms")
+
+    failed = False
+    for module in CORE_MODULES:
+        samples = []
+        heavy = False
+        for _ in range(repeat):
+            us, loaded = import_time_us(module)
+            samples.append(us)
+            heavy = heavy or loaded
+        ms = statistics.median(samples) / 1000
+        status = 'OK' if ms < BUDGET_MS and not heavy else '超出预算'
+        if heavy:
+            status = '加载了 tkinter/bs4'
+        failed = failed or status != 'OK'
+        print(f"  {module:<22} {ms:6.2f} ms  ({ms / baseline:.2f}x {BASELINE})  {status}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+导入缓存基准测试
+同一批页面第一次导入（冷）、再次导入（热）、修改其中一页后导入，对比耗时并确认结果一致
+
+用法: python benchmarks/bench_importcache.py [文件数] [每页标签数]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic import write_tag_page  # noqa: E402
+from deerpipe.batch import ImportJob, EVENT_SOURCES, EVENT_FILE, EVENT_FINISHED  # noqa: E402
+from deerpipe.importcache import ImportCache  # noqa: E402
+
+
+def run(paths, cache):
+    job = ImportJob(paths, cache=cache).start()
+    results = []
+    cached = 0
+    while True:
+        event = job.events.get()
+        if event[0] == EVENT_SOURCES:
+            results = [None] * len(event[1])
+        elif event[0] == EVENT_FILE:
+            results[event[1]] = event[3]
+            cached += 'cache' in event[4]
+        elif event[0] == EVENT_FINISHED:
+            return results, cached
+
+
+def main():
+    n_files = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    n_tags = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(n_files):
+            path = os.path.join(tmp, f"page{i}.html")
+            write_tag_page(path, n_tags, seed=i)
+            paths.append(path)
+        cache = ImportCache(os.path.join(tmp, 'import_cache.sqlite'))
+        print(f"{n_files} 个文件 x {n_tags} 个标签")
+
+        expected = None
+        for label in ('冷', '热', '修改一页'):
+            if label == '修改一页':
+                write_tag_page(paths[0], n_tags, seed=n_files)
+                expected[0] = run(paths[:1], None)[0][0]
+            start = time.perf_counter()
+            results, cached = run(paths, cache)
+            elapsed = time.perf_counter() - start
+            if expected is None:
+                expected = results
+            assert results == expected, label
+            print(f"  {label:6s} {elapsed:.2f}s  缓存命中 {cached}/{n_files}")
+        print(f"  缓存 {len(cache)} 页, {cache.size_bytes / 1e6:.2f} MB")
+        cache.close()
+
+        # 容量上限：只保留最近访问的页面
+        small = ImportCache(':memory:', max_bytes=cache.size_bytes // 4)
+        run(paths, small)
+        assert small.size_bytes <= small.max_bytes
+        print(f"  上限 {small.max_bytes / 1e6:.2f} MB 时保留 {len(small)} 页")
+
+
+if __name__ == '__main__':
+    main()
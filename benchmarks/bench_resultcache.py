@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+搜索结果缓存基准测试（不访问外网）
+启动本地模拟搜索服务器，测量：未命中时经 HTTP 回源、命中缓存时的查询速度，
+以及容量受限时 LRU 淘汰和 TTL 过期的行为
+
+用法: python benchmarks/bench_resultcache.py [组合数]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from deerpipe.library import TagLibrary  # noqa: E402
+from deerpipe.resultcache import HTTPFetcher, ResultCache, query_key  # noqa: E402
+from mock_search_server import mock_hits, start_server  # noqa: E402
+
+SORT = 'popular-week'
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000000.0
+
+    def __call__(self):
+        return self.now
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    library = TagLibrary.load(os.path.join(ROOT, 'tags.txt'))
+    rng = random.Random(0)
+    combos = [[library.name(i) for i in rng.sample(range(len(library)), 3)] for _ in range(n)]
+
+    server, base_url = start_server()
+    fetcher = HTTPFetcher(base_url)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ResultCache(os.path.join(tmp, 'results.sqlite'))
+
+            start = time.perf_counter()
+            for names in combos:
+                hits = cache.lookup(names, SORT, fetcher)
+                assert hits == mock_hits('tag:' + ', '.join(names))
+            cold = time.perf_counter() - start
+
+            start = time.perf_counter()
+            empty = sum(cache.is_known_empty(names, SORT) for names in combos)
+            warm = time.perf_counter() - start
+            cache.close()
+
+        print(f"{n} 个组合, {empty} 个无结果")
+        print(f"  回源（本地 HTTP）: {n / cold:,.0f} 次/秒")
+        print(f"  命中缓存:          {n / warm:,.0f} 次/秒")
+
+        # LRU 淘汰：容量为 100，反复访问前 10 个键，它们应当一直保留
+        clock = FakeClock()
+        cache = ResultCache(max_entries=100, clock=clock)
+        hot = [query_key(names, SORT) for names in combos[:10]]
+        for i, names in enumerate(combos):
+            clock.now += 1
+            cache.put(query_key(names, SORT), 1)
+            for key in hot:
+                cache.get(key)
+        assert len(cache) == 100
+        assert all(cache.get(key) is not None for key in hot)
+
+        # TTL 过期
+        clock.now += cache.ttl + 1
+        assert cache.get(hot[0]) is None
+        print(f"  LRU 淘汰与 TTL 过期检查通过（容量 {cache.max_entries}）")
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
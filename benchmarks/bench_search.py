@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+标签搜索基准测试
+不同规模标签库的索引构建耗时，以及模拟逐字输入时每次查询的中位数 / 最大耗时；
+前缀结果与暴力扫描对照（同样按计数排序）；
+容错召回：有标签包含本来要输入的所有词时，拼错的查询必须有结果，且每个结果都包含这些词
+
+用法: python benchmarks/bench_search.py [标签数量 ...]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic import write_tags_file  # noqa: E402
+from deerpipe.library import TagLibrary  # noqa: E402
+from deerpipe.search import TagIndex  # noqa: E402
+from deerpipe.tagset import normalize_name  # noqa: E402
+
+QUERIES = ('big breasts', 'glasses', 'x-ray 12', 'catgirl maid', '中文',
+           'glsses', 'brests', 'kemonomini', 'zzz')
+# (拼错的查询, 本来要输入的查询)
+TYPOS = (('stockngs', 'stockings'), ('glases', 'glasses'), ('glsses', 'glasses'),
+         ('brests', 'breasts'), ('kemonomini', 'kemonomimi'), ('tentcles', 'tentacles'),
+         ('unifrom', 'uniform'), ('swimsiut', 'swimsuit'), ('big brests', 'big breasts'),
+         ('catgrl maid', 'catgirl maid'))
+
+
+def brute_prefix(index, query, limit):
+    key = normalize_name(query)
+    counts = index.counts
+    matches = [i for i, name in enumerate(index.keys) if name.startswith(key)]
+    return sorted(counts[i] for i in matches)[::-1][:limit]
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [240, 10000, 100000]
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            path = os.path.join(tmp, f"tags{n}.txt")
+            write_tags_file(path, n)
+            library = TagLibrary.load(path, use_cache=False)
+
+            start = time.perf_counter()
+            index = TagIndex(library)
+            build = time.perf_counter() - start
+
+            timings = []
+            for query in QUERIES:
+                # 逐字输入：每个前缀都查询一次
+                for end in range(1, len(query) + 1):
+                    partial = query[:end]
+                    start = time.perf_counter()
+                    results = index.search(partial)
+                    timings.append(time.perf_counter() - start)
+                    expected = brute_prefix(index, partial, len(results))
+                    got = [index.counts[i] for i in results[:len(expected)]]
+                    assert got == expected, partial
+
+            typo_timings = []
+            for typo, intended in TYPOS:
+                words = set(intended.split())
+                if not any(words <= set(key.split()) for key in index.keys):
+                    continue
+                start = time.perf_counter()
+                results = index.search(typo)
+                typo_timings.append(time.perf_counter() - start)
+                assert results, typo
+                for i in results:
+                    assert words <= set(index.keys[i].split()), (typo, index.keys[i])
+
+            print(f"{n:>8} 个标签: 构建 {build * 1000:.0f} ms, {len(index.postings)} 个三元组; "
+                  f"{len(timings)} 次查询 中位数 {statistics.median(timings) * 1000:.3f} ms, "
+                  f"最大 {max(timings) * 1000:.3f} ms; "
+                  f"容错召回 {len(typo_timings)} 个查询 最大 {max(typo_timings, default=0) * 1000:.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
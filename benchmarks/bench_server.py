@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP 服务模式压测（仅访问本机）
+在子进程中启动服务，用多个 keep-alive 连接并发请求，可选流水线深度，
+统计吞吐量与 p50 / p99 延迟
+
+用法: python benchmarks/bench_server.py [总请求数] [连接数] [流水线深度]
+"""
+
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+REQUEST = (b"GET /combo?k=3&sort=popular-week HTTP/1.1\r\n"
+           b"Host: localhost\r\n\r\n")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+async def read_response(reader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    length = 0
+    for line in head.split(b'\r\n'):
+        if line.lower().startswith(b'content-length:'):
+            length = int(line.split(b':', 1)[1])
+    body = await reader.readexactly(length)
+    assert head.startswith(b'HTTP/1.1 200'), head
+    return body
+
+
+async def client(port, n_requests, depth, latencies):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    sent = 0
+    while sent < n_requests:
+        batch = min(depth, n_requests - sent)
+        start = time.perf_counter()
+        writer.write(REQUEST * batch)
+        await writer.drain()
+        for _ in range(batch):
+            await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+        sent += batch
+    writer.close()
+
+
+async def run_load(port, total, connections, depth):
+    latencies = []
+    per_client = total // connections
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, per_client, depth, latencies) for _ in range(connections)))
+    elapsed = time.perf_counter() - start
+    return len(latencies) / elapsed, sorted(latencies)
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+async def wait_ready(port):
+    for _ in range(100):
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.05)
+    raise RuntimeError('服务未能启动')
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    connections = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    depth = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+
+    port = free_port()
+    server = subprocess.Popen([sys.executable, '-m', 'deerpipe.server', '--port', str(port),
+                               '--tags-file', os.path.join(ROOT, 'tags.txt')],
+                              cwd=ROOT, stdout=subprocess.DEVNULL)
+    try:
+        asyncio.run(wait_ready(port))
+        rps, latencies = asyncio.run(run_load(port, total, connections, depth))
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"{len(latencies)} 个请求, {connections} 个连接, 流水线深度 {depth}")
+    print(f"  吞吐量: {rps:,.0f} 请求/秒")
+    print(f"  延迟: p50 {percentile(latencies, 0.50) * 1000:.2f} ms  "
+          f"p99 {percentile(latencies, 0.99) * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+虚拟结果列表基准测试
+对比旧实现（整体 join 后一次写入控件）需要处理的文本量，
+测量 TagView 取可见行、单块过滤的耗时（决定界面每次 after 回调的最长阻塞时间）
+
+用法: python benchmarks/bench_tagview.py [标签数]
+"""
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic import make_tags  # noqa: E402
+from deerpipe.tagview import TagView, FILTER_CHUNK  # noqa: E402
+
+VISIBLE_ROWS = 40
+QUERIES = ('big', 'big breasts', 'girl 9', '中文', 'no-such-tag')
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    tags = [f"{name} ({count})" for name, count in make_tags(n)]
+    print(f"{n} 个标签, 每块过滤 {FILTER_CHUNK} 个")
+
+    start = time.perf_counter()
+    joined = ', '.join(tags)
+    print(f"  旧实现 join: {(time.perf_counter() - start) * 1000:8.1f} ms, "
+          f"需一次写入控件 {len(joined) / 1e6:.1f}M 字符")
+    del joined
+
+    view = TagView(tags)
+    start = time.perf_counter()
+    for top in range(0, n, max(1, n // 1000)):
+        view.rows(top, top + VISIBLE_ROWS)
+    per_render = (time.perf_counter() - start) / len(range(0, n, max(1, n // 1000)))
+    print(f"  取可见行 ({VISIBLE_ROWS} 行): {per_render * 1e6:8.1f} µs/次")
+
+    previous = ''
+    for query in QUERIES:
+        view.set_query(query)
+        refined = view.source is not None
+        steps, worst = 0, 0.0
+        start = time.perf_counter()
+        while True:
+            step_start = time.perf_counter()
+            done = view.step()
+            worst = max(worst, time.perf_counter() - step_start)
+            steps += 1
+            if done:
+                break
+        total = time.perf_counter() - start
+        mode = f"(在 '{previous}' 的结果中)" if refined else ""
+        print(f"  过滤 {query!r:<16} 匹配 {len(view):>8}  总计 {total * 1000:8.1f} ms  "
+              f"{steps:>3} 块, 最长一块 {worst * 1000:6.1f} ms {mode}")
+        previous = query
+
+
+if __name__ == '__main__':
+    main()
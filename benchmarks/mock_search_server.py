@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地模拟搜索服务器
+按查询的标签集合确定性地返回结果数（约三分之一为无结果），
+用于离线测试结果缓存和抓取后端
+
+用法: python benchmarks/mock_search_server.py [端口]
+"""
+
+import hashlib
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+def mock_hits(query):
+    """查询对应的结果数：与标签顺序无关"""
+    tags = sorted(t.strip().casefold() for t in query.split(':', 1)[-1].split(','))
+    digest = hashlib.blake2b('|'.join(tags).encode('utf-8'), digest_size=4).digest()
+    value = int.from_bytes(digest, 'little')
+    return 0 if value % 3 == 0 else value % 5000
+
+
+class MockSearchHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        params = parse_qs(urlsplit(self.path).query)
+        hits = mock_hits(params.get('q', [''])[0])
+        if hits:
+            body = f'<html><body><h1>{hits:,} results</h1></body></html>'
+        else:
+            body = '<html><body><h2>No results found</h2></body></html>'
+        data = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port=0):
+    """在后台线程启动服务器，返回 (server, 搜索地址)"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), MockSearchHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/search/"
+
+
+if __name__ == '__main__':
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    server = ThreadingHTTPServer(('127.0.0.1', port), MockSearchHandler)
+    print(f"模拟搜索服务器: http://127.0.0.1:{port}/search/")
+    server.serve_forever()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试套件
+在 240 / 1万 / 10万 / 100万 个标签的合成数据上测量各阶段的耗时与峰值内存，
+结果保存为 JSON，可与之前的结果对比。不需要图形界面。
+
+用法:
+    python benchmarks/run_suite.py                          # 全部规模
+    python benchmarks/run_suite.py --sizes 240 10000        # 指定规模
+    python benchmarks/run_suite.py -o new.json --compare old.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic import SIZES, make_tags, write_tag_page, write_tags_file  # noqa: E402
+from deerpipe.extractor import extract_tags  # noqa: E402
+from deerpipe.generator import build_url  # noqa: E402
+from deerpipe.library import TagLibrary, CACHE_SUFFIX  # noqa: E402
+from deerpipe.sampling import TagSampler, SAMPLE_UNIFORM, SAMPLE_WEIGHTED  # noqa: E402
+from deerpipe.schedule import ShuffleScheduler, ComboHistory  # noqa: E402
+from deerpipe.tagfile import merge_tags, write_tags  # noqa: E402
+
+BASE_URL = 'https://nhentai.net/search/'
+SORT = 'popular-week'
+DRAWS = 20000
+
+
+# ---------- 旧实现（用于对照） ----------
+
+def legacy_load(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    return [tag.strip() for tag in content.split(',') if tag.strip()]
+
+
+def legacy_extract_tag_name(tag_with_count):
+    if '(' in tag_with_count:
+        return tag_with_count.split('(')[0].strip()
+    return tag_with_count.strip()
+
+
+def legacy_url(selected):
+    clean = [legacy_extract_tag_name(tag) for tag in selected]
+    query = 'tag:' + ', '.join(tag.replace(' ', '+') for tag in clean)
+    encoded = query.replace(' ', '+').replace(',', '%2C').replace(':', '%3A')
+    return f"{BASE_URL}?q={encoded}&sort={SORT}"
+
+
+# ---------- 各阶段 ----------
+
+def stages(tags_path, html_path):
+    """返回 [(阶段名, 准备函数, 被测函数, 操作数)]；准备函数的开销不计入结果"""
+    def remove_cache():
+        try:
+            os.remove(tags_path + CACHE_SUFFIX)
+        except OSError:
+            pass
+
+    def with_library():
+        return TagLibrary.load(tags_path)
+
+    def with_legacy_tags():
+        return legacy_load(tags_path)
+
+    def sample_legacy(tags):
+        rng = random.Random(0)
+        for _ in range(DRAWS):
+            [legacy_extract_tag_name(t) for t in rng.sample(tags, 3)]
+
+    def with_sampler(mode):
+        return lambda: TagSampler.for_library(TagLibrary.load(tags_path), mode, seed=0)
+
+    def sample_draws(sampler):
+        for _ in range(DRAWS):
+            sampler.sample(3)
+
+    def with_scheduler():
+        library = TagLibrary.load(tags_path)
+        for path in (tags_path + '.bag', tags_path + '.history'):
+            if os.path.exists(path):
+                os.remove(path)
+        return (library, ShuffleScheduler(tags_path + '.bag', library, seed=0),
+                ComboHistory(tags_path + '.history'))
+
+    def sample_no_repeat(state):
+        library, scheduler, history = state
+        name = library.name
+        for _ in range(DRAWS):
+            names = [name(i) for i in scheduler.sample(3)]
+            if not history.contains(names):
+                history.add(names)
+        scheduler.close()
+        history.close()
+
+    def url_legacy(tags):
+        rng = random.Random(0)
+        for _ in range(DRAWS):
+            legacy_url(rng.sample(tags, 3))
+
+    def url_cached(library):
+        rng = random.Random(0)
+        n = len(library)
+        for _ in range(DRAWS):
+            build_url(library, rng.sample(range(n), 3), BASE_URL, SORT)
+
+    def extract(_):
+        with open(html_path, 'r', encoding='utf-8') as f:
+            extract_tags(f)
+
+    save_path = tags_path + '.save'
+
+    def with_copy():
+        # 合并一批新提取结果（约 10%，部分与已有标签同名）
+        shutil.copyfile(tags_path, save_path)
+        return make_tags(max(1, len(legacy_load(tags_path)) // 10), seed=1)
+
+    def save_legacy(tags):
+        with open(save_path, 'w', encoding='utf-8') as f:
+            f.write(', '.join(tags))
+
+    return [
+        ('load.legacy_split', None, lambda _: legacy_load(tags_path), 1),
+        ('load.compile', remove_cache, lambda _: TagLibrary.load(tags_path), 1),
+        ('load.cached', with_library, lambda _: TagLibrary.load(tags_path), 1),
+        ('extract.stream', None, extract, 1),
+        ('save.legacy_join', with_legacy_tags, save_legacy, 1),
+        ('save.atomic_stream', with_legacy_tags, lambda tags: write_tags(save_path, tags), 1),
+        ('save.merge', with_copy, lambda pairs: merge_tags(save_path, pairs), 1),
+        ('sample.legacy_random_sample', with_legacy_tags, sample_legacy, DRAWS),
+        ('sample.build_weighted', with_library,
+         lambda library: TagSampler.for_library(library, SAMPLE_WEIGHTED), 1),
+        ('sample.uniform', with_sampler(SAMPLE_UNIFORM), sample_draws, DRAWS),
+        ('sample.weighted', with_sampler(SAMPLE_WEIGHTED), sample_draws, DRAWS),
+        ('sample.shuffle_bag_history', with_scheduler, sample_no_repeat, DRAWS),
+        ('url.legacy_replace', with_legacy_tags, url_legacy, DRAWS),
+        ('url.cached_fragments', with_library, url_cached, DRAWS),
+    ]
+
+
+def measure(setup, func):
+    """分别测量耗时（不开启 tracemalloc）与峰值内存"""
+    arg = setup() if setup else None
+    gc.collect()
+    start = time.perf_counter()
+    func(arg)
+    seconds = time.perf_counter() - start
+
+    arg = setup() if setup else None
+    gc.collect()
+    tracemalloc.start()
+    func(arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def run(sizes, skip_extract_above):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            tags_path = os.path.join(tmp, f'tags_{size}.txt')
+            html_path = os.path.join(tmp, f'page_{size}.html')
+            write_tags_file(tags_path, size)
+            write_tag_page(html_path, size)
+            print(f"== {size} 个标签 (tags.txt {os.path.getsize(tags_path) / 1e6:.1f} MB, "
+                  f"HTML {os.path.getsize(html_path) / 1e6:.1f} MB)")
+            for name, setup, func, ops in stages(tags_path, html_path):
+                if name.startswith('extract.') and size > skip_extract_above:
+                    continue
+                seconds, peak = measure(setup, func)
+                results.append({'size': size, 'stage': name, 'seconds': seconds,
+                                'ops': ops, 'peak_bytes': peak})
+                per_op = f"{seconds / ops * 1e6:9.2f} µs/次" if ops > 1 else f"{seconds * 1000:9.1f} ms"
+                print(f"  {name:<30} {per_op}   峰值 {peak / 1e6:8.2f} MB")
+    return results
+
+
+def compare(results, baseline_path):
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {(r['size'], r['stage']): r for r in json.load(f)['results']}
+    print(f"== 与 {baseline_path} 对比（>1 表示变慢）")
+    for r in results:
+        old = baseline.get((r['size'], r['stage']))
+        if old and old['seconds'] > 0:
+            ratio = r['seconds'] / old['seconds']
+            flag = '  ⚠' if ratio > 1.2 else ''
+            print(f"  {r['size']:>8} {r['stage']:<30} {ratio:6.2f}x{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='TodayDeerPipe 基准测试套件')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES))
+    parser.add_argument('--skip-extract-above', type=int, default=max(SIZES),
+                        help='超过该规模时跳过 HTML 提取阶段')
+    parser.add_argument('-o', '--output', default='bench_results.json')
+    parser.add_argument('--compare', default=None, help='之前保存的结果 JSON')
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.skip_extract_above)
+    report = {
+        'meta': {'python': sys.version.split()[0], 'platform': platform.platform(),
+                 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')},
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已保存到 {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+基准测试用的合成数据
+生成与真实数据结构一致的 tags.txt 和标签索引页 HTML：
+<a href="/tag/..."><span class="name">…</span><span class="count">…</span></a>
+"""
+
+import random
+
+WORDS = ('big', 'breasts', 'sole', 'female', 'male', 'group', 'full', 'color', 'glasses',
+         'stockings', 'uniform', 'school', 'dark', 'skin', 'multi', 'work', 'series', 'tail',
+         'twin', 'hair', 'long', 'short', 'maid', 'nurse', 'bunny', 'girl', 'boy', 'elf',
+         'demon', 'angel', 'x-ray', 'kemonomimi', 'tentacles', 'catgirl', 'swimsuit', 'yukata')
+UNICODE_WORDS = ('中文', '日本語', 'café', 'über')
+
+SIZES = (240, 10000, 100000, 1000000)
+
+
+def tag_name(i, rng):
+    """确定性地为第 i 个标签生成一个唯一名称"""
+    words = [rng.choice(WORDS) for _ in range(rng.randint(1, 3))]
+    if rng.random() < 0.02:
+        words.append(rng.choice(UNICODE_WORDS))
+    return f"{' '.join(words)} {i}"
+
+
+def tag_count(rank, rng):
+    """按排名近似 Zipf 分布的计数文本，例如 203K"""
+    value = int(250000 / (rank + 1) ** 0.8 * rng.uniform(0.8, 1.2)) + 1
+    if value >= 1000:
+        return f"{round(value / 1000)}K"
+    return str(value)
+
+
+def make_tags(n, seed=0):
+    """返回 [(name, count文本)]"""
+    rng = random.Random(seed)
+    return [(tag_name(i, rng), tag_count(i, rng)) for i in range(n)]
+
+
+def write_tags_file(path, n, seed=0):
+    """写出 tags.txt 格式的文件"""
+    with open(path, 'w', encoding='utf-8') as f:
+        first = True
+        for name, count in make_tags(n, seed):
+            if not first:
+                f.write(', ')
+            f.write(f"{name} ({count})")
+            first = False
+
+
+def write_tag_page(path, n, seed=0):
+    """写出标签索引页 HTML"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<html><body><div class="container" id="tag-container">\n')
+        for i, (name, count) in enumerate(make_tags(n, seed)):
+            f.write(f'<a href="/tag/tag-{i}/" class="tag tag-{i} ">'
+                    f'<span class="name">{name}</span>'
+                    f'<span class="count">{count}</span></a>\n')
+        f.write('</div></body></html>\n')
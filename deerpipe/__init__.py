@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+TodayDeerPipe 核心包
+标签提取、加载、采样与 URL 生成等不依赖 GUI 的逻辑
+
+导入本包不会加载 tkinter / bs4；常用对象按需从子模块加载:
+    from deerpipe import generate_batch, TagLibrary
+"""
+
+__version__ = "0.1.0"
+
+# 公开名称 -> 所在子模块，首次访问时才导入（PEP 562）
+_LAZY = {
+    'TagLibrary': 'library',
+    'TagSampler': 'sampling',
+    'TagSet': 'tagset',
+    'TagConstraints': 'constraints',
+    'TagIndex': 'search',
+    'DailyPicker': 'daily',
+    'ComboGenerator': 'generator',
+    'generate_batch': 'generator',
+    'build_url': 'generator',
+    'extract_tags': 'extractor',
+    'iter_tag_pairs': 'extractor',
+    'parse_tags': 'backends',
+}
+
+__all__ = ['__version__', *_LAZY]
+
+
+def __getattr__(name):
+    module_name = _LAZY.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(__all__)
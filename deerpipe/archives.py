@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+从目录与压缩包直接导入（不解压到磁盘）
+支持 .html / .htm、单个 .gz、.zip 以及 .tar / .tar.gz / .tgz / .tar.bz2 / .tar.xz
+
+工作项（source）为文件路径，或 zip 成员 (zip 路径, 成员名)：
+zip 可以随机访问，每个成员单独作为一个工作项分发到进程池；
+tar 只能顺序读取，整个包作为一个工作项按流式模式（r|*）逐个成员读取。
+解压在后台线程中进行，通过有界队列交给解析器（zlib / bz2 / lzma 解压时释放 GIL）。
+auto 解析会把一个文档整体读入后再扫描，文档超过 ARCHIVE_SCAN_LIMIT 个字符时改为流式解析，
+因此内存占用约为 depth × chunk_size 加上单个文档（最多 ARCHIVE_SCAN_LIMIT 个字符），与压缩包大小无关
+"""
+
+import gzip
+import os
+import queue
+import tarfile
+import threading
+import time
+import zipfile
+
+from .backends import extract_pairs, BACKEND_AUTO
+from .extractor import CHUNK_SIZE
+
+HTML_SUFFIXES = ('.html', '.htm')
+TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+PIPELINE_DEPTH = 4
+# 压缩包中的文档超过该字符数时流式解析（标签索引页通常只有几 MB）
+ARCHIVE_SCAN_LIMIT = 4 * 1024 * 1024
+
+_END_DOC = object()   # 一个文档结束
+_END = object()       # 全部结束
+
+
+def is_html_name(name):
+    return name.lower().endswith(HTML_SUFFIXES)
+
+
+def is_importable(path):
+    """目录遍历时会导入的文件"""
+    lower = path.lower()
+    return lower.endswith(HTML_SUFFIXES + TAR_SUFFIXES + ('.zip', '.gz'))
+
+
+def iter_sources(paths):
+    """把文件、目录与 zip 展开为工作项，目录按名称排序递归遍历"""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                yield from iter_sources(os.path.join(root, name)
+                                        for name in sorted(files) if is_importable(name))
+        elif path.lower().endswith('.zip'):
+            # 只读取中央目录，不解压；无法读取时整个包作为一个工作项，由工作进程报告错误
+            try:
+                with zipfile.ZipFile(path) as zf:
+                    members = [info.filename for info in zf.infolist()
+                               if not info.is_dir() and is_html_name(info.filename)]
+            except (OSError, zipfile.BadZipFile):
+                yield path
+                continue
+            for member in members:
+                yield (path, member)
+        else:
+            yield path
+
+
+def source_label(source):
+    """工作项的显示名称，zip 成员为 "包名!成员名" """
+    if isinstance(source, tuple):
+        return f"{source[0]}!{source[1]}"
+    return source
+
+
+def iter_streams(source):
+    """依次产出工作项中每个 HTML 文档的二进制流（需在下一次迭代前读完）"""
+    if isinstance(source, tuple):
+        path, member = source
+        with zipfile.ZipFile(path) as zf, zf.open(member) as f:
+            yield f
+        return
+
+    lower = source.lower()
+    if lower.endswith('.zip'):
+        with zipfile.ZipFile(source) as zf:
+            for info in zf.infolist():
+                if not info.is_dir() and is_html_name(info.filename):
+                    with zf.open(info) as f:
+                        yield f
+    elif lower.endswith(TAR_SUFFIXES):
+        with tarfile.open(source, 'r|*') as tar:
+            for info in tar:
+                if info.isfile() and is_html_name(info.name):
+                    f = tar.extractfile(info)
+                    if f is not None:
+                        yield f
+    elif lower.endswith('.gz'):
+        with gzip.open(source, 'rb') as f:
+            yield f
+    else:
+        with open(source, 'rb') as f:
+            yield f
+
+
+def _read_ahead(source, chunk_size, out, stop):
+    """后台线程：读取并解压，把块放入有界队列；文档之间放入 _END_DOC"""
+    def put(item):
+        while not stop.is_set():
+            try:
+                out.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    try:
+        for stream in iter_streams(source):
+            read = stream.read
+            while True:
+                chunk = read(chunk_size)
+                if not chunk:
+                    break
+                if not put(chunk):
+                    return
+            if not put(_END_DOC):
+                return
+        put(_END)
+    except BaseException as e:
+        put(e)
+
+
+def pipelined_documents(source, chunk_size=CHUNK_SIZE, depth=PIPELINE_DEPTH, waited=None):
+    """
+    产出每个文档的二进制块迭代器，解压与调用方的解析并行进行
+    每个文档的迭代器须在取下一个之前读完；waited 为列表时累加等待读取的秒数
+    """
+    items = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    thread = threading.Thread(target=_read_ahead, args=(source, chunk_size, items, stop),
+                              daemon=True)
+    thread.start()
+
+    def get():
+        t = time.perf_counter()
+        item = items.get()
+        if waited is not None:
+            waited[0] += time.perf_counter() - t
+        if isinstance(item, BaseException):
+            raise item
+        return item
+
+    def document(item):
+        while item is not _END_DOC:
+            yield item
+            item = get()
+
+    try:
+        while True:
+            item = get()
+            if item is _END:
+                return
+            yield document(item)
+    finally:
+        stop.set()
+        thread.join()
+
+
+def extract_source(source):
+    """在工作进程中解析一个工作项，返回 (name, count) 列表"""
+    return extract_source_timed(source)[0]
+
+
+def extract_source_timed(source, chunk_size=CHUNK_SIZE, depth=PIPELINE_DEPTH):
+    """
+    解析一个工作项（可能包含多个文档），返回 (pairs, {'read': 秒, 'parse': 秒})
+    read 为解析器等待数据的时间，与解析重叠的解压时间不计入
+    """
+    waited = [0.0]
+    start = time.perf_counter()
+    pairs = []
+    for chunks in pipelined_documents(source, chunk_size, depth, waited):
+        pairs.extend(extract_pairs(chunks, BACKEND_AUTO, chunk_size, ARCHIVE_SCAN_LIMIT))
+    total = time.perf_counter() - start
+    return pairs, {'read': waited[0], 'parse': total - waited[0]}
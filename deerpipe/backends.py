@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+可替换的标签页解析后端
+    scan   预编译正则扫描固定的标签页布局
+           <a href…><span class="name">…</span><span class="count">…</span></a>，
+           标记不符合该布局时返回 None，由调用方回退
+    stream 标准库 html.parser 流式解析（extractor.TagStreamParser），语义的参照实现
+    lxml   lxml.html 整树解析（需安装 lxml）
+    bs4    BeautifulSoup + html.parser（需安装 beautifulsoup4），原 GUI 的实现
+auto 先尝试 scan，不匹配时回退到 stream；lxml / bs4 只在显式指定时使用。
+所有后端返回相同的 (name, count) 列表，对照见 benchmarks/bench_backends.py
+"""
+
+import importlib.util
+import re
+from html import unescape
+from itertools import chain
+
+from .extractor import iter_chunks, iter_tag_pairs, CHUNK_SIZE
+
+BACKEND_AUTO = 'auto'
+BACKEND_SCAN = 'scan'
+BACKEND_STREAM = 'stream'
+BACKEND_LXML = 'lxml'
+BACKEND_BS4 = 'bs4'
+BACKENDS = (BACKEND_SCAN, BACKEND_STREAM, BACKEND_LXML, BACKEND_BS4)
+
+# 超过该字符数的文档在 auto 模式下直接流式解析，不整体读入内存
+SCAN_LIMIT = 32 * 1024 * 1024
+
+_OPTIONAL_MODULES = {BACKEND_LXML: 'lxml', BACKEND_BS4: 'bs4'}
+
+# ---------- scan ----------
+
+# html.parser 把注释与 script / style 的内容当作非标记处理，扫描前先去掉
+_IGNORED_RE = re.compile(r'<!--.*?-->|<(script|style)\b.*?</\1\s*>', re.S | re.I)
+_UNCLOSED_RE = re.compile(r'<!--|<script\b|<style\b', re.I)
+
+_ANCHOR_RE = re.compile(
+    r'<a(\s[^<>]*)?>\s*'
+    r'<span class="name">([^<]*)</span>\s*'
+    r'(?:<span class="count">([^<]*)</span>\s*)?'
+    r'</a>')
+_ATTR_RE = re.compile(r'''([^\s"'=<>/]+)(?:\s*=\s*(?:"[^"]*"|'[^']*'|[^\s"'>]+))?''')
+_HREF_RE = re.compile(r'''\bhref\b''', re.I)
+_ANCHOR_TOKEN_RE = re.compile(r'<(/?)a[\s>]', re.I)
+# 偏保守的计数：任何可能被 html.parser 视为 name / count span 的片段都会计入
+_NAME_SPAN_RE = re.compile(r'<span\b[^<]*?\bname\b', re.I)
+_COUNT_SPAN_RE = re.compile(r'<span\b[^<]*?\bcount\b', re.I)
+
+
+def _has_href(attrs):
+    """<a> 的属性串中是否有 href 属性"""
+    if not attrs:
+        return False
+    if attrs.startswith(' href='):
+        return True
+    if not _HREF_RE.search(attrs):
+        return False
+    return any(match.group(1).lower() == 'href' for match in _ATTR_RE.finditer(attrs))
+
+
+def scan_tags(text):
+    """
+    按固定布局扫描标签页，返回 (name, count) 列表
+    存在嵌套 <a>、span 内有其它标记、属性格式不同等任何不确定情况时返回 None
+    """
+    if _UNCLOSED_RE.search(text):
+        text = _IGNORED_RE.sub('', text)
+        if _UNCLOSED_RE.search(text):
+            return None
+
+    pairs = []
+    with_count = 0
+    starts = set()
+    for match in _ANCHOR_RE.finditer(text):
+        if not _has_href(match.group(1)):
+            return None
+        name, count = match.group(2), match.group(3)
+        if '&' in name:
+            name = unescape(name)
+        if count is not None:
+            with_count += 1
+            count = (unescape(count) if '&' in count else count).strip()
+        pairs.append((name.strip(), count))
+        starts.add(match.start())
+
+    # 每个识别出的 <a> 都必须位于所有 <a> 之外（html.parser 不会自动闭合 <a>）
+    depth = 0
+    for token in _ANCHOR_TOKEN_RE.finditer(text):
+        if token.group(1):
+            depth = max(depth - 1, 0)
+        else:
+            if token.start() in starts and depth:
+                return None
+            depth += 1
+
+    # 页面中所有 name / count span 都必须已被识别
+    if (len(_NAME_SPAN_RE.findall(text)) != len(pairs)
+            or len(_COUNT_SPAN_RE.findall(text)) != with_count):
+        return None
+    return pairs
+
+
+# ---------- stream / lxml / bs4 ----------
+
+def stream_tags(text):
+    return list(iter_tag_pairs(text))
+
+
+def lxml_tags(text):
+    from lxml import html as lxml_html
+
+    if not text.strip():
+        return []
+    pairs = []
+    for anchor in lxml_html.fromstring(text).iter('a'):
+        if anchor.get('href') is None:
+            continue
+        name = count = None
+        for span in anchor.iter('span'):
+            classes = (span.get('class') or '').split()
+            if name is None and 'name' in classes:
+                name = span.text_content()
+            if count is None and 'count' in classes:
+                count = span.text_content()
+        if name is not None:
+            pairs.append((name.strip(), count.strip() if count is not None else None))
+    return pairs
+
+
+def bs4_tags(text):
+    from bs4 import BeautifulSoup
+
+    pairs = []
+    for anchor in BeautifulSoup(text, 'html.parser').find_all('a', href=True):
+        name_span = anchor.find('span', class_='name')
+        if name_span:
+            count_span = anchor.find('span', class_='count')
+            count = count_span.get_text().strip() if count_span else None
+            pairs.append((name_span.get_text().strip(), count))
+    return pairs
+
+
+_PARSERS = {
+    BACKEND_SCAN: scan_tags,
+    BACKEND_STREAM: stream_tags,
+    BACKEND_LXML: lxml_tags,
+    BACKEND_BS4: bs4_tags,
+}
+
+
+def backend_available(name):
+    module = _OPTIONAL_MODULES.get(name)
+    if module is None:
+        return name in _PARSERS
+    return importlib.util.find_spec(module) is not None
+
+
+def available_backends():
+    return [name for name in BACKENDS if backend_available(name)]
+
+
+def parse_tags(text, backend=BACKEND_AUTO):
+    """用指定后端解析完整的 HTML 文本，返回 (name, count) 列表"""
+    if backend == BACKEND_AUTO:
+        pairs = scan_tags(text)
+        return pairs if pairs is not None else stream_tags(text)
+    try:
+        parser = _PARSERS[backend]
+    except KeyError:
+        raise ValueError(f"未知的解析后端: {backend}") from None
+    pairs = parser(text)
+    if pairs is None:
+        raise ValueError("标记不符合标签页布局，无法使用 scan 解析")
+    return pairs
+
+
+def extract_pairs(source, backend=BACKEND_AUTO, chunk_size=CHUNK_SIZE, limit=SCAN_LIMIT):
+    """
+    解析任意输入（与 extractor.iter_chunks 相同），返回 (name, count) 列表
+    auto 模式下文档超过 limit 个字符时改为流式解析，内存占用不随文档增长
+    """
+    if backend == BACKEND_STREAM:
+        return list(iter_tag_pairs(source, chunk_size))
+    chunks = iter_chunks(source, chunk_size)
+    parts = []
+    size = 0
+    for text in chunks:
+        parts.append(text)
+        size += len(text)
+        if backend == BACKEND_AUTO and size > limit:
+            return list(iter_tag_pairs(chain(parts, chunks)))
+    return parse_tags(''.join(parts), backend)
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+多文件并行提取
+解析是 CPU 密集型任务，受 GIL 限制，因此放到进程池中执行；
+结果通过线程安全的队列交回调用方（GUI 用 root.after 轮询）
+输入可以是文件、目录或压缩包，在后台线程中展开为工作项（见 archives.py）；
+提供导入缓存时，内容未变的页面直接使用缓存结果，不再提交到进程池
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from .archives import iter_sources, source_label, extract_source_timed
+from .backends import extract_pairs
+
+# 队列事件类型
+EVENT_SOURCES = 'sources'    # (EVENT_SOURCES, labels)，展开后的工作项，先于其它事件
+EVENT_FILE = 'file'          # (EVENT_FILE, index, path, pairs, timings)，缓存命中时 timings 为 {'cache': 秒}
+EVENT_ERROR = 'error'        # (EVENT_ERROR, index, path, message)
+EVENT_FINISHED = 'finished'  # (EVENT_FINISHED, cancelled)
+
+
+def extract_file(path):
+    """在工作进程中解析单个文件，返回 (name, count) 列表"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return extract_pairs(f)
+
+
+class ImportJob:
+    """
+    后台批量提取任务
+    start() 后在后台线程中展开目录与压缩包并调度进程池，事件依次放入 self.events；
+    worker 是可 pickle 的模块级函数，接收一个工作项（文件路径或 archives.iter_sources 产出的成员），
+    返回 (pairs, timings)：pairs 为 (name, count) 列表，timings 为 {阶段: 秒}；
+    也可以只返回 pairs 列表（如 extract_file），此时 timings 为空字典。
+    cache 为 ImportCache 或 None
+    """
+
+    def __init__(self, paths, max_workers=None, worker=extract_source_timed, cache=None):
+        self.paths = list(paths)
+        self.max_workers = max_workers
+        self.cache = cache
+        self.worker = worker
+        self.events = queue.Queue()
+        self._cancelled = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        """请求取消，已开始解析的文件会被丢弃"""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def _run(self):
+        # 进程池相关模块较重，只在真正开始批量提取时导入
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        pool = None
+        try:
+            # 无法读取的压缩包会作为单个工作项保留，由工作进程报告错误
+            sources = list(iter_sources(self.paths))
+            labels = [source_label(source) for source in sources]
+            self.events.put((EVENT_SOURCES, labels))
+            if not sources or self.cancelled:
+                return
+
+            futures = {}
+            digests = {}
+            for index, source in enumerate(sources):
+                if self.cancelled:
+                    return
+                if self.cache is not None:
+                    start = time.perf_counter()
+                    try:
+                        pairs, digests[index] = self.cache.lookup(source, labels[index])
+                    except OSError as e:
+                        self.events.put((EVENT_ERROR, index, labels[index], str(e)))
+                        continue
+                    except sqlite3.Error:
+                        # 导入缓存被锁定或已损坏：直接解析，结果不写回缓存
+                        pairs = None
+                    if pairs is not None:
+                        self.events.put((EVENT_FILE, index, labels[index], pairs,
+                                         {'cache': time.perf_counter() - start}))
+                        continue
+                if pool is None:
+                    # 第一个未命中的页面才创建进程池，全部命中时不启动工作进程
+                    max_workers = self.max_workers or min(len(sources), os.cpu_count() or 1)
+                    pool = ProcessPoolExecutor(max_workers=max_workers)
+                futures[pool.submit(self.worker, source)] = index
+
+            for future in as_completed(futures):
+                if self.cancelled:
+                    break
+                index = futures[future]
+                path = labels[index]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    self.events.put((EVENT_ERROR, index, path, str(e)))
+                    continue
+                pairs, timings = result if isinstance(result, tuple) else (result, {})
+                if index in digests:
+                    try:
+                        self.cache.store(digests[index], pairs)
+                    except sqlite3.Error:
+                        pass    # 缓存写入失败不影响本次导入
+                self.events.put((EVENT_FILE, index, path, pairs, timings))
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=not self.cancelled, cancel_futures=True)
+            self.events.put((EVENT_FINISHED, self.cancelled))
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+def drain(events_queue):
+    """非阻塞地取出队列中所有事件"""
+    events = []
+    while True:
+        try:
+            events.append(events_queue.get_nowait())
+        except queue.Empty:
+            return events
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+命令行入口：批量输出随机标签组合
+python -m deerpipe -n 1000 -k 3 --format jsonl
+python -m deerpipe --daily 12345 --date 2026-10-18
+"""
+
+import argparse
+import json
+import sys
+
+from .constraints import TagConstraints
+from .cooccur import CooccurrenceIndex
+from .daily import DailyPicker, as_day
+from .generator import (ComboGenerator, DEFAULT_TAGS_FILE, DEFAULT_BASE_URL,
+                        DEFAULT_TAG_COUNT, DEFAULT_SORT, SORT_OPTIONS, MAX_TAGS)
+from .library import TagLibrary
+from .resultcache import HTTPFetcher, ResultCache
+from .schedule import ShuffleScheduler, ComboHistory, DEFAULT_WINDOW, DEFAULT_REPEAT_DAYS
+from .shards import Shard, ShardedLibrary, DEFAULT_KIND, parse_shard_spec
+from .sampling import SAMPLE_MODES, SAMPLE_UNIFORM, DEFAULT_ALPHA
+
+
+def bounded_int(low, high=None):
+    """argparse 的 type：[low, high] 内的整数，否则由 parser.error 报错"""
+    def parse(text):
+        try:
+            value = int(text)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"不是整数: {text!r}")
+        if value < low or (high is not None and value > high):
+            bound = f"{low}..{high}" if high is not None else f">= {low}"
+            raise argparse.ArgumentTypeError(f"应为 {bound}，得到 {value}")
+        return value
+    return parse
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='deerpipe', description='今天鹿什么：批量生成随机标签组合')
+    parser.add_argument('-n', '--count', type=bounded_int(1), default=1, help='生成的组合数量')
+    parser.add_argument('-k', '--tags', type=bounded_int(1, MAX_TAGS), default=DEFAULT_TAG_COUNT,
+                        help=f'每个组合的标签数量（1..{MAX_TAGS}）')
+    parser.add_argument('--sort', default=DEFAULT_SORT, choices=SORT_OPTIONS, help='排序方式')
+    parser.add_argument('--seed', type=int, default=None, help='随机种子')
+    parser.add_argument('--mode', default=SAMPLE_UNIFORM, choices=SAMPLE_MODES, help='采样方式')
+    parser.add_argument('--alpha', type=float, default=DEFAULT_ALPHA, help='tempered 模式的指数')
+    parser.add_argument('--tags-file', default=DEFAULT_TAGS_FILE, help='标签文件')
+    parser.add_argument('--shard', action='append', default=[], metavar='KIND=FILE[:QUOTA]',
+                        help='额外的标签库分片，例如 artist=artists.txt:1（每个组合另取 QUOTA 个，'
+                             '查询前缀为 KIND:）；可多次指定')
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL, help='基础URL')
+    parser.add_argument('--cooccur', default=None, help='共现索引文件，用于跳过搜不到结果的组合')
+    parser.add_argument('--min-hits', type=int, default=1, help='共现索引估计命中数下限')
+    parser.add_argument('--result-cache', default=None, help='搜索结果缓存（SQLite），跳过已知无结果的组合')
+    parser.add_argument('--validate-url', default=None,
+                        help='用该搜索地址（可为本地模拟服务器）查询结果数，只输出有结果的组合')
+    parser.add_argument('--exclude', default='', help='排除的标签，逗号分隔')
+    parser.add_argument('--require', default='', help='每个组合都包含的标签，逗号分隔')
+    parser.add_argument('--group', action='append', default=[],
+                        help='互斥组（组内至多选一个），逗号分隔；可多次指定')
+    parser.add_argument('--bag', default=None,
+                        help='洗牌袋状态文件：按不重复的顺序取标签，跨次运行保持进度')
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW, help='同一标签两次出现之间至少间隔的抽取数')
+    parser.add_argument('--history', default=None, help='组合历史文件：最近 --repeat-days 天内的组合不重复')
+    parser.add_argument('--repeat-days', type=int, default=DEFAULT_REPEAT_DAYS, help='组合不重复的天数')
+    parser.add_argument('--format', default='url', choices=('url', 'jsonl'), help='输出格式')
+    parser.add_argument('--daily', action='append', default=[], metavar='USER',
+                        help='输出该用户当天的固定推荐（与 --seed / 约束无关）；可多次指定')
+    parser.add_argument('--date', default=None, help='--daily 使用的日期 YYYY-MM-DD，默认今天')
+    return parser
+
+
+class FetchFailed(Exception):
+    """--validate-url 查询结果数时网络出错"""
+
+
+def validated(generator, result_cache, fetcher, n, k, sort, max_attempts_per_combo=20):
+    """通过抓取后端确认结果数，跳过无结果的组合；网络错误时抛出 FetchFailed（不写入缓存）"""
+    library = generator.library
+    produced = 0
+    for attempt, combo in enumerate(generator.iter_combos(None, k, sort)):
+        if produced >= n or attempt >= n * max_attempts_per_combo:
+            return
+        names = [library.name(i) for i in combo.indices]
+        try:
+            hits = result_cache.lookup(names, sort, fetcher)
+        except OSError as e:
+            raise FetchFailed(f"查询结果数失败: {e}") from e
+        if hits > 0:
+            produced += 1
+            yield combo
+
+
+def print_daily(library, args):
+    """--daily：每个用户一行"""
+    try:
+        day = as_day(args.date)
+    except ValueError as e:
+        print(f"日期无效: {e}", file=sys.stderr)
+        return 1
+    picker = DailyPicker(library, args.mode, args.alpha, args.base_url)
+    for user in args.daily:
+        combo = picker.pick(user, day, args.tags, args.sort)
+        if args.format == 'url':
+            print(combo.url)
+        else:
+            print(json.dumps(picker.describe(combo, user, day), ensure_ascii=False))
+    return 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        extra = [parse_shard_spec(spec) for spec in args.shard]
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    if extra and (args.bag or args.cooccur):
+        print("--bag / --cooccur 暂不支持与 --shard 同时使用", file=sys.stderr)
+        return 1
+    try:
+        if extra:
+            library = ShardedLibrary.load([Shard(DEFAULT_KIND, args.tags_file, args.tags)] + extra)
+        else:
+            library = TagLibrary.load(args.tags_file)
+    except (OSError, ValueError) as e:
+        print(f"加载标签文件失败: {e}", file=sys.stderr)
+        return 1
+    if not len(library):
+        print("标签文件为空！", file=sys.stderr)
+        return 1
+
+    if args.daily:
+        return print_daily(library, args)
+
+    cooccur = None
+    if args.cooccur:
+        try:
+            cooccur = CooccurrenceIndex(args.cooccur, library)
+        except (OSError, ValueError) as e:
+            print(f"加载共现索引失败: {e}", file=sys.stderr)
+            return 1
+
+    result_cache = None
+    fetcher = None
+    if args.result_cache or args.validate_url:
+        result_cache = ResultCache(args.result_cache or ':memory:')
+    if args.validate_url:
+        fetcher = HTTPFetcher(args.validate_url)
+
+    scheduler = ShuffleScheduler(args.bag, library, args.window, args.seed) if args.bag else None
+    history = ComboHistory(args.history, args.repeat_days) if args.history else None
+
+    constraints = TagConstraints.from_text(args.exclude, args.require, ';'.join(args.group))
+    try:
+        generator = ComboGenerator(library, args.base_url, args.mode, args.alpha, args.seed,
+                                   cooccur, args.min_hits, result_cache, constraints,
+                                   scheduler, history)
+    except ValueError as e:
+        print(f"约束无效: {e}", file=sys.stderr)
+        return 1
+    missing = getattr(generator.sampler, 'missing', None)
+    if missing:
+        print(f"以下约束标签不在标签库中: {', '.join(missing)}", file=sys.stderr)
+    out = sys.stdout
+    if fetcher is None:
+        combos = generator.iter_combos(args.count, args.tags, args.sort)
+    else:
+        combos = validated(generator, result_cache, fetcher, args.count, args.tags, args.sort)
+    produced = 0
+    try:
+        if args.format == 'url':
+            for combo in combos:
+                out.write(combo.url + '\n')
+                produced += 1
+        else:
+            dumps = json.dumps
+            for combo in combos:
+                out.write(dumps(generator.describe(combo), ensure_ascii=False) + '\n')
+                produced += 1
+        out.flush()
+    except BrokenPipeError:
+        # 输出被 head 等命令提前关闭
+        sys.stderr.close()
+        return 0
+    except FetchFailed as e:
+        out.flush()
+        print(e, file=sys.stderr)
+        return 1
+    finally:
+        if scheduler is not None:
+            scheduler.close()
+        if history is not None:
+            history.close()
+    if produced < args.count:
+        reason = f"最近 {args.repeat_days} 天内的组合已用尽" if history is not None else "有结果的组合不足"
+        print(f"只生成了 {produced} / {args.count} 个组合（{reason}）", file=sys.stderr)
+        return 1
+    return 0
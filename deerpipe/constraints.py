@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+"""
+标签约束：排除、必选与“至多选一个”的互斥组
+约束按标签库编译一次：排除的标签在逐标签标记数组中置位，并从均匀抽样的候选数组 /
+加权抽样的 Fenwick 树中去掉，抽样时不需要拒绝；互斥组冲突按下标查字典判断
+（一个标签可以属于多个组，取到后它所在的组全部视为已用），
+每个候选 O(组数)，被拒绝的候选在本次抽取中不会再次抽到
+"""
+
+import random
+from array import array
+
+from .sampling import TagSampler, SAMPLE_UNIFORM, DEFAULT_ALPHA, tag_weights
+from .tagset import normalize_name
+
+# 均匀抽样时，连续拒绝超过 need * REJECTION_LIMIT 次后改为精确筛选
+REJECTION_LIMIT = 32
+# 互相重叠的组中不同的组合方式超过该数量时，容量改用贪心估计（下界）
+EXACT_PACKING_LIMIT = 24
+
+
+def parse_tag_list(text):
+    """把 "a, b, c" 形式的文本拆分为标签名列表"""
+    return [name.strip() for name in text.split(',') if name.strip()]
+
+
+def parse_groups(text):
+    """把 "a, b; c, d" 形式的文本拆分为互斥组（分号分隔组，逗号分隔标签）"""
+    groups = [parse_tag_list(part) for part in text.split(';')]
+    return [group for group in groups if len(group) > 1]
+
+
+def max_packing(group_sets):
+    """
+    两两没有公共组的最多标签数（每个元素为一个标签所属组的集合）
+    先按重叠关系拆分为连通块，块内元素不多时精确搜索，否则贪心
+    """
+    items = list(set(group_sets))
+    parent = {}
+
+    def find(group):
+        while parent.setdefault(group, group) != group:
+            parent[group] = group = parent[parent[group]]
+        return group
+
+    for groups in items:
+        first, *rest = groups
+        for group in rest:
+            parent[find(group)] = find(first)
+    components = {}
+    for groups in items:
+        components.setdefault(find(next(iter(groups))), []).append(groups)
+
+    total = 0
+    for component in components.values():
+        if len(component) == 1:
+            total += 1
+        elif len(component) > EXACT_PACKING_LIMIT:
+            used = set()
+            for groups in sorted(component, key=len):
+                if not used & groups:
+                    used |= groups
+                    total += 1
+        else:
+            total += _exact_packing(sorted(component, key=len))
+    return total
+
+
+def _exact_packing(items):
+    if not items:
+        return 0
+    first, rest = items[0], items[1:]
+    compatible = [groups for groups in rest if not groups & first]
+    if len(compatible) == len(rest):
+        # 与其余元素都不冲突，选上总不会更差
+        return 1 + _exact_packing(rest)
+    return max(_exact_packing(rest), 1 + _exact_packing(compatible))
+
+
+class TagConstraints:
+    """
+    与标签库无关的约束描述，名称按规范化后比较
+    exclude: 不会被抽到的标签；require: 每个组合都包含的标签；
+    groups: 每组中至多出现一个标签
+    """
+    __slots__ = ('exclude', 'require', 'groups')
+
+    def __init__(self, exclude=(), require=(), groups=()):
+        self.exclude = tuple(dict.fromkeys(normalize_name(name) for name in exclude))
+        self.require = tuple(dict.fromkeys(normalize_name(name) for name in require))
+        self.groups = tuple(tuple(dict.fromkeys(normalize_name(name) for name in group))
+                            for group in groups)
+
+    @classmethod
+    def from_text(cls, exclude='', require='', groups=''):
+        """由 GUI 输入框 / 命令行的文本构建"""
+        return cls(parse_tag_list(exclude), parse_tag_list(require), parse_groups(groups))
+
+    def __bool__(self):
+        return bool(self.exclude or self.require or self.groups)
+
+    def __eq__(self, other):
+        return (isinstance(other, TagConstraints)
+                and (self.exclude, self.require, self.groups)
+                == (other.exclude, other.require, other.groups))
+
+    def __hash__(self):
+        return hash((self.exclude, self.require, self.groups))
+
+    def names(self):
+        """约束中出现的所有规范化名称"""
+        names = set(self.exclude) | set(self.require)
+        for group in self.groups:
+            names.update(group)
+        return names
+
+
+class ConstraintPlan:
+    """
+    约束在某个标签库上的编译结果（下标为该标签库的下标，分片标签库为全局下标）
+    missing: 标签库中没有的约束标签；required: 必选标签的下标（同名只取第一个）；
+    blocked: 不参与抽样的标记数组；group_of: 下标 -> 所在的互斥组号；capacity: 一个组合最多的标签数
+    """
+
+    def __init__(self, library, constraints):
+        n = len(library)
+
+        wanted = constraints.names()
+        positions = {}
+        for index, name in enumerate(library.names()):
+            key = normalize_name(name)
+            if key in wanted:
+                positions.setdefault(key, []).append(index)
+        self.missing = sorted(name for name in wanted if name not in positions)
+
+        blocked = bytearray(n)   # 1 表示不参与抽样
+        for name in constraints.exclude:
+            for index in positions.get(name, ()):
+                blocked[index] = 1
+
+        self.required = []
+        for name in constraints.require:
+            found = positions.get(name)
+            if not found:
+                continue
+            index = found[0]
+            if blocked[index]:
+                raise ValueError(f"标签同时被设为必选和排除: {library.name(index)}")
+            self.required.append(index)
+            for index in found:
+                blocked[index] = 1
+
+        # 包含必选标签的互斥组：组内其它标签直接排除；
+        # 其余组按下标记录该标签所在的全部组号（组可以互相重叠）
+        required = set(self.required)
+        members_of = []
+        for group in constraints.groups:
+            members = [index for name in group for index in positions.get(name, ())]
+            chosen = [index for index in members if index in required]
+            if len(chosen) > 1:
+                names = ', '.join(library.name(index) for index in chosen)
+                raise ValueError(f"同一互斥组中有多个必选标签: {names}")
+            if chosen:
+                for index in members:
+                    blocked[index] = 1
+                members = ()
+            members_of.append(members)
+        group_of = {}
+        for group_id, members in enumerate(members_of):
+            for index in members:
+                if not blocked[index]:
+                    group_of[index] = group_of.get(index, ()) + (group_id,)
+        self.group_of = group_of
+
+        self.blocked = blocked
+        free = n - sum(blocked)
+        packing = max_packing(frozenset(groups) for groups in group_of.values())
+        self.capacity = len(self.required) + free - len(group_of) + packing
+
+    def acceptor(self):
+        """一次抽取用的 accept(index)：跳过不参与抽样的标签，每个互斥组至多接受一个"""
+        blocked = self.blocked
+        group_of = self.group_of
+        used = set()
+
+        def accept(index):
+            if blocked[index]:
+                return False
+            groups = group_of.get(index)
+            if groups is None:
+                return True
+            if not used.isdisjoint(groups):
+                return False
+            used.update(groups)
+            return True
+        return accept
+
+
+class ConstrainedSampler:
+    """
+    带约束的无放回抽样器，接口与 TagSampler 相同（sample / seed）
+    必选标签总在结果开头；剩余名额在排除后的候选中抽取
+    base 为其它支持 accept 的抽样器（如 ShuffleScheduler）时由它提供候选，排除的标签被跳过
+    """
+
+    def __init__(self, library, constraints, mode=SAMPLE_UNIFORM, alpha=DEFAULT_ALPHA, seed=None,
+                 base=None):
+        self.mode = mode
+        self.constraints = constraints
+        n = len(library)
+        self.plan = plan = ConstraintPlan(library, constraints)
+        self.missing = plan.missing
+        self.required = plan.required
+        self.group_of = plan.group_of
+        self.blocked = blocked = plan.blocked
+        self.capacity = plan.capacity
+
+        self.base = base
+        if base is not None:
+            self.population = None
+            self.sampler = base
+            self.rng = base.rng
+        elif mode == SAMPLE_UNIFORM:
+            self.population = array('I', (i for i in range(n) if not blocked[i]))
+            self.sampler = None
+            self.rng = random.Random(seed)
+        else:
+            weights = tag_weights(library.counts, mode, alpha)
+            for index in range(n):
+                if blocked[index]:
+                    weights[index] = 0.0
+            self.population = None
+            self.sampler = TagSampler(weights, mode, seed, alpha)
+            self.rng = self.sampler.rng
+
+    def __len__(self):
+        return self.capacity
+
+    def seed(self, seed):
+        self.rng.seed(seed)
+
+    def close(self):
+        close = getattr(self.base, 'close', None)
+        if close is not None:
+            close()
+
+    def sample(self, k, rng=None):
+        """
+        抽取 k 个满足约束的标签下标（可行的最多 capacity 个）
+        组互相重叠时，随机选中的标签可能占用多个组，此时结果可能少于 capacity
+        """
+        rng = rng or self.rng
+        k = min(k, self.capacity)
+        picked = self.required[:k]
+        need = k - len(picked)
+        if need <= 0:
+            return picked
+
+        group_of = self.group_of
+        if self.base is not None:
+            return picked + self.base.sample(need, rng, self.plan.acceptor())
+
+        if not group_of:
+            if self.sampler is None:
+                return picked + rng.sample(self.population, need)
+            return picked + self.sampler.sample(need, rng)
+
+        used = set()
+
+        def accept(index):
+            groups = group_of.get(index)
+            if groups is None:
+                return True
+            if not used.isdisjoint(groups):
+                return False
+            used.update(groups)
+            return True
+
+        if self.sampler is None:
+            return picked + self._sample_uniform(need, rng, accept, used)
+        return picked + self.sampler.sample(need, rng, accept)
+
+    def _sample_uniform(self, need, rng, accept, used):
+        population = self.population
+        size = len(population)
+        random_ = rng.random
+        picked = []
+        seen = set()
+        budget = need * REJECTION_LIMIT
+        while len(picked) < need and budget > 0:
+            budget -= 1
+            index = population[int(random_() * size)]
+            if index in seen:
+                continue
+            seen.add(index)
+            if accept(index):
+                picked.append(index)
+        if len(picked) < need:
+            # 互斥组占了候选的绝大部分：在剩余的有效候选中精确抽取
+            group_of = self.group_of
+            rest = [i for i in population
+                    if i not in seen and used.isdisjoint(group_of.get(i, ()))]
+            while len(picked) < need and rest:
+                j = int(random_() * len(rest))
+                rest[j], rest[-1] = rest[-1], rest[j]
+                index = rest.pop()
+                if accept(index):
+                    picked.append(index)
+        return picked
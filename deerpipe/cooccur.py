@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+标签共现索引
+由本地保存的本子详情页 / 搜索结果页 HTML 统计标签两两共现次数，
+以 CSR 稀疏矩阵（只存上三角）写入文件，使用时内存映射，
+生成组合前即可离线判断是否可能搜不到结果
+
+构建: python -m deerpipe.cooccur tags.txt page1.html page2.html ...
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from itertools import combinations
+
+from .backends import extract_pairs
+from .tagset import normalize_name
+
+COOCCUR_SUFFIX = '.cooccur'
+COOCCUR_MAGIC = b'DPCO'
+COOCCUR_VERSION = 1
+
+# magic, version, 标签数, 文档数, 非零元素数, 标签库指纹
+_HEADER = struct.Struct('<4sIIII16s')
+
+
+def build_cooccurrence(library, documents):
+    """
+    统计共现次数
+    documents 为标签名序列的可迭代对象，每个元素代表一个本子；
+    返回 (每个标签出现的文档数, {(i, j): 次数}, 文档数)，其中 i < j
+    """
+    index_of = {normalize_name(name): i for i, name in enumerate(library.names())}
+    df = array('I', [0]) * len(library)
+    pairs = {}
+    n_docs = 0
+    for names in documents:
+        ids = sorted({index_of[key] for key in map(normalize_name, names) if key in index_of})
+        if not ids:
+            continue
+        n_docs += 1
+        for i in ids:
+            df[i] += 1
+        for pair in combinations(ids, 2):
+            pairs[pair] = pairs.get(pair, 0) + 1
+    return df, pairs, n_docs
+
+
+def iter_html_documents(paths):
+    """每个 HTML 文件视为一个本子，产出其中所有标签名"""
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            yield [name for name, _ in extract_pairs(f)]
+
+
+def write_index(path, library, df, pairs, n_docs):
+    """把共现统计写成 CSR 格式的索引文件"""
+    n = len(library)
+    indptr = array('I', [0]) * (n + 1)
+    indices = array('I')
+    data = array('I')
+    for (i, j), value in sorted(pairs.items()):
+        indices.append(j)
+        data.append(value)
+        indptr[i + 1] += 1
+    for i in range(n):
+        indptr[i + 1] += indptr[i]
+
+    header = _HEADER.pack(COOCCUR_MAGIC, COOCCUR_VERSION, n, n_docs, len(data),
+                          bytes.fromhex(library.fingerprint()))
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        for arr in (indptr, df, indices, data):
+            arr.tofile(f)
+    os.replace(tmp_path, path)
+
+
+class CooccurrenceIndex:
+    """内存映射的共现索引，单次查询为一次二分查找"""
+
+    def __init__(self, path, library=None):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < _HEADER.size:
+            self.close()
+            raise ValueError(f"不是有效的共现索引文件: {path}")
+        magic, version, n, n_docs, nnz, fingerprint = _HEADER.unpack_from(self._mmap)
+        if magic != COOCCUR_MAGIC or version != COOCCUR_VERSION:
+            self.close()
+            raise ValueError(f"不是有效的共现索引文件: {path}")
+        if library is not None and (len(library) != n or fingerprint.hex() != library.fingerprint()):
+            self.close()
+            raise ValueError("共现索引与当前标签库不匹配，请重新构建")
+
+        sizes = (n + 1, n, nnz, nnz)
+        if len(self._mmap) < _HEADER.size + sum(sizes) * 4:
+            self.close()
+            raise ValueError(f"共现索引文件不完整: {path}")
+        view = memoryview(self._mmap)[_HEADER.size:]
+        parts = []
+        pos = 0
+        for size in sizes:
+            parts.append(view[pos:pos + size * 4].cast('I'))
+            pos += size * 4
+        self.indptr, self.df, self.indices, self.data = parts
+        self.n_tags = n
+        self.n_docs = n_docs
+
+    def close(self):
+        for name in ('indptr', 'df', 'indices', 'data'):
+            view = getattr(self, name, None)
+            if view is not None:
+                view.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def pair_count(self, i, j):
+        """标签 i 与 j 同时出现的文档数"""
+        if i == j:
+            return self.df[i]
+        if i > j:
+            i, j = j, i
+        lo, hi = self.indptr[i], self.indptr[i + 1]
+        pos = bisect_left(self.indices, j, lo, hi)
+        if pos < hi and self.indices[pos] == j:
+            return self.data[pos]
+        return 0
+
+    def estimate_hits(self, indices):
+        """
+        估计组合在本地样本中的命中数（上界）
+        取所有标签对共现次数的最小值；样本中从未出现过的标签不参与判断，返回 None 表示无法判断
+        """
+        known = [i for i in indices if self.df[i]]
+        if not known:
+            return None
+        if len(known) == 1:
+            return self.df[known[0]]
+        return min(self.pair_count(a, b) for a, b in combinations(known, 2))
+
+    def is_dead(self, indices, min_hits=1):
+        """组合是否几乎不可能搜到结果"""
+        hits = self.estimate_hits(indices)
+        return hits is not None and hits < min_hits
+
+
+def build_index_file(library, html_paths, output_path=None):
+    """从 HTML 文件构建索引，默认写到标签文件旁边"""
+    if output_path is None:
+        output_path = library.path + COOCCUR_SUFFIX
+    df, pairs, n_docs = build_cooccurrence(library, iter_html_documents(html_paths))
+    write_index(output_path, library, df, pairs, n_docs)
+    return output_path, n_docs, len(pairs)
+
+
+def main(argv=None):
+    from .library import TagLibrary
+
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) < 2:
+        print("用法: python -m deerpipe.cooccur tags.txt page1.html [page2.html ...]", file=sys.stderr)
+        return 1
+    library = TagLibrary.load(argv[0])
+    output_path, n_docs, n_pairs = build_index_file(library, argv[1:])
+    print(f"已写入 {output_path}: {n_docs} 个本子, {n_pairs} 个标签对")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
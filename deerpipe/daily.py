@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+每日推荐（今天鹿什么）
+一个用户某天的组合是 (标签库指纹, 用户 id, 日期, k, 排序, 采样方式) 的纯函数：
+以标签库指纹为密钥的 blake2b 对其余参数求哈希，作为本次调用专用的伪随机数生成器的种子，
+在按标签库构建一次的采样表上抽样。不保存任何状态，不同进程、重启前后结果完全一致，
+单次 O(k log n)（均匀采样为 O(k)）。
+随机数生成器与抽样算法都在本模块中实现，不依赖 random 模块在不同 Python 版本间的行为
+"""
+
+import datetime
+import hashlib
+import struct
+
+from .generator import Combo, build_url, DEFAULT_BASE_URL, DEFAULT_TAG_COUNT, DEFAULT_SORT
+from .sampling import TagSampler, SAMPLE_UNIFORM, DEFAULT_ALPHA
+from .shards import ShardedLibrary, ShardedSampler
+
+# 推荐算法的版本，修改哈希输入或抽样方式时递增（所有用户的推荐都会改变）
+PICK_VERSION = 1
+_PERSON = b'deerpipe-daily'
+
+_MASK = (1 << 64) - 1
+_TWO_NEG_53 = 2.0 ** -53
+_SEED = struct.Struct('<Q')
+
+
+class HashRandom:
+    """
+    splitmix64 伪随机数生成器，种子为 64 位整数
+    只实现抽样器用到的 random() 与 sample()
+    """
+    __slots__ = ('state',)
+
+    def __init__(self, seed=0):
+        self.state = seed & _MASK
+
+    def next64(self):
+        self.state = s = (self.state + 0x9E3779B97F4A7C15) & _MASK
+        z = ((s ^ (s >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK
+        return z ^ (z >> 31)
+
+    def random(self):
+        """[0, 1) 内的浮点数"""
+        return (self.next64() >> 11) * _TWO_NEG_53
+
+    def randbelow(self, n):
+        """[0, n) 内的整数（乘法取高位，n 远小于 2^64 时偏差可忽略）"""
+        return (self.next64() * n) >> 64
+
+    def sample(self, population, k):
+        """无放回地取 k 个元素（Floyd 算法，恰好 k 次随机数）"""
+        n = len(population)
+        chosen = set()
+        picked = []
+        for j in range(n - k, n):
+            t = self.randbelow(j + 1)
+            if t in chosen:
+                t = j
+            chosen.add(t)
+            picked.append(t)
+        return [population[i] for i in picked]
+
+
+def as_day(day=None):
+    """datetime.date / 'YYYY-MM-DD' / None（本地今天） -> datetime.date"""
+    if day is None:
+        return datetime.date.today()
+    if isinstance(day, str):
+        return datetime.date.fromisoformat(day)
+    return day
+
+
+class DailyPicker:
+    """
+    某个标签库版本上的每日推荐
+    采样表在构造时按标签库重新构建（不使用增量更新过的表，保证浮点权重与指纹一一对应）
+    """
+
+    def __init__(self, library, mode=SAMPLE_UNIFORM, alpha=DEFAULT_ALPHA, base_url=DEFAULT_BASE_URL):
+        self.library = library
+        self.mode = mode
+        self.alpha = alpha
+        self.base_url = base_url
+        self.fingerprint = library.fingerprint()
+        if isinstance(library, ShardedLibrary):
+            self.sampler = ShardedSampler.for_library(library, mode, alpha)
+        else:
+            self.sampler = TagSampler.for_library(library, mode, alpha)
+        self._hash = hashlib.blake2b(key=bytes.fromhex(self.fingerprint), digest_size=8,
+                                     person=_PERSON)
+        self._suffix = f"\x1f{mode}\x1f{alpha!r}\x1f{PICK_VERSION}"
+
+    def seed(self, user, day=None, k=DEFAULT_TAG_COUNT, sort=DEFAULT_SORT):
+        """(用户, 日期, k, 排序) 对应的 64 位种子"""
+        h = self._hash.copy()
+        h.update(f"{user}\x1f{as_day(day).isoformat()}\x1f{k}\x1f{sort}{self._suffix}".encode('utf-8'))
+        return _SEED.unpack(h.digest())[0]
+
+    def indices(self, user, day=None, k=DEFAULT_TAG_COUNT, sort=DEFAULT_SORT):
+        """用户当天的标签下标"""
+        return self.sampler.sample(k, HashRandom(self.seed(user, day, k, sort)))
+
+    def pick(self, user, day=None, k=DEFAULT_TAG_COUNT, sort=DEFAULT_SORT):
+        """用户当天的组合"""
+        indices = self.indices(user, day, k, sort)
+        return Combo(indices, build_url(self.library, indices, self.base_url, sort))
+
+    def describe(self, combo, user, day=None):
+        """组合的可序列化表示（与 ComboGenerator.describe 相同，另附用户与日期）"""
+        library = self.library
+        result = {
+            'user': str(user),
+            'date': as_day(day).isoformat(),
+            'tags': [library.name(i) for i in combo.indices],
+            'counts': [library.count(i) for i in combo.indices],
+            'url': combo.url,
+        }
+        if isinstance(library, ShardedLibrary):
+            result['kinds'] = [library.kind(i) for i in combo.indices]
+        return result
+
+    def batch(self, users, day=None, k=DEFAULT_TAG_COUNT, sort=DEFAULT_SORT):
+        """
+        按顺序产出每个用户当天的标签下标，与逐个调用 indices() 的结果相同
+        日期与后缀只编码一次，哈希对象与随机数生成器在循环中复用
+        """
+        tail = f"\x1f{as_day(day).isoformat()}\x1f{k}\x1f{sort}{self._suffix}".encode('utf-8')
+        base = self._hash
+        unpack = _SEED.unpack
+        rng = HashRandom()
+        sample = self.sampler.sample
+        for user in users:
+            h = base.copy()
+            h.update(str(user).encode('utf-8') + tail)
+            rng.state = unpack(h.digest())[0]
+            yield sample(k, rng)
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+流式标签提取器
+基于标准库 html.parser 的增量解析，不构建 DOM 树，
+每个 <a> 闭合时立即产出 (name, count)
+"""
+
+import codecs
+from html.parser import HTMLParser
+
+from .tagset import MERGE_MAX, TagSet
+
+# 每次从文件对象读取的字符/字节数
+CHUNK_SIZE = 64 * 1024
+
+# 解析结果的版本号，修改提取规则时递增，导入缓存（importcache.py）据此失效
+EXTRACTOR_VERSION = 3
+
+
+# BeautifulSoup 视为空元素的标签：没有结束标签，不会包含文本
+VOID_ELEMENTS = frozenset((
+    'area', 'base', 'basefont', 'bgsound', 'br', 'col', 'command', 'embed', 'frame', 'hr',
+    'image', 'img', 'input', 'isindex', 'keygen', 'link', 'menuitem', 'meta', 'nextid',
+    'param', 'source', 'spacer', 'track', 'wbr'))
+# 这些标签内的空白文本原样保留
+PRESERVE_WHITESPACE = frozenset(('pre', 'textarea'))
+_ASCII_SPACES = ' \n\t\f\r'
+
+
+class _Anchor:
+    """解析过程中一个尚未闭合的 <a> 元素"""
+    __slots__ = ('name', 'count')
+
+    def __init__(self):
+        self.name = None
+        self.count = None
+
+
+class _Capture:
+    """正在收集文本的 <span class="name|count">"""
+    __slots__ = ('anchors', 'field', 'parts')
+
+    def __init__(self, anchors, field):
+        self.anchors = anchors
+        self.field = field
+        self.parts = []
+
+
+class TagStreamParser(HTMLParser):
+    """
+    增量解析标签页 HTML
+    与 BeautifulSoup（html.parser）版本的语义保持一致：
+    只处理带 href 的 <a>，取其中第一个 class 含 name / count 的 <span> 的文本；
+    结束标签闭合最近的同名元素及其内部所有未闭合的元素，没有对应开始标签的结束标签被忽略；
+    只含空白的文本节点折叠为一个空格或换行
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._stack = []        # 已打开的元素 (tag, anchor, captures)
+        self._open = {}         # 标签名 -> 已打开的数量
+        self._anchors = []      # 已打开且带 href 的 <a>
+        self._captures = []
+        self._data = []         # 当前文本节点（只在有 capture 时收集）
+        self._preserve = 0
+        self._voids = {}        # 已出现的空元素开始标签，与 BeautifulSoup 一样吞掉之后同名的结束标签
+        self._pending = []      # 外层 <a> 尚未闭合时，按文档顺序暂存
+        self._ready = []
+
+    def handle_starttag(self, tag, attrs):
+        self._end_data()
+        if tag in VOID_ELEMENTS:
+            self._voids[tag] = self._voids.get(tag, 0) + 1
+            return
+        anchor = None
+        captures = ()
+        if tag == 'a':
+            # 没有值的 href（<a href>）在 BeautifulSoup 中为空字符串，同样算作有 href
+            if any(key == 'href' for key, value in attrs):
+                anchor = _Anchor()
+                self._anchors.append(anchor)
+                self._pending.append(anchor)
+        elif tag == 'span' and self._anchors:
+            classes = ()
+            for key, value in attrs:
+                if key == 'class' and value:
+                    classes = value.split()
+                    break
+            for field in ('name', 'count'):
+                if field in classes:
+                    # 只认每个 <a> 内的第一个 name / count（与 find() 一致）
+                    owners = [a for a in self._anchors if getattr(a, field) is None]
+                    if owners:
+                        for owner in owners:
+                            setattr(owner, field, '')
+                        capture = _Capture(owners, field)
+                        self._captures.append(capture)
+                        captures += (capture,)
+        elif tag in PRESERVE_WHITESPACE:
+            self._preserve += 1
+        self._stack.append((tag, anchor, captures))
+        self._open[tag] = self._open.get(tag, 0) + 1
+
+    def handle_endtag(self, tag):
+        if self._voids.get(tag):
+            self._voids[tag] -= 1
+            return
+        self._end_data()
+        if not self._open.get(tag):
+            return
+        while True:
+            name, anchor, captures = self._stack.pop()
+            self._close(name, anchor, captures)
+            if name == tag:
+                break
+        if not self._anchors:
+            self._flush()
+
+    def handle_data(self, data):
+        if self._captures:
+            self._data.append(data)
+
+    def handle_comment(self, data):
+        self._end_data()
+
+    handle_decl = handle_pi = unknown_decl = handle_comment
+
+    def close(self):
+        super().close()
+        self._end_data()
+        while self._stack:
+            self._close(*self._stack.pop())
+        self._flush()
+
+    def _close(self, tag, anchor, captures):
+        self._open[tag] -= 1
+        if anchor is not None:
+            self._anchors.remove(anchor)
+        for capture in captures:
+            self._finish_capture(capture)
+        if tag in PRESERVE_WHITESPACE:
+            self._preserve -= 1
+
+    def _end_data(self):
+        """结束当前文本节点，与 BeautifulSoup 一样折叠只含空白的节点"""
+        if not self._data:
+            return
+        text = ''.join(self._data)
+        self._data = []
+        if not self._preserve and not text.strip(_ASCII_SPACES):
+            text = '\n' if '\n' in text else ' '
+        for capture in self._captures:
+            capture.parts.append(text)
+
+    def _finish_capture(self, capture):
+        self._captures.remove(capture)
+        text = ''.join(capture.parts)
+        for anchor in capture.anchors:
+            setattr(anchor, capture.field, text)
+
+    def _flush(self):
+        for anchor in self._pending:
+            if anchor.name is not None:
+                count = anchor.count.strip() if anchor.count is not None else None
+                self._ready.append((anchor.name.strip(), count))
+        self._pending = []
+
+    def pop_tags(self):
+        """取出目前已完成的 (name, count) 列表"""
+        ready, self._ready = self._ready, []
+        return ready
+
+
+def iter_chunks(source, chunk_size=CHUNK_SIZE):
+    """
+    把各种输入统一为文本块迭代器
+    支持 str、bytes、文件对象（文本或二进制）以及 str/bytes 块的迭代器
+    """
+    if isinstance(source, str):
+        yield source
+        return
+
+    if isinstance(source, (bytes, bytearray)):
+        yield bytes(source).decode('utf-8')
+        return
+
+    if hasattr(source, 'read'):
+        chunks = iter(lambda: source.read(chunk_size), source.read(0))
+    else:
+        chunks = iter(source)
+
+    decoder = None
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            yield chunk
+            continue
+        if decoder is None:
+            decoder = codecs.getincrementaldecoder('utf-8')()
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+
+    if decoder is not None:
+        tail = decoder.decode(b'', final=True)
+        if tail:
+            yield tail
+
+
+def iter_tag_pairs(source, chunk_size=CHUNK_SIZE):
+    """流式产出 (name, count)，count 不存在时为 None"""
+    parser = TagStreamParser()
+    for text in iter_chunks(source, chunk_size):
+        parser.feed(text)
+        yield from parser.pop_tags()
+    parser.close()
+    yield from parser.pop_tags()
+
+
+def extract_tagset(source, policy=MERGE_MAX, chunk_size=CHUNK_SIZE):
+    """从 HTML 中提取标签，返回按标签名去重的 TagSet"""
+    return TagSet(iter_tag_pairs(source, chunk_size), policy=policy)
+
+
+def extract_tags(source, policy=MERGE_MAX, chunk_size=CHUNK_SIZE):
+    """从 HTML 中提取标签（包含计数），按首次出现顺序去重"""
+    return extract_tagset(source, policy, chunk_size).tags()
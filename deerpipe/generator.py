@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+随机标签组合生成
+不依赖 tkinter / bs4，可被 GUI、命令行或机器人进程直接导入
+分片（shards）与约束（constraints）只在用到时导入，保持本模块的冷启动开销
+"""
+
+import sys
+
+from .library import TagLibrary
+from .sampling import TagSampler, SAMPLE_UNIFORM, DEFAULT_ALPHA
+from .urls import join_fragments, url_template
+
+DEFAULT_TAGS_FILE = 'tags.txt'
+DEFAULT_BASE_URL = 'https://nhentai.net/search/'
+DEFAULT_TAG_COUNT = 3
+MAX_TAGS = 10                # 单个组合的标签数上限（命令行与 HTTP 接口共用）
+DEFAULT_SORT = 'popular-week'
+SORT_OPTIONS = ('popular-today', 'popular-week', 'popular')
+
+
+class Combo:
+    """一个生成结果：indices 为标签库中的下标，url 为搜索链接"""
+    __slots__ = ('indices', 'url')
+
+    def __init__(self, indices, url):
+        self.indices = indices
+        self.url = url
+
+    def __iter__(self):
+        return iter((self.indices, self.url))
+
+    def __eq__(self, other):
+        return isinstance(other, Combo) and (self.indices, self.url) == (other.indices, other.url)
+
+    def __repr__(self):
+        return f"Combo(indices={self.indices!r}, url={self.url!r})"
+
+
+def sample_alive(sampler, k, rng=None, cooccur=None, min_hits=1, max_tries=20,
+                 known_empty=None, is_repeat=None):
+    """
+    抽取 k 个标签；重抽共现索引判定为搜不到结果、known_empty(indices) 为真、
+    或 is_repeat(indices) 为真（近期出现过）的组合
+    搜不到结果只是估计：重试 max_tries 次仍不满足时返回最后一个不重复的组合；
+    不重复是硬性要求：所有候选都是近期出现过的组合时返回 None
+    """
+    indices = sampler.sample(k, rng)
+    if cooccur is None and known_empty is None and is_repeat is None:
+        return indices
+    fresh = None
+    for attempt in range(max_tries + 1):
+        if attempt:
+            indices = sampler.sample(k, rng)
+        if is_repeat is None or not is_repeat(indices):
+            fresh = indices
+            dead = ((cooccur is not None and cooccur.is_dead(indices, min_hits))
+                    or (known_empty is not None and known_empty(indices)))
+            if not dead:
+                return indices
+    return fresh
+
+
+def is_sharded(library):
+    """library 是否为 ShardedLibrary（实例存在时 shards 模块必然已导入，这里不主动导入）"""
+    shards = sys.modules.get(__package__ + '.shards')
+    return shards is not None and isinstance(library, shards.ShardedLibrary)
+
+
+def build_url(library, indices, base_url=DEFAULT_BASE_URL, sort_param=DEFAULT_SORT):
+    """用预先编码的标签片段拼接搜索 URL（分片标签库按分片使用各自的查询前缀）"""
+    if is_sharded(library):
+        return library.build_url(indices, base_url, sort_param)
+    return join_fragments([library.fragment(i) for i in indices], base_url, sort_param)
+
+
+class ComboGenerator:
+    """在一个标签库上反复生成组合，采样表只构建一次"""
+
+    def __init__(self, library, base_url=DEFAULT_BASE_URL, mode=SAMPLE_UNIFORM,
+                 alpha=DEFAULT_ALPHA, seed=None, cooccur=None, min_hits=1, result_cache=None,
+                 constraints=None, scheduler=None, history=None):
+        """
+        scheduler 为 ShuffleScheduler 时按洗牌袋顺序取标签（忽略 mode）；
+        history 为 ComboHistory 时跳过并记录近期出现过的组合；
+        library 为 ShardedLibrary 时按分片配额抽样（k 为主分片的数量，不支持 scheduler）
+        """
+        self.library = library
+        self.base_url = base_url
+        if is_sharded(library):
+            from .shards import ShardedSampler
+            self.sampler = ShardedSampler.for_library(library, mode, alpha, seed, constraints)
+        elif constraints:
+            from .constraints import ConstrainedSampler
+            self.sampler = ConstrainedSampler(library, constraints, mode, alpha, seed, scheduler)
+        elif scheduler is not None:
+            self.sampler = scheduler
+        else:
+            self.sampler = TagSampler.for_library(library, mode, alpha, seed)
+        self.cooccur = cooccur
+        self.min_hits = min_hits
+        self.result_cache = result_cache
+        self.history = history
+
+    def sample(self, k, sort=DEFAULT_SORT):
+        """抽取一个组合的下标；提供 history 且找不到近期未出现过的组合时返回 None"""
+        known_empty = None
+        if self.result_cache is not None:
+            known_empty = self.result_cache.empty_check(self.library, sort)
+        is_repeat = None
+        if self.history is not None:
+            is_repeat = self.history.repeat_check(self.library)
+        indices = sample_alive(self.sampler, k, cooccur=self.cooccur, min_hits=self.min_hits,
+                               known_empty=known_empty, is_repeat=is_repeat)
+        if indices is not None and self.history is not None:
+            self.history.add([self.library.name(i) for i in indices])
+        return indices
+
+    def seed(self, seed):
+        self.sampler.seed(seed)
+
+    def generate(self, k=DEFAULT_TAG_COUNT, sort=DEFAULT_SORT):
+        """生成一个组合，没有近期未出现过的组合时返回 None"""
+        indices = self.sample(k, sort)
+        if indices is None:
+            return None
+        return Combo(indices, build_url(self.library, indices, self.base_url, sort))
+
+    def iter_combos(self, n, k=DEFAULT_TAG_COUNT, sort=DEFAULT_SORT):
+        """
+        连续生成 n 个组合（n 为 None 时无限生成）
+        提供 history 时，找不到近期未出现过的组合即提前结束
+        """
+        if self.cooccur is None and self.result_cache is None and self.history is None:
+            sample = self.sampler.sample
+        else:
+            def sample(k):
+                return self.sample(k, sort)
+        produced = 0
+        if is_sharded(self.library):
+            library, base_url = self.library, self.base_url
+            while n is None or produced < n:
+                indices = sample(k)
+                if indices is None:
+                    return
+                yield Combo(indices, library.build_url(indices, base_url, sort))
+                produced += 1
+            return
+        fragment = self.library.fragment
+        head, separator, tail = url_template(self.base_url, sort)
+        join = separator.join
+        while n is None or produced < n:
+            indices = sample(k)
+            if indices is None:
+                return
+            yield Combo(indices, head + join([fragment(i) for i in indices]) + tail)
+            produced += 1
+
+    def describe(self, combo):
+        """组合的可序列化表示"""
+        library = self.library
+        result = {
+            'tags': [library.name(i) for i in combo.indices],
+            'counts': [library.count(i) for i in combo.indices],
+            'url': combo.url,
+        }
+        if is_sharded(library):
+            result['kinds'] = [library.kind(i) for i in combo.indices]
+        return result
+
+
+def generate_batch(n, k=DEFAULT_TAG_COUNT, sort=DEFAULT_SORT, seed=None, *,
+                   library=None, tags_file=DEFAULT_TAGS_FILE, base_url=DEFAULT_BASE_URL,
+                   mode=SAMPLE_UNIFORM, alpha=DEFAULT_ALPHA, cooccur=None, min_hits=1,
+                   result_cache=None, constraints=None, scheduler=None, history=None):
+    """
+    批量生成 n 个组合的生成器
+    未传入 library 时从 tags_file 加载（使用编译缓存）
+    constraints 为 TagConstraints 时按排除 / 必选 / 互斥组约束抽样；
+    scheduler / history 见 ComboGenerator
+    """
+    if library is None:
+        library = TagLibrary.load(tags_file)
+    generator = ComboGenerator(library, base_url, mode, alpha, seed, cooccur, min_hits,
+                               result_cache, constraints, scheduler, history)
+    return generator.iter_combos(n, k, sort)
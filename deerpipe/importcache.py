@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+导入结果缓存
+以页面内容的 blake2b 哈希为键，在 SQLite 中保存每个页面解析出的 (name, count) 列表，
+重复导入同一批页面时只解析新增或修改过的文件。
+查找分两步：先按 (文件, 大小, mtime) 直接找到内容哈希，不读取文件；
+不匹配时读取文件计算哈希，内容未变（只是被复制或 touch 过）时仍可命中。
+总大小超过上限时按最近访问时间淘汰；EXTRACTOR_VERSION 变化时整个缓存失效
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from .extractor import EXTRACTOR_VERSION
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+_HASH_BLOCK = 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    key TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    digest BLOB PRIMARY KEY,
+    data BLOB NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_digest ON files (digest);
+CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed_at);
+"""
+
+# 编码格式：名称与计数交替，以 \\0 分隔；计数缺失记为 \\1（解析出的文本不含控制字符）
+_NO_COUNT = '\x01'
+
+
+def encode_pairs(pairs):
+    """(name, count) 列表 -> 压缩后的字节串"""
+    parts = []
+    for name, count in pairs:
+        parts.append(name)
+        parts.append(_NO_COUNT if count is None else count)
+    return zlib.compress('\0'.join(parts).encode('utf-8'))
+
+
+def decode_pairs(data):
+    """encode_pairs 的逆操作"""
+    text = zlib.decompress(data).decode('utf-8')
+    if not text:
+        return []
+    parts = text.split('\0')
+    return [(name, None if count == _NO_COUNT else count)
+            for name, count in zip(parts[0::2], parts[1::2])]
+
+
+def source_file(source):
+    """工作项所在的磁盘文件（zip 成员为压缩包本身）"""
+    return source[0] if isinstance(source, tuple) else source
+
+
+def file_digest(path):
+    """文件内容的 128 位 blake2b 哈希"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.digest()
+
+
+class ImportCache:
+    """SQLite 导入缓存，可在 GUI 线程与后台任务线程间共享"""
+
+    def __init__(self, path=':memory:', max_bytes=DEFAULT_MAX_BYTES, clock=time.time):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ':memory:':
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+        version = self._conn.execute('PRAGMA user_version').fetchone()[0]
+        if version != EXTRACTOR_VERSION:
+            # 解析规则变化后旧结果不再可信
+            self._conn.executescript('DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS pages;')
+            self._conn.execute(f'PRAGMA user_version = {int(EXTRACTOR_VERSION)}')
+        self._conn.executescript(_SCHEMA)
+        self._bytes = self._conn.execute(
+            'SELECT COALESCE(SUM(LENGTH(data)), 0) FROM pages').fetchone()[0]
+        self._container_digests = {}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+
+    @property
+    def size_bytes(self):
+        return self._bytes
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM files')
+            self._conn.execute('DELETE FROM pages')
+            self._bytes = 0
+        self._container_digests.clear()
+
+    # ---------- 查找 / 写入 ----------
+
+    def digest(self, source, st=None):
+        """工作项的内容哈希；同一压缩包的多个成员只读取一次"""
+        path = source_file(source)
+        if st is None:
+            st = os.stat(path)
+        if not isinstance(source, tuple):
+            return file_digest(path)
+        key = (path, st.st_size, st.st_mtime_ns)
+        container = self._container_digests.get(key)
+        if container is None:
+            if len(self._container_digests) >= 64:
+                self._container_digests.clear()
+            container = self._container_digests[key] = file_digest(path)
+        return hashlib.blake2b(container + source[1].encode('utf-8'), digest_size=16).digest()
+
+    def lookup(self, source, key):
+        """
+        返回 (pairs, digest)；未命中时 pairs 为 None，digest 供 store 使用
+        key 为工作项的显示名称（见 archives.source_label）
+        """
+        st = os.stat(source_file(source))
+        with self._lock:
+            row = self._conn.execute('SELECT size, mtime_ns, digest FROM files WHERE key = ?',
+                                     (key,)).fetchone()
+        if row is not None and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            digest = row[2]
+        else:
+            digest = self.digest(source, st)
+            with self._lock:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO files (key, size, mtime_ns, digest) VALUES (?, ?, ?, ?)',
+                    (key, st.st_size, st.st_mtime_ns, digest))
+
+        with self._lock:
+            row = self._conn.execute('SELECT data FROM pages WHERE digest = ?', (digest,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None, digest
+            self._conn.execute('UPDATE pages SET accessed_at = ? WHERE digest = ?',
+                               (self.clock(), digest))
+            self.hits += 1
+        return decode_pairs(row[0]), digest
+
+    def store(self, digest, pairs):
+        """保存一个页面的解析结果，超过容量时淘汰最久未访问的页面"""
+        data = encode_pairs(pairs)
+        with self._lock:
+            old = self._conn.execute('SELECT LENGTH(data) FROM pages WHERE digest = ?',
+                                     (digest,)).fetchone()
+            self._conn.execute(
+                'INSERT OR REPLACE INTO pages (digest, data, accessed_at) VALUES (?, ?, ?)',
+                (digest, data, self.clock()))
+            self._bytes += len(data) - (old[0] if old else 0)
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        freed = 0
+        excess = self._bytes - self.max_bytes
+        victims = []
+        rows = self._conn.execute('SELECT digest, LENGTH(data) FROM pages ORDER BY accessed_at')
+        for digest, length in rows:
+            if freed >= excess:
+                break
+            victims.append((digest,))
+            freed += length
+        rows.close()
+        self._conn.execute('BEGIN')
+        self._conn.executemany('DELETE FROM pages WHERE digest = ?', victims)
+        self._conn.executemany('DELETE FROM files WHERE digest = ?', victims)
+        self._conn.execute('COMMIT')
+        self._bytes -= freed
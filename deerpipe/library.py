@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+编译后的标签库
+tags.txt 中的每个标签只解析一次：名称、整数计数、URL 片段，
+以紧凑数组保存，并缓存到 tags.txt 旁边，按 mtime 和大小校验
+"""
+
+import os
+import struct
+from array import array
+
+from .tagset import parse_count
+from .urls import encode_fragment
+
+CACHE_SUFFIX = '.tagcache'
+CACHE_MAGIC = b'DPTL'
+CACHE_VERSION = 2
+
+# magic, version, mtime_ns, size, 标签数, 文本长度, 片段长度
+_HEADER = struct.Struct('<4sIqqIII')
+
+
+def split_tag(raw):
+    """
+    把 "name (203K)" 拆分为 (name, count文本)，没有计数时 count 为 None
+    只把结尾的最后一对括号视为计数，名称中的括号保留（原 GUI 在第一个 "(" 处截断）
+    """
+    raw = raw.strip()
+    if raw.endswith(')'):
+        name, sep, count = raw[:-1].rpartition('(')
+        if sep and name.strip():
+            return name.strip(), count.strip()
+    return raw, None
+
+
+def file_stamp(path):
+    """文件的 (mtime_ns, size)，不存在时为 None"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class TagDiff:
+    """
+    两个版本标签库之间的差异
+    changed 为两者共有范围内内容变化的下标，新增标签位于 old_size 之后
+    """
+    __slots__ = ('changed', 'old_size', 'new_size')
+
+    def __init__(self, changed, old_size, new_size):
+        self.changed = changed
+        self.old_size = old_size
+        self.new_size = new_size
+
+    @property
+    def appended(self):
+        return range(self.old_size, self.new_size)
+
+    @property
+    def incremental(self):
+        """只有修改和末尾追加（没有删除）时可以增量更新派生结构"""
+        return self.new_size >= self.old_size
+
+    def __bool__(self):
+        return bool(self.changed) or self.new_size != self.old_size
+
+
+class TagLibrary:
+    """
+    只读标签库
+    所有文本存放在两个 bytes 块中，按下标切片解码，不为每个派生字段保存 Python 字符串
+    """
+    __slots__ = ('text', 'offsets', 'name_lengths', 'counts',
+                 'fragments', 'fragment_offsets', 'path', '_fingerprint')
+
+    def __init__(self, text=b'', offsets=None, name_lengths=None, counts=None,
+                 fragments=b'', fragment_offsets=None, path=None):
+        self.text = text                                        # "name (count)" 依次拼接（UTF-8）
+        self.offsets = offsets or array('I', [0])               # text 中每个标签的起止位置
+        self.name_lengths = name_lengths or array('I')          # 名称部分的字节数
+        self.counts = counts or array('q')                      # 解析后的整数计数
+        self.fragments = fragments                              # 已百分号编码的 URL 片段依次拼接（ASCII）
+        self.fragment_offsets = fragment_offsets or array('I', [0])
+        self.path = path
+        self._fingerprint = None
+
+    # ---------- 构建 ----------
+
+    @classmethod
+    def from_tags(cls, raw_tags, path=None, previous=None, changed=None):
+        """
+        由 "name (count)" 字符串序列构建
+        提供 previous 时，与其同一位置内容相同的标签直接复用已解析的字段，
+        内容不同的下标追加到 changed 列表中
+        """
+        text = bytearray()
+        offsets = array('I', [0])
+        name_lengths = array('I')
+        counts = array('q')
+        fragments = bytearray()
+        fragment_offsets = array('I', [0])
+
+        old_size = len(previous) if previous is not None else 0
+        for raw in raw_tags:
+            raw = raw.strip()
+            if not raw:
+                continue
+            index = len(name_lengths)
+            encoded = raw.encode('utf-8')
+            text += encoded
+            offsets.append(len(text))
+
+            if index < old_size and previous.raw_bytes(index) == encoded:
+                name_lengths.append(previous.name_lengths[index])
+                counts.append(previous.counts[index])
+                fragments += previous.fragments[previous.fragment_offsets[index]:
+                                                previous.fragment_offsets[index + 1]]
+            else:
+                if index < old_size and changed is not None:
+                    changed.append(index)
+                name, count = split_tag(raw)
+                name_lengths.append(len(name.encode('utf-8')))
+                counts.append(parse_count(count))
+                fragments += encode_fragment(name).encode('ascii')
+            fragment_offsets.append(len(fragments))
+
+        return cls(bytes(text), offsets, name_lengths, counts,
+                   bytes(fragments), fragment_offsets, path)
+
+    @classmethod
+    def from_text(cls, content, path=None):
+        """解析 tags.txt 内容（逗号分隔）"""
+        return cls.from_tags(content.split(','), path)
+
+    @classmethod
+    def load(cls, path, use_cache=True):
+        """
+        加载标签文件
+        缓存有效时一次读取缓存文件，否则解析后重写缓存
+        """
+        st = os.stat(path)
+        cache_path = path + CACHE_SUFFIX
+        if use_cache:
+            library = cls._read_cache(cache_path, st)
+            if library is not None:
+                library.path = path
+                return library
+
+        with open(path, 'r', encoding='utf-8') as f:
+            library = cls.from_text(f.read(), path)
+
+        if use_cache:
+            try:
+                library._write_cache(cache_path, st)
+            except OSError:
+                pass  # 缓存写入失败不影响使用
+        return library
+
+    def reload(self, path=None):
+        """
+        重新读取标签文件，未变化的标签复用当前已解析的结果
+        返回 (新标签库, TagDiff)；当前对象保持不变，调用方可原子地替换
+        """
+        path = path or self.path
+        st = os.stat(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        changed = []
+        library = type(self).from_tags(content.split(','), path, previous=self, changed=changed)
+        try:
+            library._write_cache(path + CACHE_SUFFIX, st)
+        except OSError:
+            pass
+        return library, TagDiff(changed, len(self), len(library))
+
+    # ---------- 缓存 ----------
+
+    @classmethod
+    def _read_cache(cls, cache_path, st):
+        try:
+            with open(cache_path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) < _HEADER.size:
+            return None
+
+        magic, version, mtime_ns, size, n, text_len, frag_len = _HEADER.unpack_from(data)
+        if (magic != CACHE_MAGIC or version != CACHE_VERSION
+                or mtime_ns != st.st_mtime_ns or size != st.st_size):
+            return None
+
+        # 按头部的长度算出文件应有的大小，截断或头部损坏的缓存直接丢弃（重新解析标签文件）
+        layout = (('I', n + 1), ('I', n), ('q', n), ('I', n + 1))
+        expected = _HEADER.size + text_len + frag_len
+        expected += sum(length * array(typecode).itemsize for typecode, length in layout)
+        if expected != len(data):
+            return None
+
+        view = memoryview(data)
+        pos = _HEADER.size
+        parts = []
+        for typecode, length in layout:
+            arr = array(typecode)
+            end = pos + length * arr.itemsize
+            arr.frombytes(view[pos:end])
+            parts.append(arr)
+            pos = end
+        text = bytes(view[pos:pos + text_len])
+        pos += text_len
+        fragments = bytes(view[pos:pos + frag_len])
+
+        offsets, name_lengths, counts, fragment_offsets = parts
+        if (offsets[0] != 0 or offsets[n] != text_len
+                or fragment_offsets[0] != 0 or fragment_offsets[n] != frag_len):
+            return None
+        return cls(text, offsets, name_lengths, counts, fragments, fragment_offsets)
+
+    def _write_cache(self, cache_path, st):
+        header = _HEADER.pack(CACHE_MAGIC, CACHE_VERSION, st.st_mtime_ns, st.st_size,
+                              len(self), len(self.text), len(self.fragments))
+        tmp_path = cache_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(header)
+            for arr in (self.offsets, self.name_lengths, self.counts, self.fragment_offsets):
+                arr.tofile(f)
+            f.write(self.text)
+            f.write(self.fragments)
+        os.replace(tmp_path, cache_path)
+
+    # ---------- 访问 ----------
+
+    def __len__(self):
+        return len(self.name_lengths)
+
+    def raw_bytes(self, index):
+        """原始的 "name (count)" 文本（UTF-8 字节）"""
+        return self.text[self.offsets[index]:self.offsets[index + 1]]
+
+    def display(self, index):
+        """原始的 "name (count)" 文本"""
+        return self.raw_bytes(index).decode('utf-8')
+
+    def name(self, index):
+        """纯标签名（不含计数）"""
+        start = self.offsets[index]
+        return self.text[start:start + self.name_lengths[index]].decode('utf-8')
+
+    def count(self, index):
+        """整数计数，没有计数时为 0"""
+        return self.counts[index]
+
+    def fragment(self, index):
+        """URL 中使用的已编码标签名"""
+        return self.fragments[self.fragment_offsets[index]:self.fragment_offsets[index + 1]].decode('ascii')
+
+    def fingerprint(self):
+        """标签库内容的哈希（十六进制），用于校验派生索引是否过期"""
+        if self._fingerprint is None:
+            import hashlib
+            self._fingerprint = hashlib.blake2b(self.text, digest_size=16).hexdigest()
+        return self._fingerprint
+
+    def names(self):
+        for i in range(len(self)):
+            yield self.name(i)
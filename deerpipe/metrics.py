@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+轻量性能指标
+常驻开启的计时器与计数器，供两个 GUI 在状态栏展示各阶段耗时；
+可导出为 JSON 或 Chrome trace（chrome://tracing / Perfetto），
+设置环境变量 DEERPIPE_PROFILE=1 时对单次操作启用 cProfile
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+
+TRACE_CAPACITY = 10000
+
+
+class _Stat:
+    __slots__ = ('count', 'total', 'max', 'last')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+
+class _Timer:
+    """with 语句计时器；退出时把耗时记入注册表"""
+    __slots__ = ('registry', 'name', 'start')
+
+    def __init__(self, registry, name):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.record(self.name, time.perf_counter() - self.start, self.start)
+
+
+class MetricsRegistry:
+    """线程安全的指标注册表；每次记录只做几次字典操作"""
+
+    def __init__(self, trace_capacity=TRACE_CAPACITY):
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._counters = {}
+        self._events = deque(maxlen=trace_capacity)
+        self._origin = time.perf_counter()
+        self.profiling = os.environ.get('DEERPIPE_PROFILE') == '1'
+        self.profile_dir = os.environ.get('DEERPIPE_PROFILE_DIR', '.')
+
+    def timer(self, name):
+        """with METRICS.timer('parse'): ..."""
+        return _Timer(self, name)
+
+    def record(self, name, seconds, start=None):
+        """记录一次耗时（秒）；start 为 perf_counter 起点，用于 trace"""
+        with self._lock:
+            stat = self._stats.get(name)
+            if stat is None:
+                stat = self._stats[name] = _Stat()
+            stat.count += 1
+            stat.total += seconds
+            stat.last = seconds
+            if seconds > stat.max:
+                stat.max = seconds
+            if start is None:
+                start = time.perf_counter() - seconds
+            self._events.append((name, start, seconds, threading.get_ident()))
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def counter(self, name):
+        return self._counters.get(name, 0)
+
+    def last(self, name):
+        """最近一次耗时（秒），没有记录时为 None"""
+        stat = self._stats.get(name)
+        return stat.last if stat else None
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._counters.clear()
+            self._events.clear()
+
+    def summary(self, names, labels=None):
+        """状态栏用的简短摘要，例如 "读取 3ms · 解析 120ms" """
+        parts = []
+        for name in names:
+            seconds = self.last(name)
+            if seconds is None:
+                continue
+            label = labels.get(name, name) if labels else name
+            if seconds >= 1:
+                parts.append(f"{label} {seconds:.2f}s")
+            else:
+                parts.append(f"{label} {seconds * 1000:.0f}ms")
+        return ' · '.join(parts)
+
+    def snapshot(self):
+        """所有指标的可序列化快照"""
+        with self._lock:
+            timers = {name: {'count': s.count, 'total_s': s.total, 'max_s': s.max,
+                             'last_s': s.last, 'mean_s': s.total / s.count if s.count else 0.0}
+                      for name, s in self._stats.items()}
+            return {'timers': timers, 'counters': dict(self._counters)}
+
+    def export_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+
+    def export_chrome_trace(self, path):
+        """导出 Chrome trace 事件格式（完整事件 ph='X'，时间单位微秒）"""
+        with self._lock:
+            events = list(self._events)
+        pid = os.getpid()
+        trace = [{'name': name, 'ph': 'X', 'pid': pid, 'tid': tid,
+                  'ts': (start - self._origin) * 1e6, 'dur': seconds * 1e6}
+                 for name, start, seconds, tid in events]
+        trace.extend({'name': name, 'ph': 'C', 'pid': pid, 'ts': 0, 'args': {name: value}}
+                     for name, value in self.snapshot()['counters'].items())
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, f)
+
+    def profiled(self, name):
+        """对单次操作启用 cProfile（需 profiling 为真），结果写入 <profile_dir>/<name>.prof"""
+        return _Profile(self, name)
+
+
+class _Profile:
+    __slots__ = ('registry', 'name', 'profiler')
+
+    def __init__(self, registry, name):
+        self.registry = registry
+        self.name = name
+        self.profiler = None
+
+    def __enter__(self):
+        if self.registry.profiling:
+            import cProfile
+
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc):
+        if self.profiler is not None:
+            self.profiler.disable()
+            path = os.path.join(self.registry.profile_dir, f"{self.name}.prof")
+            self.profiler.dump_stats(path)
+
+
+# 进程内共享的注册表
+METRICS = MetricsRegistry()
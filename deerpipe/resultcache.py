@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+搜索结果缓存
+以规范化查询（排序后的标签集合 + 排序参数）为键，在 SQLite 中记录命中数与时间，
+支持 TTL 过期和按最近访问时间的 LRU 淘汰；生成组合时据此跳过已知无结果的组合。
+实际查询通过可替换的抓取后端完成（HTTP 或测试用的本地模拟服务器）
+"""
+
+import re
+import sqlite3
+import threading
+import time
+
+from .tagset import normalize_name
+from .urls import join_fragments, encode_fragment
+
+DEFAULT_TTL = 7 * 24 * 3600       # 结果缓存一周
+DEFAULT_MAX_ENTRIES = 100000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    hits INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed_at);
+"""
+
+
+def query_key(names, sort_param):
+    """规范化查询键：标签顺序与大小写不影响结果"""
+    tags = sorted({normalize_name(name) for name in names})
+    return sort_param + '\t' + '\x1f'.join(tags)
+
+
+class ResultCache:
+    """SQLite 结果缓存，可在多个线程间共享"""
+
+    def __init__(self, path=':memory:', ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES,
+                 clock=time.time):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ':memory:':
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+        self._size = self._conn.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self):
+        return self._size
+
+    def get(self, key):
+        """查询缓存的命中数；不存在或已过期时返回 None"""
+        now = self.clock()
+        with self._lock:
+            row = self._conn.execute('SELECT hits, fetched_at FROM results WHERE key = ?',
+                                     (key,)).fetchone()
+            if row is None:
+                return None
+            hits, fetched_at = row
+            if now - fetched_at > self.ttl:
+                self._conn.execute('DELETE FROM results WHERE key = ?', (key,))
+                self._size -= 1
+                return None
+            self._conn.execute('UPDATE results SET accessed_at = ? WHERE key = ?', (now, key))
+            return hits
+
+    def put(self, key, hits):
+        """记录命中数，超过容量时淘汰最久未访问的条目"""
+        now = self.clock()
+        with self._lock:
+            exists = self._conn.execute('SELECT 1 FROM results WHERE key = ?', (key,)).fetchone()
+            self._conn.execute(
+                'INSERT OR REPLACE INTO results (key, hits, fetched_at, accessed_at) VALUES (?, ?, ?, ?)',
+                (key, hits, now, now))
+            if exists is None:
+                self._size += 1
+            if self._size > self.max_entries:
+                self._evict(self._size - self.max_entries)
+
+    def _evict(self, excess):
+        self._conn.execute(
+            'DELETE FROM results WHERE key IN '
+            '(SELECT key FROM results ORDER BY accessed_at LIMIT ?)', (excess,))
+        self._size -= excess
+
+    def purge_expired(self):
+        """删除所有过期条目，返回删除数量"""
+        with self._lock:
+            cursor = self._conn.execute('DELETE FROM results WHERE fetched_at < ?',
+                                        (self.clock() - self.ttl,))
+            self._size -= cursor.rowcount
+            return cursor.rowcount
+
+    def is_known_empty(self, names, sort_param):
+        """组合是否已确认没有结果"""
+        return self.get(query_key(names, sort_param)) == 0
+
+    def lookup(self, names, sort_param, fetcher):
+        """优先读缓存，未命中时通过抓取后端查询并写入缓存"""
+        key = query_key(names, sort_param)
+        hits = self.get(key)
+        if hits is None:
+            hits = fetcher.fetch(names, sort_param)
+            self.put(key, hits)
+        return hits
+
+    def empty_check(self, library, sort_param):
+        """返回供 sample_alive 使用的判断函数：indices -> 是否已知无结果"""
+        def check(indices):
+            return self.is_known_empty([library.name(i) for i in indices], sort_param)
+        return check
+
+
+# ---------- 抓取后端 ----------
+
+_RESULTS_RE = re.compile(r'(\d[\d,]*)\s*results?', re.IGNORECASE)
+_GALLERY_RE = re.compile(r'class="gallery"')
+
+
+def parse_hits(html):
+    """从搜索结果页中解析结果数"""
+    match = _RESULTS_RE.search(html)
+    if match:
+        return int(match.group(1).replace(',', ''))
+    if 'No results' in html:
+        return 0
+    return len(_GALLERY_RE.findall(html))
+
+
+class HTTPFetcher:
+    """通过 HTTP 请求搜索页并解析结果数；base_url 可指向本地模拟服务器"""
+
+    def __init__(self, base_url, timeout=10, user_agent='TodayDeerPipe'):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.user_agent = user_agent
+
+    def url_for(self, names, sort_param):
+        return join_fragments([encode_fragment(name) for name in names], self.base_url, sort_param)
+
+    def fetch(self, names, sort_param):
+        import urllib.request
+
+        request = urllib.request.Request(self.url_for(names, sort_param),
+                                         headers={'User-Agent': self.user_agent})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            charset = response.headers.get_content_charset() or 'utf-8'
+            return parse_hits(response.read().decode(charset, errors='replace'))
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""
+标签采样引擎
+支持均匀、按计数加权、温和加权（count^α）三种分布的无放回抽样；
+权重保存在 Fenwick 树（树状数组）中，每个标签库只构建一次，单次抽取 O(log n)
+"""
+
+import random
+from array import array
+
+SAMPLE_UNIFORM = 'uniform'      # 均匀
+SAMPLE_WEIGHTED = 'weighted'    # 按计数加权
+SAMPLE_TEMPERED = 'tempered'    # 按 count^α 加权
+SAMPLE_MODES = (SAMPLE_UNIFORM, SAMPLE_WEIGHTED, SAMPLE_TEMPERED)
+
+DEFAULT_ALPHA = 0.5
+
+
+def tag_weight(count, mode=SAMPLE_UNIFORM, alpha=DEFAULT_ALPHA):
+    """单个标签的采样权重"""
+    if mode == SAMPLE_UNIFORM:
+        return 1.0
+    if mode == SAMPLE_WEIGHTED:
+        return float(max(count, 1))
+    if mode == SAMPLE_TEMPERED:
+        return float(max(count, 1)) ** alpha
+    raise ValueError(f"未知的采样方式: {mode}")
+
+
+def tag_weights(counts, mode=SAMPLE_UNIFORM, alpha=DEFAULT_ALPHA):
+    """由整数计数计算采样权重，没有计数的标签按 1 处理"""
+    if mode == SAMPLE_UNIFORM:
+        return array('d', [1.0]) * len(counts)
+    if mode == SAMPLE_WEIGHTED:
+        return array('d', (float(max(c, 1)) for c in counts))
+    if mode == SAMPLE_TEMPERED:
+        return array('d', (float(max(c, 1)) ** alpha for c in counts))
+    raise ValueError(f"未知的采样方式: {mode}")
+
+
+class FenwickTree:
+    """浮点权重的树状数组，支持单点修改、前缀和与按累积权重定位"""
+    __slots__ = ('tree', 'size', '_top')
+
+    def __init__(self, weights):
+        n = len(weights)
+        tree = array('d', [0.0]) * (n + 1)
+        tree[1:] = array('d', weights)
+        # O(n) 建树
+        for i in range(1, n + 1):
+            parent = i + (i & -i)
+            if parent <= n:
+                tree[parent] += tree[i]
+        self.tree = tree
+        self.size = n
+        self._top = 1 << n.bit_length() if n else 0
+
+    def add(self, index, delta, saved=None):
+        """
+        给第 index 个（从 0 开始）元素的权重加上 delta
+        saved 为字典时先记下被修改节点的原值，之后可用 restore() 原样恢复
+        """
+        tree = self.tree
+        i = index + 1
+        n = self.size
+        while i <= n:
+            if saved is not None and i not in saved:
+                saved[i] = tree[i]
+            tree[i] += delta
+            i += i & -i
+
+    def restore(self, saved):
+        """把 add() 记下的节点恢复为原值（逐位相同，不经过浮点加减）"""
+        tree = self.tree
+        for i, value in saved.items():
+            tree[i] = value
+
+    def prefix_sum(self, end):
+        """前 end 个元素的权重和"""
+        tree = self.tree
+        total = 0.0
+        i = end
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def total(self):
+        return self.prefix_sum(self.size)
+
+    def find(self, target):
+        """返回累积权重首次超过 target 的下标"""
+        tree = self.tree
+        pos = 0
+        step = self._top
+        while step:
+            nxt = pos + step
+            if nxt <= self.size and tree[nxt] <= target:
+                pos = nxt
+                target -= tree[nxt]
+            step >>= 1
+        return min(pos, self.size - 1)
+
+    def append(self, weight):
+        """在末尾追加一个元素，O(log n)"""
+        n = self.size + 1
+        # 新节点覆盖区间 (n - lowbit(n), n]，由已有元素的前缀和差得到
+        lowbit = n & -n
+        value = weight + self.prefix_sum(n - 1) - self.prefix_sum(n - lowbit)
+        self.tree.append(value)
+        self.size = n
+        if n >= self._top:
+            self._top = 1 << n.bit_length()
+
+
+class TagSampler:
+    """
+    无放回抽样器
+    weights 为每个标签的权重；按标签库构建一次，之后每次抽取 k 个只需 O(k log n)
+    """
+
+    def __init__(self, weights, mode=SAMPLE_WEIGHTED, seed=None, alpha=DEFAULT_ALPHA):
+        self.mode = mode
+        self.alpha = alpha
+        self.weights = array('d', weights)
+        self.tree = FenwickTree(self.weights)
+        self.rng = random.Random(seed)
+
+    @classmethod
+    def for_library(cls, library, mode=SAMPLE_UNIFORM, alpha=DEFAULT_ALPHA, seed=None):
+        return cls(tag_weights(library.counts, mode, alpha), mode, seed, alpha)
+
+    def __len__(self):
+        return len(self.weights)
+
+    def seed(self, seed):
+        """重新设置随机种子，便于复现结果"""
+        self.rng.seed(seed)
+
+    def sample(self, k, rng=None, accept=None):
+        """
+        无放回地抽取 k 个标签下标
+        accept(index) 为假的候选被拒绝，并在本次抽取中从树里移除，不会再次抽到
+        """
+        rng = rng or self.rng
+        n = len(self.weights)
+        k = min(k, n)
+        if self.mode == SAMPLE_UNIFORM and accept is None:
+            return rng.sample(range(n), k)
+
+        tree = self.tree
+        weights = self.weights
+        random_ = rng.random
+        total = tree.total()
+        picked = []
+        taken = set()   # 本次已从树中移除的下标（含被拒绝的）
+        saved = {}      # 被修改的树节点的原值，结束时原样写回（先减后加会累积浮点误差）
+        try:
+            while len(picked) < k and total > 0:
+                index = tree.find(random_() * total)
+                # 浮点误差可能落到已抽走（权重为 0）的位置，向前后寻找最近的有效下标
+                if weights[index] <= 0 or index in taken:
+                    index = self._nearest_live(index, taken)
+                    if index is None:
+                        break
+                taken.add(index)
+                tree.add(index, -weights[index], saved)
+                total -= weights[index]
+                if accept is None or accept(index):
+                    picked.append(index)
+        finally:
+            tree.restore(saved)
+        return picked
+
+    def _nearest_live(self, index, taken):
+        weights = self.weights
+        n = len(weights)
+        for offset in range(1, n):
+            for i in (index - offset, index + offset):
+                if 0 <= i < n and weights[i] > 0 and i not in taken:
+                    return i
+        return None
+
+    def set_weight(self, index, weight):
+        """修改单个标签的权重，O(log n)"""
+        self.tree.add(index, weight - self.weights[index])
+        self.weights[index] = weight
+
+    def append(self, weight):
+        """追加一个标签，O(log n)"""
+        self.weights.append(weight)
+        self.tree.append(weight)
+
+    def apply_diff(self, library, diff, max_changes=None):
+        """
+        按标签库差异（TagDiff）增量更新权重，每个变化 O(log n)
+        存在删除或变化过多（超过 max_changes，默认 n/4）时返回 False，应重新构建
+        """
+        if not diff.incremental or diff.old_size != len(self.weights):
+            return False
+        if max_changes is None:
+            max_changes = max(len(self.weights) // 4, 64)
+        if len(diff.changed) + len(diff.appended) > max_changes:
+            return False
+        counts = library.counts
+        for index in diff.changed:
+            self.set_weight(index, tag_weight(counts[index], self.mode, self.alpha))
+        for index in diff.appended:
+            self.append(tag_weight(counts[index], self.mode, self.alpha))
+        return True
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+跨会话的不重复调度
+ShuffleScheduler: 洗牌袋。标签下标的一个排列加游标，内存映射到文件，
+每次取出排列中的下一个下标（O(1)），一轮用完后重新洗牌，
+并保证上一轮最后 window 个标签不会出现在新一轮的前 window 个位置，
+因此任意标签两次出现之间至少隔 window 次抽取。
+ComboHistory: 最近 N 天出现过的组合。每个组合记为 8 字节哈希 + 日期，
+追加写入日志文件，启动时载入为字典，检查与记录都是 O(1)，不扫描历史
+"""
+
+import datetime
+import hashlib
+import mmap
+import os
+import random
+import struct
+from array import array
+
+from .tagset import normalize_name
+
+BAG_SUFFIX = '.bag'
+BAG_MAGIC = b'DPSB'
+BAG_VERSION = 1
+DEFAULT_WINDOW = 50
+DEFAULT_REPEAT_DAYS = 7
+
+# magic, version, 标签数, 游标, 已完成轮数, 标签库指纹
+_HEADER = struct.Struct('<4sIIII16s')
+# 组合哈希, 日期序号
+_RECORD = struct.Struct('<QI')
+
+
+def today():
+    """本地日期序号（datetime.date.toordinal）"""
+    return datetime.date.today().toordinal()
+
+
+class ShuffleScheduler:
+    """
+    持久化的洗牌袋，接口与 TagSampler 相同（sample / seed）
+    状态文件与标签库不匹配（标签数或指纹变化）时重新生成排列
+    """
+
+    def __init__(self, path, library, window=DEFAULT_WINDOW, seed=None):
+        self.path = path
+        self.n = len(library)
+        # 窗口超过标签数的一半时无法保证，按一半处理
+        self.window = max(0, min(window, self.n // 2))
+        self.rng = random.Random(seed)
+        self._mmap = None
+        self.perm = None
+        fingerprint = bytes.fromhex(library.fingerprint())
+        if not self._open(fingerprint):
+            self._create(fingerprint)
+
+    def _open(self, fingerprint):
+        try:
+            f = open(self.path, 'r+b')
+        except FileNotFoundError:
+            return False
+        with f:
+            if os.fstat(f.fileno()).st_size != _HEADER.size + self.n * 4 or not self.n:
+                return False
+            self._mmap = mmap.mmap(f.fileno(), 0)
+        magic, version, n, cursor, _, stored = _HEADER.unpack_from(self._mmap)
+        if (magic, version, n, stored) != (BAG_MAGIC, BAG_VERSION, self.n, fingerprint) or cursor > n:
+            self.close()
+            return False
+        self.perm = memoryview(self._mmap)[_HEADER.size:].cast('I')
+        return True
+
+    def _create(self, fingerprint):
+        perm = array('I', range(self.n))
+        self.rng.shuffle(perm)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(BAG_MAGIC, BAG_VERSION, self.n, 0, 0, fingerprint))
+            perm.tofile(f)
+        os.replace(tmp_path, self.path)
+        if self.n and not self._open(fingerprint):
+            raise OSError(f"无法打开调度状态文件: {self.path}")
+
+    def close(self):
+        if self.perm is not None:
+            self.perm.release()
+            self.perm = None
+        if self._mmap is not None:
+            self._mmap.flush()
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.n
+
+    def seed(self, seed):
+        self.rng.seed(seed)
+
+    @property
+    def cursor(self):
+        return struct.unpack_from('<I', self._mmap, 12)[0]
+
+    @property
+    def rounds(self):
+        return struct.unpack_from('<I', self._mmap, 16)[0]
+
+    def _reshuffle(self, rng):
+        """一轮用完：上一轮最后 window 个标签只能放在新一轮的 window 位置之后"""
+        n, w = self.n, self.window
+        old = self.perm.tolist()
+        others = old[:n - w]
+        rng.shuffle(others)
+        rest = others[w:] + old[n - w:]
+        rng.shuffle(rest)
+        self.perm[:] = array('I', others[:w] + rest)
+        struct.pack_into('<II', self._mmap, 12, 0, self.rounds + 1)
+
+    def next(self, rng=None):
+        """取出下一个标签下标"""
+        cursor = self.cursor
+        if cursor >= self.n:
+            self._reshuffle(rng or self.rng)
+            cursor = 0
+        index = self.perm[cursor]
+        struct.pack_into('<I', self._mmap, 12, cursor + 1)
+        return index
+
+    def sample(self, k, rng=None, accept=None):
+        """
+        依次取出 k 个不同的标签下标
+        accept(index) 为假的标签本轮跳过；连续一整轮都没有可用标签时返回已取到的部分
+        """
+        k = min(k, self.n)
+        picked = []
+        misses = 0
+        while len(picked) < k and misses < self.n:
+            index = self.next(rng)
+            if index in picked or (accept is not None and not accept(index)):
+                misses += 1
+                continue
+            misses = 0
+            picked.append(index)
+        return picked
+
+
+def combo_hash(names):
+    """组合的 64 位哈希，标签顺序与大小写不影响结果"""
+    key = '\x1f'.join(sorted({normalize_name(name) for name in names}))
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class ComboHistory:
+    """
+    最近 days 天内出现过的组合
+    path 为 None 时只保存在内存中；过期记录超过一半时在打开时压缩日志
+    autoflush 为假时新记录先缓存在内存中，由调用方定期 flush()（服务模式避免每个组合都写盘）
+    """
+
+    def __init__(self, path=None, days=DEFAULT_REPEAT_DAYS, clock=today, autoflush=True):
+        self.path = path
+        self.days = days
+        self.clock = clock
+        self.autoflush = autoflush
+        self.seen = {}   # 组合哈希 -> 最近一次出现的日期
+        self._file = None
+        self._unwritten = []
+        if path is None:
+            return
+        total = 0
+        oldest = clock() - days + 1
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = b''
+        usable = len(data) - len(data) % _RECORD.size   # 忽略写了一半的最后一条
+        for key, day in _RECORD.iter_unpack(memoryview(data)[:usable]):
+            total += 1
+            if day >= oldest and self.seen.get(key, 0) < day:
+                self.seen[key] = day
+        if total > 2 * len(self.seen) or usable != len(data):
+            self._compact()
+        self._file = open(path, 'ab')
+
+    def _compact(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pack = _RECORD.pack
+            f.write(b''.join(pack(key, day) for key, day in self.seen.items()))
+        os.replace(tmp_path, self.path)
+
+    def flush(self):
+        """把缓存的新记录一次性追加到文件"""
+        if self._file is not None and self._unwritten:
+            self._file.write(b''.join(self._unwritten))
+            self._unwritten = []
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def __len__(self):
+        return len(self.seen)
+
+    def contains(self, names):
+        """该组合是否在最近 days 天内出现过"""
+        day = self.seen.get(combo_hash(names))
+        return day is not None and day > self.clock() - self.days
+
+    def add(self, names):
+        """记录一个组合"""
+        key = combo_hash(names)
+        day = self.clock()
+        self.seen[key] = day
+        if self._file is not None:
+            self._unwritten.append(_RECORD.pack(key, day))
+            if self.autoflush:
+                self.flush()
+
+    def repeat_check(self, library):
+        """返回 (indices) -> 是否为近期重复组合 的函数，供 sample_alive 使用"""
+        name = library.name
+
+        def is_repeat(indices):
+            return self.contains([name(i) for i in indices])
+        return is_repeat
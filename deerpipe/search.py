@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+标签名搜索索引（输入即搜）
+前缀：规范化名称的有序数组 + bisect 定位范围；
+子串：三元组倒排表（array('I')，名称两端补空格，两个字的查询可按词首匹配），取最短的表逐个校验；
+容错：逐词纠正拼写——词表中不存在的词换成三元组 Jaccard 相似度最高的几个词（在词表上计算，词表远小于标签数），
+再召回包含所有词（不要求顺序）的标签，多个词时先对各词的倒排表求交集。
+结果按 前缀 > 子串 > 容错 分层，层内按解析后的计数从高到低排列；
+候选很多时改为按计数从高到低扫描，取满 limit 个即停止，
+因此前缀与子串查询的代价约为 O(sqrt(limit × 标签数))，与命中数量无关
+"""
+
+from array import array
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from heapq import nlargest
+from itertools import chain
+from math import ceil
+
+from .tagset import normalize_name
+
+DEFAULT_LIMIT = 20
+FUZZY_MIN_SCORE = 0.25      # 纠正候选词与原词的三元组 Jaccard 相似度下限
+FUZZY_MARGIN = 0.8          # 只保留相似度不低于最佳候选该比例的词
+FUZZY_WORDS = 3             # 每个词最多的纠正候选数
+_END = '\U0010ffff'
+
+
+def trigrams(key):
+    return {key[i:i + 3] for i in range(len(key) - 2)}
+
+
+class TagIndex:
+    """
+    标签库的只读搜索索引，构建一次后可反复查询
+    支持 TagLibrary 与 ShardedLibrary（需要 names() 与 counts）
+    构建约为每 10 万个标签 1 秒，GUI 中在后台线程构建
+    """
+
+    def __init__(self, library):
+        self.library = library
+        keys = [normalize_name(name) for name in library.names()]
+        counts = library.counts
+        n = len(keys)
+        order = sorted(range(n), key=keys.__getitem__)
+        self.keys = keys
+        self.counts = counts
+        self.sorted_keys = [keys[i] for i in order]
+        self.order = array('I', order)
+        self.by_count = array('I', sorted(range(n), key=counts.__getitem__, reverse=True))
+        postings = defaultdict(list)
+        for i, key in enumerate(keys):
+            for gram in trigrams(f" {key} "):
+                postings[gram].append(i)
+        self.postings = {gram: array('I', posting) for gram, posting in postings.items()}
+        # 词表（有序）与词级三元组倒排表，纯数字的词不参与纠正
+        self.words = sorted({word for key in keys for word in key.split()})
+        word_postings = defaultdict(list)
+        for word_id, word in enumerate(self.words):
+            if not word.isdigit():
+                for gram in trigrams(f" {word} "):
+                    word_postings[gram].append(word_id)
+        self.word_postings = {gram: array('I', posting) for gram, posting in word_postings.items()}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def find(self, name):
+        """名称（忽略大小写与多余空白）对应的下标，不存在时返回 None"""
+        key = normalize_name(name)
+        pos = bisect_left(self.sorted_keys, key)
+        if pos < len(self.sorted_keys) and self.sorted_keys[pos] == key:
+            return self.order[pos]
+        return None
+
+    # ---------- 查询 ----------
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """返回最多 limit 个标签下标：前缀匹配、子串匹配、容错匹配依次补足"""
+        key = normalize_name(query)
+        if not key or limit <= 0:
+            return []
+        results = self.prefix(key, limit)
+        if len(results) < limit and len(key) >= 2:
+            seen = set(results)
+            for tier in (self.substring, self.fuzzy):
+                for index in tier(key, limit + len(seen)):
+                    if index not in seen:
+                        seen.add(index)
+                        results.append(index)
+                        if len(results) >= limit:
+                            return results
+        return results
+
+    def prefix(self, key, limit=DEFAULT_LIMIT):
+        """以 key（已规范化）开头的标签"""
+        lo = bisect_left(self.sorted_keys, key)
+        hi = bisect_left(self.sorted_keys, key + _END, lo)
+        keys = self.keys
+        return self._ranked(self.order[lo:hi], lambda i: keys[i].startswith(key), limit, exact=True)
+
+    def substring(self, key, limit=DEFAULT_LIMIT):
+        """名称中包含 key 的标签；key 只有两个字符时只匹配词首"""
+        keys = self.keys
+        if len(key) < 3:
+            word = ' ' + key
+            posting = self.postings.get(word)
+            if posting is None:
+                return []
+            return self._ranked(posting, lambda i: word in ' ' + keys[i], limit)
+        postings = []
+        for gram in trigrams(key):
+            posting = self.postings.get(gram)
+            if posting is None:
+                return []
+            postings.append(posting)
+        return self._ranked(min(postings, key=len), lambda i: key in keys[i], limit)
+
+    def fuzzy(self, key, limit=DEFAULT_LIMIT):
+        """
+        拼写有误时的召回：逐词纠正后，包含每个词（或其纠正候选）的标签，按计数排序
+        最后一个词是词表中某个词的前缀时视为尚未输入完，按前缀匹配
+        """
+        words = key.split()
+        if len(key) < 3:
+            return []
+        required = []   # 每个词：(可接受的词, 前缀)
+        for pos, word in enumerate(words):
+            if self.has_word(word):
+                required.append(((word,), None))
+            elif pos == len(words) - 1 and self.has_word(word, prefix=True):
+                required.append(((), word))
+            else:
+                similar = self.similar_words(word)
+                if not similar:
+                    return []
+                required.append((tuple(similar), None))
+
+        # 每个词的候选：每个可接受的词取其最罕见的三元组倒排表；从最短的开始求交集
+        postings = []
+        for alternatives, prefix in required:
+            grams = [trigrams(f" {word} ") for word in alternatives] if prefix is None else [trigrams(f" {prefix}")]
+            if all(grams):
+                lists = [min((self.postings.get(gram, ()) for gram in word_grams), key=len)
+                         for word_grams in grams]
+                postings.append(lists[0] if len(lists) == 1 else list(dict.fromkeys(chain(*lists))))
+        if not postings:
+            return []
+        postings.sort(key=len)
+        candidates = postings[0]
+        if len(postings) > 1 and len(candidates) * len(candidates) > limit * len(self.keys):
+            common = set(candidates)
+            for posting in postings[1:]:
+                common.intersection_update(posting)
+            candidates = sorted(common)
+
+        keys = self.keys
+
+        def match(index):
+            tag_words = keys[index].split()
+            for alternatives, prefix in required:
+                if prefix is None:
+                    if not any(word in alternatives for word in tag_words):
+                        return False
+                elif not any(word.startswith(prefix) for word in tag_words):
+                    return False
+            return True
+        return self._ranked(candidates, match, limit)
+
+    def has_word(self, word, prefix=False):
+        """词表中是否有该词（prefix 为真时：是否有以它开头的词）"""
+        words = self.words
+        pos = bisect_left(words, word)
+        if pos == len(words):
+            return False
+        return words[pos].startswith(word) if prefix else words[pos] == word
+
+    def similar_words(self, word, limit=FUZZY_WORDS):
+        """词表中与 word 三元组 Jaccard 相似度最高的词（不低于 FUZZY_MIN_SCORE）"""
+        grams = trigrams(f" {word} ")
+        postings = [self.word_postings[gram] for gram in grams if gram in self.word_postings]
+        if not postings:
+            return []
+        size = len(grams)
+        # J = s / (size + len - s) >= t 要求共有数 s >= t * size / (1 + t)
+        least = max(1, ceil(FUZZY_MIN_SCORE * size / (1 + FUZZY_MIN_SCORE)))
+        words = self.words
+        scored = [(shared / (size + len(words[word_id]) - shared), word_id)
+                  for word_id, shared in Counter(chain.from_iterable(postings)).items()
+                  if shared >= least]
+        best = nlargest(limit, scored)
+        if not best or best[0][0] < FUZZY_MIN_SCORE:
+            return []
+        floor = max(FUZZY_MIN_SCORE, best[0][0] * FUZZY_MARGIN)
+        return [words[word_id] for score, word_id in best if score >= floor]
+
+    def _ranked(self, candidates, match, limit, exact=False):
+        """
+        candidates 中满足 match 的下标，按计数取前 limit 个
+        候选远多于 limit 时按计数从高到低扫描全部标签，扫描量超出预算再回退到逐个检查候选
+        exact 为真表示候选全部满足条件
+        """
+        size = len(candidates)
+        if not size:
+            return []
+        counts = self.counts
+        n = len(self.keys)
+        if size * size > limit * n:
+            budget = 4 * limit * n // size + limit
+            found = []
+            for checked, index in enumerate(self.by_count):
+                if checked >= budget:
+                    break
+                if match(index):
+                    found.append(index)
+                    if len(found) >= limit:
+                        return found
+            else:
+                return found
+        if not exact:
+            candidates = filter(match, candidates)
+        return nlargest(limit, candidates, key=counts.__getitem__)
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+asyncio HTTP 服务模式
+供群聊机器人调用的随机组合接口，支持 keep-alive 与请求流水线（pipelining）：
+    GET /combo?k=3&sort=popular-week&n=1
+    GET /daily?user=12345&k=3&sort=popular-week&date=2026-10-18   （同一用户同一天结果固定）
+    GET /health
+
+启动: python -m deerpipe.server --port 8080 --tags-file tags.txt
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from urllib.parse import parse_qsl, urlsplit
+
+from .daily import DailyPicker, as_day
+from .generator import (ComboGenerator, DEFAULT_TAGS_FILE, DEFAULT_BASE_URL,
+                        DEFAULT_TAG_COUNT, DEFAULT_SORT, SORT_OPTIONS, MAX_TAGS)
+from .library import TagLibrary
+from .schedule import ShuffleScheduler, ComboHistory, DEFAULT_WINDOW, DEFAULT_REPEAT_DAYS
+from .shards import Shard, ShardedLibrary, DEFAULT_KIND, parse_shard_spec
+from .sampling import SAMPLE_MODES, SAMPLE_UNIFORM
+
+MAX_COMBOS = 1000
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 64 * 1024
+HISTORY_FLUSH_INTERVAL = 1.0   # 组合历史批量写盘的间隔（秒）
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            431: 'Request Header Fields Too Large', 503: 'Service Unavailable'}
+
+
+class ComboServer:
+    """
+    所有连接共享同一个只读标签库与采样表
+    history 的新记录在事件循环中只写入内存，由后台任务每 HISTORY_FLUSH_INTERVAL 秒批量写盘
+    """
+
+    def __init__(self, library, base_url=DEFAULT_BASE_URL, mode=SAMPLE_UNIFORM, seed=None,
+                 scheduler=None, history=None):
+        self.library = library
+        self.history = history
+        self._flush_task = None
+        if history is not None:
+            history.autoflush = False
+        self.generator = ComboGenerator(library, base_url, mode, seed=seed,
+                                        scheduler=scheduler, history=history)
+        self.daily_picker = DailyPicker(library, mode, base_url=base_url)
+        self.requests = 0
+
+    # ---------- 路由 ----------
+
+    def handle(self, method, target):
+        """处理一个请求，返回 (状态码, JSON 可序列化对象)"""
+        if method != 'GET':
+            return 405, {'error': 'method not allowed'}
+        parts = urlsplit(target)
+        if parts.path == '/combo':
+            return self.combo(dict(parse_qsl(parts.query)))
+        if parts.path == '/daily':
+            return self.daily(dict(parse_qsl(parts.query)))
+        if parts.path == '/health':
+            return 200, {'status': 'ok', 'tags': len(self.library), 'requests': self.requests}
+        return 404, {'error': 'not found'}
+
+    def combo(self, params):
+        try:
+            k = int(params.get('k', DEFAULT_TAG_COUNT))
+            n = int(params.get('n', 1))
+        except ValueError:
+            return 400, {'error': 'k and n must be integers'}
+        sort = params.get('sort', DEFAULT_SORT)
+        if not (1 <= k <= MAX_TAGS and 1 <= n <= MAX_COMBOS):
+            return 400, {'error': f'k must be 1..{MAX_TAGS}, n must be 1..{MAX_COMBOS}'}
+        if sort not in SORT_OPTIONS:
+            return 400, {'error': f'sort must be one of {", ".join(SORT_OPTIONS)}'}
+
+        describe = self.generator.describe
+        combos = [describe(combo) for combo in self.generator.iter_combos(n, k, sort)]
+        if len(combos) < n:
+            # 提供组合历史时，近期未出现过的组合已用尽
+            if not combos:
+                return 503, {'error': 'no combo that has not been seen recently'}
+            return 200, {'combos': combos, 'exhausted': True}
+        return 200, {'combos': combos}
+
+    def daily(self, params):
+        user = params.get('user')
+        if not user:
+            return 400, {'error': 'user is required'}
+        try:
+            k = int(params.get('k', DEFAULT_TAG_COUNT))
+        except ValueError:
+            return 400, {'error': 'k must be an integer'}
+        try:
+            day = as_day(params.get('date'))
+        except ValueError:
+            return 400, {'error': 'date must be YYYY-MM-DD'}
+        sort = params.get('sort', DEFAULT_SORT)
+        if not 1 <= k <= MAX_TAGS:
+            return 400, {'error': f'k must be 1..{MAX_TAGS}'}
+        if sort not in SORT_OPTIONS:
+            return 400, {'error': f'sort must be one of {", ".join(SORT_OPTIONS)}'}
+
+        picker = self.daily_picker
+        return 200, picker.describe(picker.pick(user, day, k, sort), user, day)
+
+    # ---------- HTTP ----------
+
+    async def serve_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except asyncio.IncompleteReadError:
+                    break
+                except asyncio.LimitOverrunError:
+                    writer.write(self.render(431, {'error': 'headers too large'}, False))
+                    break
+
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ', 2)
+                except ValueError:
+                    writer.write(self.render(400, {'error': 'bad request line'}, False))
+                    break
+
+                headers = {}
+                for line in lines[1:]:
+                    name, sep, value = line.partition(':')
+                    if sep:
+                        headers[name.strip().lower()] = value.strip().lower()
+
+                # 忽略请求体
+                length = headers.get('content-length', '0') or '0'
+                if not (length.isascii() and length.isdigit()) or int(length) > MAX_BODY_BYTES:
+                    writer.write(self.render(400, {'error': 'bad content-length'}, False))
+                    break
+                length = int(length)
+                if length:
+                    await reader.readexactly(length)
+
+                connection = headers.get('connection', '')
+                keep_alive = (connection != 'close' if version == 'HTTP/1.1'
+                              else connection == 'keep-alive')
+
+                self.requests += 1
+                status, body = self.handle(method, target)
+                writer.write(self.render(status, body, keep_alive))
+
+                # 写缓冲未超过高水位时 drain 立即返回，流水线请求按顺序连续处理
+                await writer.drain()
+                if not keep_alive:
+                    break
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def render(status, body, keep_alive):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        head = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        return head.encode('latin-1') + data
+
+    async def flush_history(self, interval=HISTORY_FLUSH_INTERVAL):
+        """定期把组合历史的新记录一次性写盘"""
+        while True:
+            await asyncio.sleep(interval)
+            self.history.flush()
+
+    async def start(self, host='127.0.0.1', port=8080):
+        if self.history is not None:
+            self._flush_task = asyncio.create_task(self.flush_history())
+        return await asyncio.start_server(self.serve_connection, host, port,
+                                          limit=MAX_HEADER_BYTES)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='deerpipe.server', description='今天鹿什么：HTTP 服务模式')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--tags-file', default=DEFAULT_TAGS_FILE)
+    parser.add_argument('--shard', action='append', default=[], metavar='KIND=FILE[:QUOTA]',
+                        help='额外的标签库分片，例如 artist=artists.txt:1；可多次指定')
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL)
+    parser.add_argument('--mode', default=SAMPLE_UNIFORM, choices=SAMPLE_MODES)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--bag', default=None, help='洗牌袋状态文件，重启后继续不重复的顺序')
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW)
+    parser.add_argument('--history', default=None, help='组合历史文件，最近 --repeat-days 天内不重复')
+    parser.add_argument('--repeat-days', type=int, default=DEFAULT_REPEAT_DAYS)
+    args = parser.parse_args(argv)
+
+    try:
+        extra = [parse_shard_spec(spec) for spec in args.shard]
+    except ValueError as e:
+        parser.error(str(e))
+    if extra and args.bag:
+        parser.error('--bag 暂不支持与 --shard 同时使用')
+    try:
+        if extra:
+            # k 为主分片的数量，其余分片按配额追加
+            library = ShardedLibrary.load([Shard(DEFAULT_KIND, args.tags_file, 0)] + extra)
+        else:
+            library = TagLibrary.load(args.tags_file)
+    except (OSError, ValueError) as e:
+        parser.error(f"加载标签文件失败: {e}")
+    scheduler = ShuffleScheduler(args.bag, library, args.window, args.seed) if args.bag else None
+    history = ComboHistory(args.history, args.repeat_days) if args.history else None
+    server = ComboServer(library, args.base_url, args.mode, args.seed, scheduler, history)
+
+    async def run():
+        srv = await server.start(args.host, args.port)
+        print(f"服务已启动: http://{args.host}:{args.port}/combo?k=3  ({len(library)} 个标签)")
+        async with srv:
+            await srv.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if history is not None:
+            history.close()
+        if scheduler is not None:
+            scheduler.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+多标签库分片
+标签、作者、原作、角色等分别保存在不同的文件中，各自使用自己的编译缓存；
+ShardedLibrary 把它们拼接成一个只读视图（全局下标 = 分片偏移 + 分片内下标），
+按分片配额抽样，生成 URL 时每个分片使用自己的查询前缀
+"""
+
+from bisect import bisect_right
+
+from .library import TagLibrary, file_stamp
+from .sampling import TagSampler, SAMPLE_UNIFORM, DEFAULT_ALPHA
+from .urls import join_groups
+
+DEFAULT_KIND = 'tag'
+SHARD_PREFIXES = {
+    'tag': 'tag:',
+    'artist': 'artist:',
+    'parody': 'parody:',
+    'character': 'character:',
+    'group': 'group:',
+    'language': 'language:',
+    'category': 'category:',
+}
+
+
+class Shard:
+    """一个分片：种类（决定查询前缀）、文件、每个组合中的配额，以及加载后的标签库"""
+    __slots__ = ('kind', 'path', 'quota', 'library', 'stamp')
+
+    def __init__(self, kind, path, quota=1, library=None, stamp=None):
+        self.kind = kind
+        self.path = path
+        self.quota = quota
+        self.library = library
+        self.stamp = stamp
+
+    @property
+    def prefix(self):
+        return SHARD_PREFIXES.get(self.kind, f"{self.kind}:")
+
+    def __repr__(self):
+        return f"Shard({self.kind!r}, {self.path!r}, quota={self.quota})"
+
+
+def parse_shard_spec(text):
+    """解析命令行的 "artist=artists.txt:1" 形式（配额省略时为 1）"""
+    kind, sep, rest = text.partition('=')
+    if not sep or not kind.strip() or not rest:
+        raise ValueError(f"分片格式应为 种类=文件[:配额]: {text}")
+    path, sep, quota = rest.rpartition(':')
+    if sep and quota.isdigit():
+        return Shard(kind.strip(), path, int(quota))
+    return Shard(kind.strip(), rest, 1)
+
+
+class ShardedLibrary:
+    """
+    多个 TagLibrary 的拼接视图，提供与 TagLibrary 相同的按下标访问接口
+    第一个分片为主标签库，path 指向它的文件
+    """
+    __slots__ = ('shards', 'offsets', 'path', '_fingerprint', '_counts')
+
+    def __init__(self, shards):
+        self.shards = list(shards)
+        self.offsets = [0]
+        for shard in self.shards:
+            self.offsets.append(self.offsets[-1] + len(shard.library))
+        self.path = self.shards[0].path if self.shards else None
+        self._fingerprint = None
+        self._counts = None
+
+    @classmethod
+    def load(cls, shards, previous=None, max_workers=None):
+        """
+        并发加载各分片（每个文件使用自己的 .tagcache）
+        提供 previous 时，文件未变化的分片直接复用已加载的标签库，变化的分片增量重新加载
+        """
+        old = {}
+        if previous is not None:
+            old = {(shard.kind, shard.path): shard for shard in previous.shards}
+
+        def load_one(shard):
+            stamp = file_stamp(shard.path)
+            prev = old.get((shard.kind, shard.path))
+            if prev is not None and stamp is not None and prev.stamp == stamp:
+                library = prev.library
+            elif prev is not None and len(prev.library):
+                library = prev.library.reload(shard.path)[0]
+            else:
+                library = TagLibrary.load(shard.path)
+            return Shard(shard.kind, shard.path, shard.quota, library, stamp)
+
+        shards = list(shards)
+        if len(shards) <= 1:
+            return cls([load_one(shard) for shard in shards])
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=max_workers or len(shards)) as pool:
+            return cls(pool.map(load_one, shards))
+
+    def reload(self, path=None):
+        """重新加载有变化的分片，返回 (新的分片标签库, None)，与 TagLibrary.reload 接口一致"""
+        return type(self).load(self.shards, previous=self), None
+
+    # ---------- 访问 ----------
+
+    def __len__(self):
+        return self.offsets[-1]
+
+    def locate(self, index):
+        """全局下标 -> (分片序号, 分片内下标)"""
+        shard_no = bisect_right(self.offsets, index) - 1
+        return shard_no, index - self.offsets[shard_no]
+
+    def kind(self, index):
+        shard_no, _ = self.locate(index)
+        return self.shards[shard_no].kind
+
+    def name(self, index):
+        shard_no, local = self.locate(index)
+        return self.shards[shard_no].library.name(local)
+
+    def display(self, index):
+        shard_no, local = self.locate(index)
+        return self.shards[shard_no].library.display(local)
+
+    def count(self, index):
+        shard_no, local = self.locate(index)
+        return self.shards[shard_no].library.count(local)
+
+    def fragment(self, index):
+        shard_no, local = self.locate(index)
+        return self.shards[shard_no].library.fragment(local)
+
+    def names(self):
+        for shard in self.shards:
+            yield from shard.library.names()
+
+    @property
+    def counts(self):
+        if self._counts is None:
+            from array import array
+
+            counts = array('q')
+            for shard in self.shards:
+                counts.extend(shard.library.counts)
+            self._counts = counts
+        return self._counts
+
+    def fingerprint(self):
+        """各分片种类与指纹的组合哈希"""
+        if self._fingerprint is None:
+            import hashlib
+
+            digest = hashlib.blake2b(digest_size=16)
+            for shard in self.shards:
+                digest.update(f"{shard.kind}\0{shard.library.fingerprint()}\0".encode('utf-8'))
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def build_url(self, indices, base_url, sort_param):
+        """按分片顺序分组，每组使用该分片的查询前缀"""
+        groups = [[] for _ in self.shards]
+        for index in indices:
+            shard_no, local = self.locate(index)
+            groups[shard_no].append(self.shards[shard_no].library.fragment(local))
+        return join_groups([(shard.prefix, fragments)
+                            for shard, fragments in zip(self.shards, groups) if fragments],
+                           base_url, sort_param)
+
+
+def shard_sampler(shard, mode=SAMPLE_UNIFORM, alpha=DEFAULT_ALPHA, seed=None, scheduler=None):
+    """单个分片的抽样器：scheduler 或 TagSampler（约束由 ShardedSampler 在整个组合上处理）"""
+    if scheduler is not None:
+        return scheduler
+    return TagSampler.for_library(shard.library, mode, alpha, seed)
+
+
+class ShardedSampler:
+    """
+    按分片配额抽样，接口与 TagSampler 相同（sample / seed）
+    sample(k) 中的 k 为主分片（第一个）的数量，其余分片按各自的 quota 抽取
+    factory(shard) 返回单个分片的抽样器（需支持 sample(k, rng, accept)），默认为均匀抽样；
+    constraints 按全局下标编译一次，在整个组合上生效：同名的必选标签只出现一次（计入所在分片的配额），
+    互斥组可以跨分片
+    """
+
+    def __init__(self, library, factory=None, constraints=None):
+        self.library = library
+        self.plan = None
+        if constraints:
+            from .constraints import ConstraintPlan
+
+            self.plan = ConstraintPlan(library, constraints)
+        factory = factory or shard_sampler
+        self.samplers = [factory(shard) for shard in library.shards]
+
+    @classmethod
+    def for_library(cls, library, mode=SAMPLE_UNIFORM, alpha=DEFAULT_ALPHA, seed=None,
+                    constraints=None):
+        offsets = iter(range(len(library.shards)))
+
+        def factory(shard):
+            # 各分片使用不同的种子，避免抽样序列相关
+            offset = next(offsets)
+            return shard_sampler(shard, mode, alpha, None if seed is None else seed + offset)
+        return cls(library, factory, constraints)
+
+    def __len__(self):
+        return len(self.samplers[0]) if self.samplers else 0
+
+    @property
+    def rng(self):
+        return self.samplers[0].rng
+
+    @property
+    def missing(self):
+        """在所有分片中都找不到的约束标签"""
+        return self.plan.missing if self.plan is not None else []
+
+    def seed(self, seed):
+        for offset, sampler in enumerate(self.samplers):
+            sampler.seed(None if seed is None else seed + offset)
+
+    def sample(self, k, rng=None):
+        library = self.library
+        offsets = library.offsets
+        quotas = [k] + [shard.quota for shard in library.shards[1:]]
+        picked = []
+        accept = None
+        if self.plan is not None:
+            for index in self.plan.required:
+                quotas[library.locate(index)[0]] -= 1
+                picked.append(index)
+            # 所有分片共用一个 accept，互斥组的占用跨分片生效
+            accept = self.plan.acceptor()
+        for shard_no, sampler in enumerate(self.samplers):
+            quota = quotas[shard_no]
+            if quota > 0:
+                base = offsets[shard_no]
+                if accept is None:
+                    local = sampler.sample(quota, rng)
+                else:
+                    local = sampler.sample(quota, rng, lambda index, base=base: accept(base + index))
+                picked.extend(base + index for index in local)
+        return picked
+
+    def close(self):
+        for sampler in self.samplers:
+            close = getattr(sampler, 'close', None)
+            if close is not None:
+                close()
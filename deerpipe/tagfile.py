@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+tags.txt 的流式读写
+写入先进入同目录下的临时文件，fsync 后用 os.replace 原子替换，
+保存中途崩溃时生成器读到的仍是完整的旧文件；
+合并时逐块读取旧文件、逐个写出，不会把整个旧文件拼成一个字符串
+"""
+
+import os
+import stat
+import tempfile
+import time
+
+from .library import split_tag
+from .tagset import TagSet, MERGE_MAX, format_tag, merge_count, normalize_name
+
+READ_CHUNK = 64 * 1024
+WRITE_BUFFER = 64 * 1024
+REPLACE_RETRIES = 5       # Windows 上目标文件正被读取时 os.replace 会失败，稍后重试
+REPLACE_RETRY_DELAY = 0.05
+
+
+def iter_tag_file(path, separator=',', chunk_size=READ_CHUNK):
+    """逐块读取标签文件，依次产出去除首尾空白后的 "name (count)" 文本"""
+    delimiter = separator.strip() or separator
+    with open(path, 'r', encoding='utf-8') as f:
+        tail = ''
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            parts = (tail + chunk).split(delimiter)
+            tail = parts.pop()
+            for part in parts:
+                part = part.strip()
+                if part:
+                    yield part
+        tail = tail.strip()
+        if tail:
+            yield tail
+
+
+def _default_mode():
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+class AtomicTagWriter:
+    """
+    with 语句中逐个写入标签，正常退出时原子替换目标文件，出错时删除临时文件
+    新文件的权限沿用被替换的文件
+    """
+
+    def __init__(self, path, separator=', ', buffer_size=WRITE_BUFFER):
+        self.path = os.path.abspath(path)
+        self.separator = separator
+        self.buffer_size = buffer_size
+        self.count = 0
+        self.file = None
+        self.temp_path = None
+
+    def __enter__(self):
+        directory, name = os.path.split(self.path)
+        fd, self.temp_path = tempfile.mkstemp(prefix=f".{name}.", suffix='.tmp', dir=directory)
+        self.file = os.fdopen(fd, 'w', encoding='utf-8', newline='', buffering=self.buffer_size)
+        return self
+
+    def write(self, tag):
+        if self.count:
+            self.file.write(self.separator)
+        self.file.write(tag)
+        self.count += 1
+
+    def write_all(self, tags):
+        for tag in tags:
+            self.write(tag)
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.file.close()
+            self._discard()
+            return False
+        try:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.close()
+            try:
+                mode = stat.S_IMODE(os.stat(self.path).st_mode)
+            except FileNotFoundError:
+                mode = _default_mode()
+            os.chmod(self.temp_path, mode)
+            self._replace()
+        except BaseException:
+            self.file.close()
+            self._discard()
+            raise
+        return False
+
+    def _replace(self):
+        for attempt in range(REPLACE_RETRIES):
+            try:
+                os.replace(self.temp_path, self.path)
+                break
+            except PermissionError:
+                if attempt == REPLACE_RETRIES - 1:
+                    raise
+                time.sleep(REPLACE_RETRY_DELAY)
+        if hasattr(os, 'O_DIRECTORY'):
+            # 让目录项的更新也落盘（仅 POSIX）
+            try:
+                fd = os.open(os.path.dirname(self.path), os.O_RDONLY | os.O_DIRECTORY)
+            except OSError:
+                return
+            try:
+                os.fsync(fd)
+            except OSError:
+                pass
+            finally:
+                os.close(fd)
+
+    def _discard(self):
+        try:
+            os.remove(self.temp_path)
+        except OSError:
+            pass
+
+
+def write_tags(path, tags, separator=', '):
+    """把 "name (count)" 序列原子地写入 path，返回写出的标签数"""
+    with AtomicTagWriter(path, separator) as writer:
+        writer.write_all(tags)
+    return writer.count
+
+
+def merge_tags(path, pairs, separator=', ', policy=MERGE_MAX):
+    """
+    把新提取的 (name, count) 合并进已有的标签文件
+    旧标签保持原有顺序，同名（规范化后）标签按合并策略更新计数，
+    旧文件中的重复项只保留第一个，新标签追加在末尾；文件不存在时等同于直接写入
+    返回 (更新数, 新增数, 总数)
+    """
+    incoming = TagSet(pairs, policy)
+    if not os.path.exists(path):
+        total = write_tags(path, incoming.tags(), separator)
+        return 0, total, total
+
+    updated = 0
+    seen = set()
+    with AtomicTagWriter(path, separator) as writer:
+        for raw in iter_tag_file(path, separator):
+            name, count = split_tag(raw)
+            key = normalize_name(name)
+            if key in seen:
+                continue
+            seen.add(key)
+            item = incoming.pop(name)
+            if item is not None:
+                merged = merge_count(count, item[1], policy)
+                if merged != count:
+                    updated += 1
+                count = merged
+            writer.write(format_tag(name, count))
+        added = len(incoming)
+        writer.write_all(incoming.tags())
+    return updated, added, writer.count
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+有序标签集合
+按规范化后的标签名 O(1) 去重，保持首次出现顺序，
+同一标签在不同页面计数不同时按合并策略处理
+"""
+
+# 合并策略
+MERGE_MAX = 'max'        # 保留较大的计数
+MERGE_LATEST = 'latest'  # 保留最后一次出现的计数
+MERGE_SUM = 'sum'        # 计数求和
+MERGE_POLICIES = (MERGE_MAX, MERGE_LATEST, MERGE_SUM)
+
+_SUFFIXES = {'K': 1000, 'M': 1000000}
+
+
+def normalize_name(name):
+    """标签名规范化：合并空白并忽略大小写"""
+    return ' '.join(name.split()).casefold()
+
+
+def parse_count(text):
+    """把 "203K" / "1.2M" / "567" 形式的计数转换为整数，无法解析时返回 0"""
+    if not text:
+        return 0
+    text = text.strip().replace(',', '')
+    multiplier = 1
+    if text and text[-1].upper() in _SUFFIXES:
+        multiplier = _SUFFIXES[text[-1].upper()]
+        text = text[:-1]
+    try:
+        return int(float(text) * multiplier)
+    except ValueError:
+        return 0
+
+
+def format_count(value):
+    """把整数计数格式化为标签页使用的简写形式"""
+    if value >= 1000000:
+        return f"{value / 1000000:.1f}".rstrip('0').rstrip('.') + 'M'
+    if value >= 1000:
+        return f"{round(value / 1000)}K"
+    return str(value)
+
+
+def merge_count(old, new, policy=MERGE_MAX):
+    """按合并策略合并两个计数文本（None 表示没有计数）"""
+    if new is None:
+        return old
+    if old is None or policy == MERGE_LATEST:
+        return new
+    if policy == MERGE_MAX:
+        return new if parse_count(new) > parse_count(old) else old
+    return format_count(parse_count(old) + parse_count(new))
+
+
+def format_tag(name, count):
+    """组装为 tags.txt 使用的 "name (count)" 格式"""
+    if count is not None:
+        return f"{name} ({count})"
+    return name
+
+
+class TagSet:
+    """
+    保持插入顺序的标签集合
+    元素为 (name, count)，count 为原始计数文本或 None
+    """
+
+    def __init__(self, pairs=(), policy=MERGE_MAX):
+        if policy not in MERGE_POLICIES:
+            raise ValueError(f"未知的合并策略: {policy}")
+        self.policy = policy
+        self._items = {}    # 规范化名称 -> [name, count]
+        self.update(pairs)
+
+    def add(self, name, count=None):
+        """添加一个标签，返回是否为新标签"""
+        name = name.strip()
+        if not name:
+            return False
+        key = normalize_name(name)
+        item = self._items.get(key)
+        if item is None:
+            self._items[key] = [name, count]
+            return True
+        item[1] = merge_count(item[1], count, self.policy)
+        return False
+
+    def update(self, pairs):
+        """批量添加 (name, count)"""
+        add = self.add
+        for name, count in pairs:
+            add(name, count)
+
+    def merge(self, other):
+        """合并另一个 TagSet"""
+        self.update(other)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        for name, count in self._items.values():
+            yield name, count
+
+    def __contains__(self, name):
+        return normalize_name(name) in self._items
+
+    def pop(self, name, default=None):
+        """按标签名取出并移除 (name, count)，不存在时返回 default"""
+        item = self._items.pop(normalize_name(name), None)
+        return default if item is None else tuple(item)
+
+    def get(self, name, default=None):
+        """按标签名查询计数文本"""
+        item = self._items.get(normalize_name(name))
+        return default if item is None else item[1]
+
+    def tags(self):
+        """按顺序返回 "name (count)" 字符串列表"""
+        return [format_tag(name, count) for name, count in self._items.values()]
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+虚拟列表的数据层
+结果始终保存在内存中的标签列表里，控件只按行号取出可见的那几行；
+过滤按块推进（由 GUI 的 root.after 驱动），百万级结果时界面也不会卡住
+"""
+
+from array import array
+
+FILTER_CHUNK = 50000  # 每次 step 检查的标签数
+
+
+class TagView:
+    """
+    标签列表上的可过滤视图
+    未设置过滤词时直接映射到原列表；设置后匹配项的下标逐块写入 matches，
+    新的过滤词包含旧的过滤词且旧过滤已完成时，只在旧的匹配项中继续筛选
+    """
+
+    __slots__ = ('tags', 'query', 'matches', 'source', 'position')
+
+    def __init__(self, tags=()):
+        self.tags = tags
+        self.query = ''
+        self.matches = None   # None 表示不过滤
+        self.source = None    # 候选下标，None 表示全部标签
+        self.position = 0
+
+    def set_query(self, query):
+        """设置过滤词（忽略大小写的子串匹配），需随后调用 step 推进"""
+        query = query.strip().casefold()
+        previous, matches, finished = self.query, self.matches, self.done
+        self.query = query
+        self.position = 0
+        if not query:
+            self.matches = self.source = None
+            return
+        if previous and previous in query and matches is not None and finished:
+            self.source = matches
+        else:
+            self.source = None
+        self.matches = array('I')
+
+    @property
+    def pending(self):
+        """还需要检查的候选数"""
+        if self.matches is None:
+            return 0
+        total = len(self.tags) if self.source is None else len(self.source)
+        return total - self.position
+
+    @property
+    def done(self):
+        return self.pending == 0
+
+    def step(self, budget=FILTER_CHUNK):
+        """检查下一块候选，返回过滤是否已完成"""
+        if self.matches is None:
+            return True
+        start = self.position
+        tags, query = self.tags, self.query
+        if self.source is None:
+            stop = min(start + budget, len(tags))
+            self.matches.extend(i for i in range(start, stop) if query in tags[i].casefold())
+        else:
+            source = self.source
+            stop = min(start + budget, len(source))
+            self.matches.extend(i for i in source[start:stop] if query in tags[i].casefold())
+        self.position = stop
+        return self.done
+
+    def run(self):
+        """一次性完成过滤（无界面时使用）"""
+        while not self.step():
+            pass
+        return self
+
+    def __len__(self):
+        if self.matches is None:
+            return len(self.tags)
+        return len(self.matches)
+
+    def rows(self, start, stop):
+        """第 start 到 stop 行的标签"""
+        if self.matches is None:
+            return self.tags[start:stop]
+        tags = self.tags
+        return [tags[i] for i in self.matches[start:stop]]
+
+    def selected(self):
+        """当前视图中的全部标签（过滤未完成时只包含已匹配的部分）"""
+        return self.rows(0, len(self))
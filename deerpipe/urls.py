@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+搜索 URL 构建
+标签名在加载标签库时按查询串规则百分号编码一次，
+生成 URL 时只需按 (base_url, sort_param) 模板把缓存的片段拼接起来
+"""
+
+QUERY_PREFIX = 'tag:'
+TAG_SEPARATOR = ', '
+
+# 与 urllib.parse.quote(safe='') 相同的编码表；不导入 urllib.parse 以缩短启动时间
+_UNRESERVED = frozenset(b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_.-~')
+_QUOTE = [chr(b) if b in _UNRESERVED else f'%{b:02X}' for b in range(256)]
+_QUOTE_PLUS = list(_QUOTE)
+_QUOTE_PLUS[ord(' ')] = '+'
+
+
+def quote(text):
+    """百分号编码（空格编码为 %20）"""
+    return ''.join([_QUOTE[b] for b in text.encode('utf-8')])
+
+
+def quote_plus(text):
+    """查询串编码（空格编码为 +），等价于 urllib.parse.quote_plus(text, safe='')"""
+    return ''.join([_QUOTE_PLUS[b] for b in text.encode('utf-8')])
+
+
+def encode_fragment(name):
+    """
+    标签名在查询串中的编码形式
+    空格编码为 '+'，& # / : , 以及非 ASCII 字符全部百分号编码
+    """
+    if name.isascii() and (name.isalnum() or name.replace(' ', '').isalnum()):
+        return name.replace(' ', '+')
+    return quote_plus(name)
+
+
+_ENCODED_SEPARATOR = quote_plus(TAG_SEPARATOR)   # '%2C+'
+
+
+_templates = {}
+
+
+def url_template(base_url, sort_param, prefix=QUERY_PREFIX):
+    """返回 (前缀, 分隔符, 后缀)，拼接片段即可得到完整 URL；按参数缓存"""
+    key = (base_url, sort_param, prefix)
+    template = _templates.get(key)
+    if template is None:
+        if len(_templates) >= 64:
+            _templates.clear()
+        head = f"{base_url}?q={quote_plus(prefix)}"
+        tail = f"&sort={quote(sort_param)}"
+        template = _templates[key] = (head, _ENCODED_SEPARATOR, tail)
+    return template
+
+
+def join_fragments(fragments, base_url, sort_param, prefix=QUERY_PREFIX):
+    """把已编码的标签片段拼接为完整 URL"""
+    head, separator, tail = url_template(base_url, sort_param, prefix)
+    return head + separator.join(fragments) + tail
+
+
+def join_groups(groups, base_url, sort_param):
+    """
+    多个前缀分组的 URL，例如 tag:a, b artist:c
+    groups 为 [(前缀, 已编码片段列表)]；只有一个分组时与 join_fragments 结果相同
+    """
+    head, separator, tail = url_template(base_url, sort_param, '')
+    query = '+'.join(quote_plus(prefix) + separator.join(fragments) for prefix, fragments in groups)
+    return head + query + tail
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+标签文件监视与后台重新加载
+通过轮询 mtime / 大小检测变化（由 GUI 的 root.after 驱动），
+在后台线程中重新解析，结果经队列交回主线程后整体替换，生成过程不会看到半加载的状态
+"""
+
+import queue
+import threading
+
+from .library import file_stamp
+from .metrics import METRICS
+
+
+class FileWatcher:
+    """
+    轮询式文件监视
+    变化后需要连续两次轮询保持一致才视为写入完成，避免读到写了一半的文件
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._stamp = file_stamp(path)
+        self._pending = None
+
+    def reset(self, path=None):
+        """切换监视的文件，或在主动加载后同步当前状态"""
+        if path is not None:
+            self.path = path
+        self._stamp = file_stamp(self.path)
+        self._pending = None
+
+    def poll(self):
+        """返回文件是否已发生（并稳定下来的）变化"""
+        stamp = file_stamp(self.path)
+        if stamp == self._stamp:
+            self._pending = None
+            return False
+        if stamp is None or stamp != self._pending:
+            self._pending = stamp
+            return False
+        self._stamp = stamp
+        self._pending = None
+        return True
+
+
+class BackgroundReloader:
+    """
+    在后台线程中重新加载标签库
+    结果以 ('ok', path, library, diff) 或 ('error', path, exception) 放入 self.results
+    """
+
+    def __init__(self):
+        self.results = queue.Queue()
+        self._thread = None
+        self._busy = False
+
+    @property
+    def busy(self):
+        """结果放入队列前即变为 False，取到结果后可以立即开始下一次加载"""
+        return self._busy
+
+    def start(self, library, path, loader=None):
+        """
+        开始重新加载；library 为当前标签库（为空时完整加载）
+        提供 loader 时在后台调用它，返回 (新标签库, diff)
+        """
+        if self.busy:
+            return False
+        self._busy = True
+        self._thread = threading.Thread(target=self._run, args=(library, path, loader), daemon=True)
+        self._thread.start()
+        return True
+
+    def _run(self, library, path, loader=None):
+        from .library import TagLibrary
+
+        try:
+            with METRICS.timer('library.load'):
+                if loader is not None:
+                    new_library, diff = loader()
+                elif library is not None and len(library) and library.path == path:
+                    new_library, diff = library.reload(path)
+                else:
+                    new_library, diff = TagLibrary.load(path), None
+            result = ('ok', path, new_library, diff)
+        except Exception as e:
+            result = ('error', path, e)
+        self._busy = False
+        self.results.put(result)
+
+    def poll(self):
+        """非阻塞地取出一个结果，没有时返回 None"""
+        try:
+            return self.results.get_nowait()
+        except queue.Empty:
+            return None
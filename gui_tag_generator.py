@@ -6,9 +6,22 @@
 """
 
 import random
+import threading
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
-import webbrowser
+from tkinter import ttk, messagebox
+import os
+
+from deerpipe.constraints import TagConstraints, ConstrainedSampler, parse_tag_list
+from deerpipe.cooccur import CooccurrenceIndex, COOCCUR_SUFFIX
+from deerpipe.generator import build_url, sample_alive, SORT_OPTIONS
+from deerpipe.library import TagLibrary
+from deerpipe.metrics import METRICS
+from deerpipe.resultcache import ResultCache, query_key
+from deerpipe.sampling import TagSampler, SAMPLE_UNIFORM, SAMPLE_WEIGHTED, SAMPLE_TEMPERED
+from deerpipe.schedule import ShuffleScheduler, ComboHistory, BAG_SUFFIX
+from deerpipe.search import TagIndex
+from deerpipe.shards import Shard, ShardedLibrary, ShardedSampler, shard_sampler, DEFAULT_KIND
+from deerpipe.watch import FileWatcher, BackgroundReloader
 
 # ==================== 配置区域 ====================
 CONFIG = {
@@ -16,6 +29,40 @@ CONFIG = {
     'base_url': 'https://nhentai.net/search/',
     'tag_count': 3,
     'sort_param': 'popular-week',
+    'sample_mode': SAMPLE_UNIFORM,   # uniform / weighted / tempered
+    'temper_alpha': 0.5,             # tempered 模式下的指数 α
+    'random_seed': None,             # 设置为整数可复现抽样结果
+    'min_hits': 1,                   # 共现索引估计命中数低于此值的组合会被重抽，0 为不检查
+    'result_cache_file': 'search_cache.sqlite',  # 记录已知无结果的组合，None 为不使用
+    'watch_interval_ms': 2000,       # 检查标签文件变化的间隔，0 为不自动重新加载
+    'exclude_tags': [],              # 不会被抽到的标签，例如 ['yaoi']
+    'require_tags': [],              # 每个组合都包含的标签
+    'exclusive_groups': [],          # 互斥组，每组至多选一个，例如 [['yaoi', 'yuri']]
+    'no_repeat': False,              # 洗牌袋模式：按不重复的顺序轮流取标签（忽略采样方式），进度保存在 tags.txt.bag
+    'no_repeat_window': 50,          # 洗牌袋模式下同一标签两次出现之间至少间隔的抽取数
+    'combo_history_file': 'combo_history.bin',  # 最近出现过的组合，None 为不记录
+    'combo_repeat_days': 7,          # 同一组合在多少天内不重复
+    # 额外的标签库分片，每个组合另外从中抽取 quota 个，URL 中使用对应的前缀（artist: / parody: / character: ...）
+    # 例如 [{'kind': 'artist', 'file': 'artists.txt', 'quota': 1}]；“标签数量”为主标签文件中抽取的数量
+    'extra_shards': [],
+    'search_limit': 20,              # 搜索框最多显示的结果数
+}
+
+# 采样方式（显示名称 -> 模式）
+SAMPLE_OPTIONS = {
+    '均匀': SAMPLE_UNIFORM,
+    '按热度': SAMPLE_WEIGHTED,
+    '温和加权': SAMPLE_TEMPERED,
+}
+
+# 统计栏展示的性能阶段
+PERF_STAGES = ('library.load', 'search.query', 'generate.sample', 'generate.encode', 'generate.render')
+PERF_LABELS = {
+    'library.load': '加载',
+    'search.query': '搜索',
+    'generate.sample': '抽样',
+    'generate.encode': '编码',
+    'generate.render': '渲染',
 }
 # ================================================
 
@@ -24,14 +71,46 @@ class TagGeneratorGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("随机标签生成器")
-        self.root.geometry("700x600")
+        self.root.geometry("700x860")
         self.root.resizable(True, True)
         
-        self.tags = []
+        self.library = TagLibrary()
+        self.samplers = {}
+        self.constrained = None          # ((采样方式, 约束, 是否洗牌袋), ConstrainedSampler)
+        self.sharded = None              # ((采样方式, 约束, 是否洗牌袋), ShardedSampler)
+        self.scheduler = None
+        self.cooccur = None
+        self.rng = random.Random(CONFIG['random_seed'])
         self.current_url = ""
+        self.current_names = []
+        self.current_sort = ""
+        self.search_index = None
+        self.search_error = None
+        self.search_results = []
+        self.result_cache = None
+        if CONFIG['result_cache_file']:
+            try:
+                self.result_cache = ResultCache(CONFIG['result_cache_file'])
+            except Exception:
+                self.result_cache = None
+        self.history = None
+        if CONFIG['combo_history_file']:
+            try:
+                self.history = ComboHistory(CONFIG['combo_history_file'], CONFIG['combo_repeat_days'])
+            except Exception:
+                self.history = None
+        
+        self.watcher = FileWatcher(CONFIG['tags_file'])
+        self.shard_watchers = [FileWatcher(shard['file']) for shard in CONFIG['extra_shards']]
+        self.reloader = BackgroundReloader()
+        self.reload_notify = False
+        # 加载进行中又收到的加载请求 (文件名, 是否提示)，当前加载完成后再执行
+        self.reload_pending = None
         
         self.create_widgets()
         self.load_tags_auto()
+        if CONFIG['watch_interval_ms'] > 0:
+            self.root.after(CONFIG['watch_interval_ms'], self.poll_tag_file)
     
     def create_widgets(self):
         """创建GUI组件"""
@@ -63,13 +142,60 @@ class TagGeneratorGUI:
         # 排序参数（下拉选择）
         ttk.Label(config_frame, text="排序方式:").grid(row=3, column=0, sticky=tk.W, pady=5)
         self.sort_combobox = ttk.Combobox(config_frame, width=18, state="readonly")
-        self.sort_combobox['values'] = ('popular-today', 'popular-week', 'popular')
+        self.sort_combobox['values'] = SORT_OPTIONS
         self.sort_combobox.set(CONFIG['sort_param'])
         self.sort_combobox.grid(row=3, column=1, sticky=tk.W, padx=5, pady=5)
         
+        # 采样方式
+        ttk.Label(config_frame, text="采样方式:").grid(row=4, column=0, sticky=tk.W, pady=5)
+        self.sample_combobox = ttk.Combobox(config_frame, width=18, state="readonly")
+        self.sample_combobox['values'] = tuple(SAMPLE_OPTIONS)
+        self.sample_combobox.set(next(k for k, v in SAMPLE_OPTIONS.items() if v == CONFIG['sample_mode']))
+        self.sample_combobox.grid(row=4, column=1, sticky=tk.W, padx=5, pady=5)
+        
+        self.no_repeat_var = tk.BooleanVar(value=CONFIG['no_repeat'])
+        ttk.Checkbutton(config_frame, text="不重复（洗牌袋）", variable=self.no_repeat_var).grid(row=4, column=2, columnspan=2, sticky=tk.W, padx=5, pady=5)
+        
         # 状态标签
         self.status_label = ttk.Label(config_frame, text="等待加载标签文件...", foreground="gray")
-        self.status_label.grid(row=4, column=0, columnspan=4, sticky=tk.W, pady=5)
+        self.status_label.grid(row=5, column=0, columnspan=4, sticky=tk.W, pady=5)
+        
+        # 约束框架
+        constraint_frame = ttk.LabelFrame(self.root, text="约束（逗号分隔标签，互斥组之间用分号分隔）", padding=10)
+        constraint_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        ttk.Label(constraint_frame, text="排除标签:").grid(row=0, column=0, sticky=tk.W, pady=2)
+        self.exclude_entry = ttk.Entry(constraint_frame, width=60)
+        self.exclude_entry.insert(0, ', '.join(CONFIG['exclude_tags']))
+        self.exclude_entry.grid(row=0, column=1, sticky=tk.W, padx=5, pady=2)
+        
+        ttk.Label(constraint_frame, text="必选标签:").grid(row=1, column=0, sticky=tk.W, pady=2)
+        self.require_entry = ttk.Entry(constraint_frame, width=60)
+        self.require_entry.insert(0, ', '.join(CONFIG['require_tags']))
+        self.require_entry.grid(row=1, column=1, sticky=tk.W, padx=5, pady=2)
+        
+        ttk.Label(constraint_frame, text="互斥组:").grid(row=2, column=0, sticky=tk.W, pady=2)
+        self.groups_entry = ttk.Entry(constraint_frame, width=60)
+        self.groups_entry.insert(0, '; '.join(', '.join(group) for group in CONFIG['exclusive_groups']))
+        self.groups_entry.grid(row=2, column=1, sticky=tk.W, padx=5, pady=2)
+        
+        # 搜索框架 - 输入即搜，可把结果加入必选 / 排除
+        search_frame = ttk.LabelFrame(self.root, text="搜索标签（双击加入必选）", padding=10)
+        search_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        search_bar = ttk.Frame(search_frame)
+        search_bar.pack(fill=tk.X)
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add('write', lambda *args: self.run_search())
+        ttk.Entry(search_bar, textvariable=self.search_var, width=30).pack(side=tk.LEFT, padx=5)
+        ttk.Button(search_bar, text="➕ 必选", command=lambda: self.pin_selected(self.require_entry)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(search_bar, text="➖ 排除", command=lambda: self.pin_selected(self.exclude_entry)).pack(side=tk.LEFT, padx=5)
+        self.search_status = ttk.Label(search_bar, text="", foreground="gray")
+        self.search_status.pack(side=tk.LEFT, padx=5)
+        
+        self.search_listbox = tk.Listbox(search_frame, height=6)
+        self.search_listbox.pack(fill=tk.X, pady=(5, 0))
+        self.search_listbox.bind('<Double-Button-1>', lambda event: self.pin_selected(self.require_entry))
         
         # 中间框架 - 生成按钮
         button_frame = ttk.Frame(self.root, padding=10)
@@ -80,6 +206,8 @@ class TagGeneratorGUI:
         
         ttk.Button(button_frame, text="🔗 在浏览器中打开", command=self.open_in_browser).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="📋 复制URL", command=self.copy_url).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="🚫 标记无结果", command=self.mark_empty).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="📈 导出性能数据", command=self.export_metrics).pack(side=tk.LEFT, padx=5)
         
         # 结果框架 - 显示选中的标签
         result_frame = ttk.LabelFrame(self.root, text="随机选择的标签", padding=10)
@@ -104,6 +232,8 @@ class TagGeneratorGUI:
     
     def browse_file(self):
         """浏览文件"""
+        from tkinter import filedialog
+        
         filename = filedialog.askopenfilename(
             title="选择标签文件",
             filetypes=[("文本文件", "*.txt"), ("所有文件", "*.*")]
@@ -117,88 +247,352 @@ class TagGeneratorGUI:
         """自动加载默认标签文件"""
         try:
             filename = self.file_entry.get()
-            with open(filename, 'r', encoding='utf-8') as f:
-                content = f.read()
-                self.tags = [tag.strip() for tag in content.split(',') if tag.strip()]
+            self.watcher.reset(filename)
+            with METRICS.profiled('load_tags'), METRICS.timer('library.load'):
+                if CONFIG['extra_shards']:
+                    library = ShardedLibrary.load(self.shard_specs(filename))
+                else:
+                    library = TagLibrary.load(filename)
+            self.set_library(library)
             
-            if self.tags:
-                self.status_label.config(text=f"✓ 成功加载 {len(self.tags)} 个标签", foreground="green")
+            if len(self.library):
+                self.status_label.config(text=f"✓ 成功加载 {len(self.library)} 个标签", foreground="green")
                 self.generate_btn.config(state=tk.NORMAL)
                 self.update_stats()
             else:
                 self.status_label.config(text="⚠ 文件为空", foreground="orange")
-        except FileNotFoundError:
-            self.status_label.config(text=f"⚠ 找不到文件: {filename}", foreground="orange")
+        except FileNotFoundError as e:
+            # 配置了分片时缺失的可能是某个分片文件
+            self.status_label.config(text=f"⚠ 找不到文件: {e.filename or filename}", foreground="orange")
         except Exception as e:
             self.status_label.config(text=f"❌ 加载失败: {str(e)}", foreground="red")
     
     def load_tags(self):
-        """加载标签文件"""
+        """加载标签文件（在后台线程中解析，完成后提示）"""
         filename = self.file_entry.get()
-        try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                content = f.read()
-                self.tags = [tag.strip() for tag in content.split(',') if tag.strip()]
+        self.watcher.reset(filename)
+        self.start_reload(filename, notify=True)
+    
+    def poll_tag_file(self):
+        """定期检查标签文件是否变化，变化后在后台重新加载"""
+        changed = self.watcher.poll()
+        changed = any([watcher.poll() for watcher in self.shard_watchers]) or changed
+        if changed:
+            self.start_reload(self.watcher.path, notify=False)
+        self.root.after(CONFIG['watch_interval_ms'], self.poll_tag_file)
+    
+    def start_reload(self, filename, notify):
+        """启动后台加载；当前标签库在加载完成前继续可用"""
+        loader = None
+        if CONFIG['extra_shards']:
+            # 各分片并发加载，文件未变化的分片直接复用
+            specs = self.shard_specs(filename)
+            previous = self.library if isinstance(self.library, ShardedLibrary) else None
             
-            if self.tags:
-                self.status_label.config(text=f"✓ 成功加载 {len(self.tags)} 个标签", foreground="green")
-                self.generate_btn.config(state=tk.NORMAL)
-                self.update_stats()
-                messagebox.showinfo("成功", f"成功加载 {len(self.tags)} 个标签！")
+            def loader():
+                return ShardedLibrary.load(specs, previous), None
+        if not self.reloader.start(self.library, filename, loader):
+            # 正在加载：记下请求，当前加载完成后用最新的文件再加载一次
+            if self.reload_pending is not None:
+                notify = notify or self.reload_pending[1]
+            self.reload_pending = (filename, notify)
+            if notify:
+                self.status_label.config(text="正在加载中，完成后将重新加载...", foreground="orange")
+            return
+        self.reload_notify = notify
+        self.status_label.config(text=f"正在加载 {os.path.basename(filename)}...", foreground="orange")
+        self.root.after(50, self.check_reload)
+    
+    def check_reload(self):
+        """轮询后台加载结果，完成后在主线程中整体替换标签库"""
+        result = self.reloader.poll()
+        if result is None:
+            self.root.after(50, self.check_reload)
+            return
+        try:
+            self.apply_reload(result)
+        finally:
+            pending, self.reload_pending = self.reload_pending, None
+            if pending is not None:
+                self.start_reload(*pending)
+    
+    def apply_reload(self, result):
+        """在主线程中应用一次后台加载的结果"""
+        notify = self.reload_notify
+        if result[0] == 'error':
+            _, filename, error = result
+            if isinstance(error, FileNotFoundError):
+                message = f"找不到文件: {error.filename or filename}"
             else:
-                self.status_label.config(text="⚠ 文件为空", foreground="orange")
+                message = f"加载失败: {str(error)}"
+            self.status_label.config(text=f"❌ {message}", foreground="red")
+            if notify:
+                messagebox.showerror("错误", message)
+            return
+        
+        _, filename, library, diff = result
+        self.set_library(library, diff)
+        if len(self.library):
+            if diff is not None and diff.incremental:
+                detail = f"（更新 {len(diff.changed)} 个，新增 {len(diff.appended)} 个）"
+            else:
+                detail = ""
+            self.status_label.config(text=f"✓ 成功加载 {len(self.library)} 个标签{detail}", foreground="green")
+            self.generate_btn.config(state=tk.NORMAL)
+            self.update_stats()
+            if notify:
+                messagebox.showinfo("成功", f"成功加载 {len(self.library)} 个标签！")
+        else:
+            self.generate_btn.config(state=tk.DISABLED)
+            self.status_label.config(text="⚠ 文件为空", foreground="orange")
+            if notify:
                 messagebox.showwarning("警告", "标签文件为空！")
-        except FileNotFoundError:
-            self.status_label.config(text=f"❌ 找不到文件: {filename}", foreground="red")
-            messagebox.showerror("错误", f"找不到文件: {filename}")
-        except Exception as e:
-            self.status_label.config(text=f"❌ 加载失败: {str(e)}", foreground="red")
-            messagebox.showerror("错误", f"加载失败: {str(e)}")
+    
+    def set_library(self, library, diff=None):
+        """
+        切换标签库，并加载旁边的共现索引（如果有）
+        提供 diff 时在已有采样表上增量更新，而不是全部重建
+        """
+        self.library = library
+        self.constrained = None
+        if self.sharded is not None:
+            self.sharded[1].close()
+            self.sharded = None
+        if self.scheduler is not None:
+            self.scheduler.close()
+            self.scheduler = None
+        if diff is None:
+            self.samplers = {}
+        else:
+            self.samplers = {mode: sampler for mode, sampler in self.samplers.items()
+                             if sampler.apply_diff(library, diff)}
+        if self.cooccur is not None:
+            self.cooccur.close()
+            self.cooccur = None
+        self.build_search_index(library)
+        if isinstance(library, ShardedLibrary):
+            return  # 共现索引只覆盖单个标签文件
+        index_path = library.path + COOCCUR_SUFFIX
+        if CONFIG['min_hits'] > 0 and os.path.exists(index_path):
+            try:
+                self.cooccur = CooccurrenceIndex(index_path, library)
+            except ValueError:
+                self.cooccur = None  # 索引与标签库不匹配时忽略
+    
+    def build_search_index(self, library):
+        """在后台线程中为新的标签库建立搜索索引，完成前搜索框显示提示"""
+        self.search_index = None
+        self.search_error = None
+        if not len(library):
+            self.run_search()
+            return
+        self.search_status.config(text="正在建立搜索索引...", foreground="gray")
+        result = {}
+        
+        def build():
+            try:
+                with METRICS.timer('search.build'):
+                    result['index'] = TagIndex(library)
+            except Exception as e:
+                result['error'] = e
+        thread = threading.Thread(target=build, daemon=True)
+        thread.start()
+        self.root.after(50, self.check_search_index, thread, library, result)
+    
+    def check_search_index(self, thread, library, result):
+        """索引建立完成后启用搜索（失败时显示原因）；期间标签库已被替换时丢弃"""
+        if thread.is_alive():
+            self.root.after(50, self.check_search_index, thread, library, result)
+            return
+        if library is not self.library:
+            return
+        self.search_index = result.get('index')
+        if 'error' in result:
+            self.search_error = f"❌ 搜索索引建立失败: {str(result['error'])}"
+        self.run_search()
+    
+    def run_search(self):
+        """按当前输入刷新搜索结果（前缀 > 子串 > 容错，层内按计数排序）"""
+        self.search_listbox.delete(0, tk.END)
+        self.search_results = []
+        query = self.search_var.get().strip()
+        index = self.search_index
+        if index is None:
+            if self.search_error:
+                self.search_status.config(text=self.search_error, foreground="red")
+            else:
+                self.search_status.config(text="正在建立搜索索引..." if len(self.library) else "", foreground="gray")
+            return
+        if not query:
+            self.search_status.config(text=f"{len(index)} 个标签可搜索")
+            return
+        
+        library = index.library
+        with METRICS.timer('search.query'):
+            self.search_results = index.search(query, CONFIG['search_limit'])
+        sharded = isinstance(library, ShardedLibrary)
+        for i in self.search_results:
+            label = library.display(i)
+            if sharded and library.kind(i) != DEFAULT_KIND:
+                label = f"{library.kind(i)}: {label}"
+            self.search_listbox.insert(tk.END, label)
+        exact = "  ✓ 存在" if index.find(query) is not None else ""
+        self.search_status.config(text=f"{len(self.search_results)} 个结果  {METRICS.last('search.query') * 1000:.2f} ms{exact}")
+    
+    def pin_selected(self, entry):
+        """把选中的搜索结果加入必选 / 排除输入框"""
+        selection = self.search_listbox.curselection()
+        if not selection or self.search_index is None:
+            return
+        name = self.search_index.library.name(self.search_results[selection[0]])
+        names = parse_tag_list(entry.get())
+        if name.casefold() in (n.casefold() for n in names):
+            return
+        entry.delete(0, tk.END)
+        entry.insert(0, ', '.join(names + [name]))
     
     def generate_tags(self):
         """生成随机标签"""
-        if not self.tags:
+        library = self.library
+        if not len(library):
             messagebox.showwarning("警告", "请先加载标签文件！")
             return
         
         try:
             count = int(self.count_spinbox.get())
-            if count > len(self.tags):
-                messagebox.showwarning("警告", f"标签数量不足！只有 {len(self.tags)} 个标签")
-                count = len(self.tags)
+            # 有约束时可选的标签数可能少于标签库大小
+            available = len(self.get_sampler())
+            if count > available:
+                messagebox.showwarning("警告", f"标签数量不足！只有 {available} 个标签可选")
+                count = available
             
-            # 随机选择标签（保留完整的标签包括计数）
-            selected_tags_with_count = random.sample(self.tags, count)
+            with METRICS.profiled('generate_tags'):
+                self.show_combo(library, count)
+            self.update_stats()
+        except Exception as e:
+            messagebox.showerror("错误", f"生成失败: {str(e)}")
+    
+    def show_combo(self, library, count):
+        """抽样、编码并显示一个组合，各阶段分别计时"""
+        sort_param = self.sort_combobox.get()
+        
+        with METRICS.timer('generate.sample'):
+            known_empty = None
+            if self.result_cache is not None:
+                known_empty = self.result_cache.empty_check(library, sort_param)
+            is_repeat = None
+            if self.history is not None:
+                is_repeat = self.history.repeat_check(library)
             
+            # 随机选择标签下标（采样表每个标签库只构建一次）
+            selected = sample_alive(self.get_sampler(), count, self.rng,
+                                    self.cooccur, CONFIG['min_hits'], known_empty=known_empty,
+                                    is_repeat=is_repeat)
+            if selected is None:
+                self.status_label.config(
+                    text=f"⚠ 最近 {CONFIG['combo_repeat_days']} 天内的组合都已出现过，未找到新的组合",
+                    foreground="orange")
+                return
+            if self.history is not None:
+                self.history.add([library.name(index) for index in selected])
+        
+        # 生成URL（使用加载时预先编码好的标签名片段）
+        with METRICS.timer('generate.encode'):
+            base_url = self.url_entry.get()
+            self.current_url = build_url(library, selected, base_url, sort_param)
+            self.current_names = [library.name(index) for index in selected]
+            self.current_sort = sort_param
+        
+        with METRICS.timer('generate.render'):
             # 显示标签（包含计数）
             self.tags_text.delete(1.0, tk.END)
-            for i, tag in enumerate(selected_tags_with_count, 1):
-                self.tags_text.insert(tk.END, f"Tag {i}: {tag}\n")
-            
-            # 生成URL（只使用标签名称，不包含计数）
-            base_url = self.url_entry.get()
-            sort_param = self.sort_combobox.get()
-            
-            # 提取纯标签名（去除括号中的计数）
-            selected_tags_clean = [self.extract_tag_name(tag) for tag in selected_tags_with_count]
-            
-            processed_tags = [tag.replace(' ', '+') for tag in selected_tags_clean]
-            tag_query = ', '.join(processed_tags)
-            query_string = f"tag:{tag_query}"
-            encoded_query = query_string.replace(' ', '+').replace(',', '%2C').replace(':', '%3A')
-            
-            self.current_url = f"{base_url}?q={encoded_query}&sort={sort_param}"
+            sharded = isinstance(library, ShardedLibrary)
+            for i, index in enumerate(selected, 1):
+                label = library.display(index)
+                if sharded and library.kind(index) != DEFAULT_KIND:
+                    label = f"{library.kind(index)}: {label}"
+                self.tags_text.insert(tk.END, f"Tag {i}: {label}\n")
+            if self.cooccur is not None:
+                hits = self.cooccur.estimate_hits(selected)
+                if hits is not None:
+                    self.tags_text.insert(tk.END, f"本地样本中同时出现: {hits} 次\n")
             
             # 显示URL
             self.url_text.delete(1.0, tk.END)
             self.url_text.insert(tk.END, self.current_url)
+        METRICS.incr('generate.combos')
+    
+    def get_constraints(self):
+        """约束输入框中的当前约束"""
+        return TagConstraints.from_text(self.exclude_entry.get(), self.require_entry.get(),
+                                        self.groups_entry.get())
+    
+    def shard_specs(self, filename):
+        """主标签文件与 CONFIG 中的额外分片（主分片的数量由“标签数量”决定）"""
+        return [Shard(DEFAULT_KIND, filename, 0)] + [
+            Shard(shard['kind'], shard['file'], shard.get('quota', 1)) for shard in CONFIG['extra_shards']]
+    
+    def get_sharded_sampler(self, mode, constraints, no_repeat):
+        """分片标签库的配额抽样器，每个分片各自构建（洗牌袋状态保存在各分片文件旁边），约束在整个组合上生效"""
+        key = (mode, constraints, no_repeat)
+        if self.sharded is None or self.sharded[0] != key:
+            if self.sharded is not None:
+                self.sharded[1].close()
             
-        except Exception as e:
-            messagebox.showerror("错误", f"生成失败: {str(e)}")
+            def factory(shard):
+                scheduler = None
+                if no_repeat:
+                    scheduler = ShuffleScheduler(shard.path + BAG_SUFFIX, shard.library,
+                                                 CONFIG['no_repeat_window'], CONFIG['random_seed'])
+                return shard_sampler(shard, mode, CONFIG['temper_alpha'], None, scheduler)
+            sampler = ShardedSampler(self.library, factory, constraints)
+            self.sharded = (key, sampler)
+            if sampler.missing:
+                self.status_label.config(text=f"⚠ 以下约束标签不在标签库中: {', '.join(sampler.missing)}",
+                                         foreground="orange")
+        return self.sharded[1]
+    
+    def get_scheduler(self):
+        """洗牌袋（状态保存在标签文件旁边，每个标签库打开一次）"""
+        if self.scheduler is None:
+            self.scheduler = ShuffleScheduler(self.library.path + BAG_SUFFIX, self.library,
+                                              CONFIG['no_repeat_window'], CONFIG['random_seed'])
+        return self.scheduler
+    
+    def get_sampler(self):
+        """
+        当前采样方式对应的采样器
+        勾选不重复时使用洗牌袋；设置了约束时使用按约束编译的采样器
+        """
+        mode = SAMPLE_OPTIONS.get(self.sample_combobox.get(), SAMPLE_UNIFORM)
+        no_repeat = self.no_repeat_var.get() and self.library.path is not None
+        constraints = self.get_constraints()
+        if isinstance(self.library, ShardedLibrary):
+            return self.get_sharded_sampler(mode, constraints, no_repeat)
+        if constraints:
+            key = (mode, constraints, no_repeat)
+            if self.constrained is None or self.constrained[0] != key:
+                base = self.get_scheduler() if no_repeat else None
+                sampler = ConstrainedSampler(self.library, constraints, mode, CONFIG['temper_alpha'],
+                                             base=base)
+                self.constrained = (key, sampler)
+                if sampler.missing:
+                    self.status_label.config(text=f"⚠ 以下约束标签不在标签库中: {', '.join(sampler.missing)}",
+                                             foreground="orange")
+            return self.constrained[1]
+        if no_repeat:
+            return self.get_scheduler()
+        
+        sampler = self.samplers.get(mode)
+        if sampler is None:
+            sampler = TagSampler.for_library(self.library, mode, CONFIG['temper_alpha'])
+            self.samplers[mode] = sampler
+        return sampler
     
     def open_in_browser(self):
         """在浏览器中打开URL"""
         if self.current_url:
+            import webbrowser  # 仅在打开链接时加载
             webbrowser.open(self.current_url)
         else:
             messagebox.showwarning("警告", "请先生成URL！")
@@ -212,16 +606,52 @@ class TagGeneratorGUI:
         else:
             messagebox.showwarning("警告", "请先生成URL！")
     
+    def mark_empty(self):
+        """把当前组合记录为无结果，之后生成时自动跳过"""
+        if not self.current_url:
+            messagebox.showwarning("警告", "请先生成URL！")
+            return
+        if self.result_cache is None:
+            messagebox.showwarning("警告", "未启用结果缓存！")
+            return
+        self.result_cache.put(query_key(self.current_names, self.current_sort), 0)
+        self.update_stats()
+    
     def update_stats(self):
         """更新统计信息"""
-        self.stats_label.config(text=f"📊 标签库: {len(self.tags)} 个标签")
-    
-    def extract_tag_name(self, tag_with_count):
-        """提取标签名称（去除括号中的计数）"""
-        # 如果包含括号，提取括号前的内容
-        if '(' in tag_with_count:
-            return tag_with_count.split('(')[0].strip()
-        return tag_with_count.strip()
+        text = f"📊 标签库: {len(self.library)} 个标签"
+        if isinstance(self.library, ShardedLibrary):
+            text += "（" + " / ".join(f"{shard.kind} {len(shard.library)}" for shard in self.library.shards) + "）"
+        if self.cooccur is not None:
+            text += f"  |  共现索引: {self.cooccur.n_docs} 个本子"
+        if self.result_cache is not None:
+            text += f"  |  结果缓存: {len(self.result_cache)} 条"
+        if self.history is not None:
+            text += f"  |  近期组合: {len(self.history)} 个"
+        perf = METRICS.summary(PERF_STAGES, PERF_LABELS)
+        if perf:
+            text += f"  |  ⏱ {perf}"
+        self.stats_label.config(text=text)
+    
+    def export_metrics(self):
+        """导出性能数据（*.trace.json 为 Chrome trace 格式，其余为指标快照）"""
+        from tkinter import filedialog  # 仅在导出时加载
+        filename = filedialog.asksaveasfilename(
+            title="导出性能数据",
+            defaultextension=".json",
+            filetypes=[("Chrome trace", "*.trace.json"), ("JSON", "*.json")],
+            initialfile="generator.trace.json"
+        )
+        if not filename:
+            return
+        try:
+            if filename.endswith('.trace.json'):
+                METRICS.export_chrome_trace(filename)
+            else:
+                METRICS.export_json(filename)
+            messagebox.showinfo("成功", f"已导出到:\n{filename}")
+        except Exception as e:
+            messagebox.showerror("错误", f"导出失败:\n{str(e)}")
 
 
 def main():
@@ -7,8 +7,152 @@ HTML 标签提取工具 - GUI版本
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
-from bs4 import BeautifulSoup
+from tkinter import font as tkfont
 import os
+import sqlite3
+
+from deerpipe.batch import ImportJob, drain, EVENT_SOURCES, EVENT_FILE, EVENT_ERROR, EVENT_FINISHED
+from deerpipe.backends import extract_pairs
+from deerpipe.importcache import ImportCache
+from deerpipe.library import TagLibrary, split_tag
+from deerpipe.metrics import METRICS
+from deerpipe.tagfile import write_tags, merge_tags
+from deerpipe.tagset import TagSet, MERGE_MAX, MERGE_LATEST, MERGE_SUM
+from deerpipe.tagview import TagView
+
+# 重复标签的计数合并方式（显示名称 -> 策略）
+MERGE_OPTIONS = {
+    '取最大': MERGE_MAX,
+    '取最新': MERGE_LATEST,
+    '求和': MERGE_SUM,
+}
+
+# 可直接导入的文件类型（压缩包不解压到磁盘）
+IMPORT_FILETYPES = [
+    ("HTML 文件与压缩包", "*.html *.htm *.gz *.zip *.tar *.tgz *.tar.bz2 *.tbz2 *.tar.xz *.txz"),
+    ("HTML 文件", "*.html *.htm"),
+    ("所有文件", "*.*"),
+]
+
+# 导入缓存：内容未变的页面不再重新解析
+IMPORT_CACHE_FILE = 'import_cache.sqlite'
+
+# 状态栏展示的性能阶段
+PERF_STAGES = ('import.cache', 'import.read', 'import.parse', 'import.dedupe',
+               'import.render', 'import.dialog')
+PERF_LABELS = {
+    'import.cache': '缓存',
+    'import.read': '读取',
+    'import.parse': '解析',
+    'import.dedupe': '去重',
+    'import.render': '渲染',
+    'import.dialog': '弹窗',
+}
+
+FILTER_DELAY_MS = 200  # 停止输入多久后开始过滤
+
+
+class VirtualTagList(ttk.Frame):
+    """
+    虚拟化的结果列表：每行一个标签，只把可见的几行写入 Text 控件，
+    滚动条位置按行号计算；数据保存在 TagView 中，控件本身不存储结果
+    """
+    
+    def __init__(self, parent, font=("Consolas", 10)):
+        super().__init__(parent)
+        self.view = TagView()
+        self.top = 0
+        self.placeholder = ""
+        self.filter_job = None
+        
+        self.text = tk.Text(self, height=8, font=font, wrap=tk.NONE, state=tk.DISABLED)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.line_height = max(1, tkfont.Font(font=font).metrics('linespace'))
+        
+        self.text.bind('<Configure>', lambda event: self.render())
+        self.text.bind('<MouseWheel>', self.on_wheel)
+        self.text.bind('<Button-4>', lambda event: self.scroll(-3))
+        self.text.bind('<Button-5>', lambda event: self.scroll(3))
+        self.text.bind('<Up>', lambda event: self.scroll(-1))
+        self.text.bind('<Down>', lambda event: self.scroll(1))
+        self.text.bind('<Prior>', lambda event: self.scroll(-self.visible_rows()))
+        self.text.bind('<Next>', lambda event: self.scroll(self.visible_rows()))
+        self.text.bind('<Home>', lambda event: self.scroll(-len(self.view)))
+        self.text.bind('<End>', lambda event: self.scroll(len(self.view)))
+    
+    def set_tags(self, tags, placeholder="", on_progress=None):
+        """替换列表数据（过滤词保留并重新应用，on_progress 与 apply_filter 相同）"""
+        query = self.view.query
+        self.view = TagView(tags)
+        self.placeholder = placeholder
+        self.top = 0
+        self.apply_filter(query, on_progress)
+    
+    def apply_filter(self, query, on_progress=None):
+        """设置过滤词，并通过 after 分块推进，每块之后刷新可见行"""
+        if self.filter_job is not None:
+            self.after_cancel(self.filter_job)
+            self.filter_job = None
+        self.view.set_query(query)
+        self.top = 0
+        self.filter_step(on_progress)
+    
+    def filter_step(self, on_progress):
+        self.filter_job = None
+        done = self.view.step()
+        self.render()
+        if on_progress is not None:
+            on_progress(done)
+        if not done:
+            self.filter_job = self.after(1, self.filter_step, on_progress)
+    
+    def visible_rows(self):
+        return max(1, self.text.winfo_height() // self.line_height)
+    
+    def render(self):
+        """把当前可见的行写入 Text 控件"""
+        total = len(self.view)
+        rows = self.visible_rows()
+        self.top = max(0, min(self.top, total - rows))
+        if total:
+            content = "\n".join(self.view.rows(self.top, self.top + rows))
+        elif self.view.done:
+            content = self.placeholder
+        else:
+            content = ""
+        
+        self.text.config(state=tk.NORMAL)
+        self.text.delete(1.0, tk.END)
+        self.text.insert(tk.END, content)
+        self.text.config(state=tk.DISABLED)
+        
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+    
+    def scroll(self, delta):
+        self.top += delta
+        self.render()
+        return "break"
+    
+    def yview(self, *args):
+        """滚动条回调：moveto 比例 / scroll n units|pages"""
+        if not args:
+            return
+        if args[0] == 'moveto':
+            self.top = int(float(args[1]) * len(self.view))
+            self.render()
+        elif args[0] == 'scroll':
+            amount = int(args[1])
+            if args[2] == 'pages':
+                amount *= self.visible_rows()
+            self.scroll(amount)
+    
+    def on_wheel(self, event):
+        return self.scroll(-3 if event.delta > 0 else 3)
 
 
 class HTMLTagExtractorGUI:
@@ -20,6 +164,12 @@ class HTMLTagExtractorGUI:
         
         self.html_files = []
         self.extracted_tags = []
+        self.import_job = None
+        self.import_results = []
+        self.import_errors = []
+        self.import_done = 0
+        self.import_cache = None
+        self.filter_delay_job = None
         
         self.create_widgets()
     
@@ -57,6 +207,16 @@ class HTMLTagExtractorGUI:
         self.separator_entry.insert(0, ", ")
         self.separator_entry.grid(row=1, column=1, sticky=tk.W, padx=5, pady=5)
         
+        ttk.Label(config_frame, text="重复计数:").grid(row=2, column=0, sticky=tk.W, padx=5, pady=5)
+        self.merge_combobox = ttk.Combobox(config_frame, width=8, state="readonly")
+        self.merge_combobox['values'] = tuple(MERGE_OPTIONS)
+        self.merge_combobox.set('取最大')
+        self.merge_combobox.grid(row=2, column=1, sticky=tk.W, padx=5, pady=5)
+        
+        self.merge_existing_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(config_frame, text="保存时合并到已有文件（同名标签更新计数）",
+                        variable=self.merge_existing_var).grid(row=3, column=0, columnspan=2, sticky=tk.W, padx=5, pady=5)
+        
         # 结果框架
         result_frame = ttk.LabelFrame(self.root, text="📊 提取结果", padding=10)
         result_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
@@ -68,9 +228,22 @@ class HTMLTagExtractorGUI:
         ttk.Button(btn_frame, text="💾 保存为 tags.txt", command=self.save_to_file, width=20).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="📋 复制结果", command=self.copy_result, width=15).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="🗑️ 清空结果", command=self.clear_result, width=15).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="📈 导出性能数据", command=self.export_metrics, width=15).pack(side=tk.LEFT, padx=5)
         
-        self.result_text = scrolledtext.ScrolledText(result_frame, height=8, font=("Consolas", 10), wrap=tk.WORD)
-        self.result_text.pack(fill=tk.BOTH, expand=True)
+        # 过滤框
+        filter_frame = ttk.Frame(result_frame)
+        filter_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        ttk.Label(filter_frame, text="🔍 过滤:").pack(side=tk.LEFT, padx=5)
+        self.filter_var = tk.StringVar()
+        self.filter_var.trace_add('write', self.on_filter_changed)
+        ttk.Entry(filter_frame, textvariable=self.filter_var, width=30).pack(side=tk.LEFT, padx=5)
+        self.filter_count_label = ttk.Label(filter_frame, text="", foreground="gray")
+        self.filter_count_label.pack(side=tk.LEFT, padx=5)
+        
+        # 结果列表（只渲染可见行，复制 / 保存直接使用 self.extracted_tags）
+        self.result_list = VirtualTagList(result_frame)
+        self.result_list.pack(fill=tk.BOTH, expand=True)
         
         # 状态栏
         status_frame = ttk.Frame(self.root)
@@ -90,6 +263,7 @@ class HTMLTagExtractorGUI:
         
         ttk.Button(file_frame, text="📁 选择单个文件", command=self.select_single_file, width=20).pack(side=tk.LEFT, padx=5)
         ttk.Button(file_frame, text="📂 选择多个文件", command=self.select_multiple_files, width=20).pack(side=tk.LEFT, padx=5)
+        ttk.Button(file_frame, text="🗂️ 选择文件夹", command=self.select_folder, width=15).pack(side=tk.LEFT, padx=5)
         ttk.Button(file_frame, text="🗑️ 清空列表", command=self.clear_files, width=15).pack(side=tk.LEFT, padx=5)
         
         # 文件列表框架
@@ -107,7 +281,13 @@ class HTMLTagExtractorGUI:
         action_frame = ttk.Frame(parent, padding=10)
         action_frame.pack(fill=tk.X)
         
-        ttk.Button(action_frame, text="🚀 从文件提取标签", command=self.extract_from_files, width=30).pack()
+        self.extract_files_btn = ttk.Button(action_frame, text="🚀 从文件提取标签", command=self.extract_from_files, width=30)
+        self.extract_files_btn.pack(side=tk.LEFT, padx=5)
+        self.cancel_btn = ttk.Button(action_frame, text="⏹ 取消", command=self.cancel_import, width=10, state=tk.DISABLED)
+        self.cancel_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.progress_bar = ttk.Progressbar(action_frame, mode='determinate')
+        self.progress_bar.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
     
     def create_text_tab(self, parent):
         """创建HTML代码输入标签页"""
@@ -176,8 +356,8 @@ class HTMLTagExtractorGUI:
     def select_single_file(self):
         """选择单个文件"""
         filename = filedialog.askopenfilename(
-            title="选择 HTML 文件",
-            filetypes=[("HTML 文件", "*.html *.htm"), ("所有文件", "*.*")]
+            title="选择 HTML 文件或压缩包",
+            filetypes=IMPORT_FILETYPES
         )
         if filename:
             self.html_files.append(filename)
@@ -186,13 +366,20 @@ class HTMLTagExtractorGUI:
     def select_multiple_files(self):
         """选择多个文件"""
         filenames = filedialog.askopenfilenames(
-            title="选择多个 HTML 文件",
-            filetypes=[("HTML 文件", "*.html *.htm"), ("所有文件", "*.*")]
+            title="选择多个 HTML 文件或压缩包",
+            filetypes=IMPORT_FILETYPES
         )
         if filenames:
             self.html_files.extend(filenames)
             self.update_file_list()
     
+    def select_folder(self):
+        """选择文件夹（提取时递归导入其中的 HTML 文件与压缩包）"""
+        folder = filedialog.askdirectory(title="选择包含 HTML 文件的文件夹")
+        if folder:
+            self.html_files.append(folder)
+            self.update_file_list()
+    
     def clear_files(self):
         """清空文件列表"""
         self.html_files = []
@@ -204,9 +391,11 @@ class HTMLTagExtractorGUI:
         self.file_listbox.delete(0, tk.END)
         for filepath in self.html_files:
             filename = os.path.basename(filepath)
+            if os.path.isdir(filepath):
+                filename = f"📁 {filename}{os.sep}"
             self.file_listbox.insert(tk.END, filename)
         
-        self.status_label.config(text=f"已选择 {len(self.html_files)} 个文件", foreground="blue")
+        self.status_label.config(text=f"已选择 {len(self.html_files)} 项", foreground="blue")
     
     def clear_html_input(self):
         """清空HTML输入框"""
@@ -214,37 +403,108 @@ class HTMLTagExtractorGUI:
         self.html_input.config(foreground="black")
     
     def extract_from_files(self):
-        """从文件提取标签"""
+        """从文件提取标签（进程池并行解析，不阻塞界面）"""
         if not self.html_files:
-            messagebox.showwarning("警告", "请先选择 HTML 文件！")
+            messagebox.showwarning("警告", "请先选择 HTML 文件、文件夹或压缩包！")
+            return
+        if self.import_job is not None:
             return
         
-        all_tags = []
-        separator = self.separator_entry.get()
+        # 目录与压缩包在后台展开，收到 EVENT_SOURCES 后才知道实际的文件数
+        self.import_results = []
+        self.import_errors = []
+        self.import_done = 0
+        self.import_timings = {'cache': 0.0, 'read': 0.0, 'parse': 0.0}
+        self.import_cached = 0
         
-        self.status_label.config(text="正在从文件提取标签...", foreground="orange")
-        self.root.update()
+        self.progress_bar.config(maximum=1, value=0)
+        self.extract_files_btn.config(state=tk.DISABLED)
+        self.cancel_btn.config(state=tk.NORMAL)
+        self.status_label.config(text="正在扫描文件...", foreground="orange")
         
-        try:
-            for filepath in self.html_files:
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        html_content = f.read()
-                    
-                    tags = self.extract_tags_from_html(html_content)
-                    all_tags.extend(tags)
-                
-                except Exception as e:
-                    messagebox.showerror("错误", f"处理文件 {os.path.basename(filepath)} 时出错:\n{str(e)}")
-            
-            # 去重
-            all_tags = list(dict.fromkeys(all_tags))
+        self.import_job = ImportJob(self.html_files, cache=self.get_import_cache()).start()
+        self.root.after(50, self.poll_import)
+    
+    def get_import_cache(self):
+        """打开导入缓存（只在第一次提取时打开）；无法打开时不使用缓存"""
+        if self.import_cache is None:
+            try:
+                self.import_cache = ImportCache(IMPORT_CACHE_FILE)
+            except (OSError, sqlite3.Error):
+                return None
+        return self.import_cache
+    
+    def poll_import(self):
+        """轮询后台任务的事件队列"""
+        job = self.import_job
+        if job is None:
+            return
+        
+        for event in drain(job.events):
+            kind = event[0]
+            if kind == EVENT_SOURCES:
+                self.import_results = [None] * len(event[1])
+                self.progress_bar.config(maximum=max(len(event[1]), 1))
+            elif kind == EVENT_FILE:
+                _, index, path, pairs, timings = event
+                self.import_results[index] = pairs
+                for stage, seconds in timings.items():
+                    self.import_timings[stage] += seconds
+                if 'cache' in timings:
+                    self.import_cached += 1
+                METRICS.incr('import.files')
+            elif kind == EVENT_ERROR:
+                _, index, path, message = event
+                self.import_errors.append(f"{os.path.basename(path)}: {message}")
+            elif kind == EVENT_FINISHED:
+                self.finish_import(cancelled=event[1])
+                return
             
-            self.display_results(all_tags, separator)
+            if kind in (EVENT_FILE, EVENT_ERROR):
+                self.import_done += 1
+                self.progress_bar.config(value=self.import_done)
+                self.status_label.config(
+                    text=f"正在从文件提取标签... {self.import_done}/{len(self.import_results)}"
+                         f"（缓存命中 {self.import_cached}）  {os.path.basename(path)}",
+                    foreground="orange")
+        
+        self.root.after(50, self.poll_import)
+    
+    def cancel_import(self):
+        """取消正在进行的文件提取"""
+        if self.import_job is not None:
+            self.import_job.cancel()
+            self.status_label.config(text="正在取消...", foreground="orange")
+    
+    def finish_import(self, cancelled):
+        """后台任务结束：按文件顺序合并结果"""
+        self.import_job = None
+        self.extract_files_btn.config(state=tk.NORMAL)
+        self.cancel_btn.config(state=tk.DISABLED)
+        
+        if cancelled:
+            self.progress_bar.config(value=0)
+            self.status_label.config(text="已取消提取", foreground="gray")
+            return
         
-        except Exception as e:
-            self.status_label.config(text=f"❌ 提取失败", foreground="red")
-            messagebox.showerror("错误", f"提取过程出错:\n{str(e)}")
+        # 读取 / 解析耗时为各工作进程的累计值
+        METRICS.record('import.cache', self.import_timings['cache'])
+        METRICS.incr('import.cache_hits', self.import_cached)
+        METRICS.record('import.read', self.import_timings['read'])
+        METRICS.record('import.parse', self.import_timings['parse'])
+        
+        # 按文件列表顺序合并，结果与逐个解析一致
+        with METRICS.timer('import.dedupe'):
+            tagset = TagSet(policy=self.get_merge_policy())
+            for pairs in self.import_results:
+                if pairs:
+                    tagset.update(pairs)
+        self.import_results = []
+        
+        if self.import_errors:
+            messagebox.showerror("错误", f"{len(self.import_errors)} 个文件处理失败:\n" + "\n".join(self.import_errors[:20]))
+        
+        self.display_results(tagset.tags())
     
     def extract_from_text(self):
         """从文本框提取标签"""
@@ -254,68 +514,95 @@ class HTMLTagExtractorGUI:
             messagebox.showwarning("警告", "请先粘贴 HTML 代码！")
             return
         
-        separator = self.separator_entry.get()
-        
         self.status_label.config(text="正在从代码提取标签...", foreground="orange")
         self.root.update()
         
         try:
-            all_tags = self.extract_tags_from_html(html_content)
-            self.display_results(all_tags, separator)
+            # 粘贴的代码已在内存中，解析与去重在同一次遍历中完成
+            with METRICS.profiled('extract_from_text'), METRICS.timer('import.parse'):
+                tagset = self.extract_tags_from_html(html_content)
+            self.display_results(tagset.tags())
         
         except Exception as e:
             self.status_label.config(text=f"❌ 提取失败", foreground="red")
             messagebox.showerror("错误", f"提取过程出错:\n{str(e)}")
     
-    def extract_tags_from_html(self, html_content):
-        """从HTML内容中提取标签（包含计数）"""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # 查找所有包含 <span class="name"> 的 <a> 标签
-        a_tags = soup.find_all('a', href=True)
-        
-        tags = []
-        for a_tag in a_tags:
-            # 在 <a> 标签内查找 name 和 count
-            name_span = a_tag.find('span', class_='name')
-            count_span = a_tag.find('span', class_='count')
-            
-            if name_span:
-                tag_text = name_span.get_text().strip()
-                
-                # 如果有计数，添加括号标注
-                if count_span:
-                    count_text = count_span.get_text().strip()
-                    full_tag = f"{tag_text} ({count_text})"
-                else:
-                    full_tag = tag_text
-                
-                # 去重（基于完整文本）
-                if full_tag and full_tag not in tags:
-                    tags.append(full_tag)
-        
-        return tags
+    def get_merge_policy(self):
+        """当前选择的重复计数合并策略"""
+        return MERGE_OPTIONS.get(self.merge_combobox.get(), MERGE_MAX)
+    
+    def extract_tags_from_html(self, html_content, tagset=None):
+        """从HTML内容中提取标签（包含计数），合并进 tagset 并返回
+        html_content 可以是字符串、文件对象或文本块迭代器
+        """
+        if tagset is None:
+            tagset = TagSet(policy=self.get_merge_policy())
+        tagset.update(extract_pairs(html_content))
+        return tagset
     
-    def display_results(self, tags, separator):
-        """显示提取结果"""
+    def display_results(self, tags):
+        """显示提取结果（分隔符只在复制 / 保存时使用）"""
         if tags:
-            result = separator.join(tags)
-            
-            self.result_text.delete(1.0, tk.END)
-            self.result_text.insert(tk.END, result)
-            
             self.extracted_tags = tags
+            with METRICS.timer('import.render'):
+                self.result_list.set_tags(tags, on_progress=self.update_filter_count)
+                self.root.update_idletasks()
+
+            METRICS.incr('import.tags', len(tags))
             
-            self.status_label.config(text=f"✓ 提取完成！共 {len(tags)} 个唯一标签", foreground="green")
+            perf = METRICS.summary(PERF_STAGES, PERF_LABELS)
+            self.status_label.config(text=f"✓ 提取完成！共 {len(tags)} 个唯一标签  |  {perf}", foreground="green")
             self.count_label.config(text=f"📊 {len(tags)} 个标签")
             
-            messagebox.showinfo("成功", f"成功提取 {len(tags)} 个唯一标签！")
+            with METRICS.timer('import.dialog'):
+                messagebox.showinfo("成功", f"成功提取 {len(tags)} 个唯一标签！")
         else:
-            self.result_text.delete(1.0, tk.END)
-            self.result_text.insert(tk.END, "未找到任何 <span class=\"name\"> 标签（需在 <a> 标签内）")
+            self.extracted_tags = []
+            self.result_list.set_tags([], "未找到任何 <span class=\"name\"> 标签（需在 <a> 标签内）",
+                                      self.update_filter_count)
             self.status_label.config(text="⚠ 未找到任何标签", foreground="orange")
             messagebox.showwarning("警告", "未找到任何 <span class=\"name\"> 标签！")
     
+    def on_filter_changed(self, *args):
+        """过滤框内容变化：停止输入一段时间后再开始过滤"""
+        if self.filter_delay_job is not None:
+            self.root.after_cancel(self.filter_delay_job)
+        self.filter_delay_job = self.root.after(FILTER_DELAY_MS, self.apply_filter)
+    
+    def apply_filter(self):
+        self.filter_delay_job = None
+        self.result_list.apply_filter(self.filter_var.get(), self.update_filter_count)
+    
+    def update_filter_count(self, done):
+        """更新过滤结果计数"""
+        view = self.result_list.view
+        if not view.query:
+            text = f"共 {len(view)} 个" if len(view) else ""
+        elif done:
+            text = f"匹配 {len(view)} / {len(view.tags)} 个"
+        else:
+            text = f"匹配 {len(view)} 个（过滤中...）"
+        self.filter_count_label.config(text=text)
+    
+    def export_metrics(self):
+        """导出性能数据（*.trace.json 为 Chrome trace 格式，其余为指标快照）"""
+        filename = filedialog.asksaveasfilename(
+            title="导出性能数据",
+            defaultextension=".json",
+            filetypes=[("Chrome trace", "*.trace.json"), ("JSON", "*.json")],
+            initialfile="importer.trace.json"
+        )
+        if not filename:
+            return
+        try:
+            if filename.endswith('.trace.json'):
+                METRICS.export_chrome_trace(filename)
+            else:
+                METRICS.export_json(filename)
+            messagebox.showinfo("成功", f"已导出到:\n{filename}")
+        except Exception as e:
+            messagebox.showerror("错误", f"导出失败:\n{str(e)}")
+    
     def save_to_file(self):
         """保存为文件"""
         if not self.extracted_tags:
@@ -332,34 +619,44 @@ class HTMLTagExtractorGUI:
         if filename:
             try:
                 separator = self.separator_entry.get()
-                content = separator.join(self.extracted_tags)
                 
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(content)
+                # 先写入临时文件再原子替换，生成器不会读到写了一半的文件
+                if self.merge_existing_var.get() and os.path.exists(filename):
+                    pairs = map(split_tag, self.extracted_tags)
+                    updated, added, total = merge_tags(filename, pairs, separator, self.get_merge_policy())
+                    message = f"已合并到:\n{filename}\n更新 {updated} 个，新增 {added} 个，共 {total} 个标签"
+                else:
+                    write_tags(filename, self.extracted_tags, separator)
+                    message = f"已保存到:\n{filename}"
+                
+                # 预先编译标签库缓存，生成器启动时无需重新解析
+                TagLibrary.load(filename)
                 
-                messagebox.showinfo("成功", f"已保存到:\n{filename}")
+                messagebox.showinfo("成功", message)
             except Exception as e:
                 messagebox.showerror("错误", f"保存失败:\n{str(e)}")
     
     def copy_result(self):
-        """复制结果到剪贴板"""
-        result = self.result_text.get(1.0, tk.END).strip()
-        if result and not result.startswith('未找到'):
+        """复制结果到剪贴板（直接从提取结果拼接，不读取控件文本）"""
+        if self.extracted_tags:
             self.root.clipboard_clear()
-            self.root.clipboard_append(result)
+            self.root.clipboard_append(self.separator_entry.get().join(self.extracted_tags))
             messagebox.showinfo("成功", "结果已复制到剪贴板！")
         else:
             messagebox.showwarning("警告", "没有可复制的内容！")
     
     def clear_result(self):
         """清空结果"""
-        self.result_text.delete(1.0, tk.END)
         self.extracted_tags = []
+        self.result_list.set_tags([], on_progress=self.update_filter_count)
         self.status_label.config(text="结果已清空", foreground="gray")
         self.count_label.config(text="")
 
 
 def main():
+    import multiprocessing
+    
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = HTMLTagExtractorGUI(root)
     root.mainloop()
@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+"""测试从仓库根目录导入 deerpipe（与 benchmarks 相同）"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+解析后端的对照测试
+对照语料覆盖各种边界写法（实体、空白、缺少计数、嵌套 <a>、注释、script、大小写、属性中的 >……），
+每个可用后端的结果必须与 stream（参照实现）完全一致；
+scan 不认识的写法必须返回 None（auto 回退到 stream），而不是给出不同的结果。
+benchmarks/bench_backends.py 复用这里的语料
+"""
+
+from deerpipe.backends import (available_backends, extract_pairs, parse_tags, scan_tags,
+                               BACKEND_AUTO, BACKEND_SCAN, BACKEND_STREAM)
+
+
+def tag_page(tags):
+    rows = [f'<a href="/tag/tag-{i}/" class="tag tag-{i} "><span class="name">{name}</span>'
+            f'<span class="count">{count}</span></a>\n' for i, (name, count) in enumerate(tags)]
+    return '<html><body><div class="container" id="tag-container">\n' + ''.join(rows) + '</div></body></html>\n'
+
+
+CORPUS = {
+    'empty': '',
+    'plain': tag_page([('big breasts', '203K'), ('glasses', '1.2M')]),
+    'unicode': tag_page([('中文 日本語', '12K'), ('café', '3')]),
+    'entities': '<a href="/t"><span class="name">tom &amp; jerry&#39;s</span><span class="count">1&nbsp;K</span></a>',
+    'entity_no_semicolon': '<a href="/t"><span class="name">a &amp b &copy</span></a>',
+    'whitespace': '<a href="/t">\n  <span class="name">  spaced  </span>\n  <span class="count"> 5 </span>\n</a>',
+    'no_count': '<a href="/t"><span class="name">solo</span></a>',
+    'empty_name': '<a href="/t"><span class="name"></span><span class="count">1</span></a>',
+    'no_href': '<a><span class="name">skip</span></a><a href="/t"><span class="name">keep</span></a>',
+    'bare_href': '<a href><span class="name">bare</span></a>',
+    'data_href': '<a data-href="/x"><span class="name">skip</span></a>',
+    'empty_href': '<a href=""><span class="name">empty href</span></a>',
+    'uppercase': '<A HREF="/t"><SPAN CLASS="name">upper</SPAN></A>',
+    'single_quotes': "<a href='/t'><span class='name'>quoted</span></a>",
+    'extra_class': '<a href="/t"><span class="name big">multi class</span></a>',
+    'class_substring': '<a href="/t"><span class="tag-name">not a name</span><span class="name">real</span></a>',
+    'nested_markup': '<a href="/t"><span class="name">a <b>bold</b> name</span></a>',
+    'nested_anchor': '<a href="/o"><a href="/i"><span class="name">inner</span></a></a>',
+    'unclosed_anchor': '<a href="/o">x <a href="/i"><span class="name">inner</span></a>',
+    'count_first': '<a href="/t"><span class="count">9</span><span class="name">reversed</span></a>',
+    'two_names': '<a href="/t"><span class="name">first</span><span class="name">second</span></a>',
+    'gt_in_attr': '<a href="/t" title="a>b"><span class="name">gt</span></a>',
+    'gt_in_span_attr': '<a href="/t"><span title="x>y" class="name">gt span</span></a>',
+    'comment': '<!-- <a href="/c"><span class="name">commented</span></a> -->'
+               '<a href="/t"><span class="name">live</span></a>',
+    'unclosed_comment': '<a href="/t"><span class="name">live</span></a><!-- <a href="/c">',
+    'script': '<script>var s = \'<a href="/s"><span class="name">js</span></a>\';</script>'
+              '<a href="/t"><span class="name">live</span></a>',
+    'style': '<style>.name { color: red }</style><a href="/t"><span class="name">styled</span></a>',
+    'text_mentions_name': '<p><span>your name</span></p><a href="/t"><span class="name">x</span></a>',
+    'span_outside_anchor': '<span class="name">orphan</span><a href="/t"><span class="name">x</span></a>',
+    'less_than_text': '<a href="/t"><span class="name">a < b</span></a>',
+    'whitespace_nodes': '<a href="/t"><span class="name">a<b>x</b>  \t<b>y</b>\n  <i>z</i></span></a>',
+    'pre_whitespace': '<a href="/t"><span class="name">a<pre><b>x</b>  <b>y</b></pre></span></a>',
+    'stray_span_close': '<span><a href="/t"><span class="name">x</span></span><span class="count">3</span></a>',
+    'void_end_tag': '<a href="/t"><span class="name">a<br>b</br>c</span></a>',
+    'nav_links': '<a href="/">Home</a><a href="/t"><span class="name">after nav</span></a><a href="#">x</a>',
+}
+
+
+def check_corpus(backends):
+    """返回 [(用例, 后端, 说明)]；scan 返回 None 视为正确的回退"""
+    failures = []
+    for case, html in CORPUS.items():
+        expected = parse_tags(html, BACKEND_STREAM)
+        for backend in backends:
+            if backend == BACKEND_SCAN:
+                got = scan_tags(html)
+                if got is not None and got != expected:
+                    failures.append((case, backend, f"{got!r} != {expected!r}"))
+                continue
+            try:
+                got = parse_tags(html, backend)
+            except Exception as e:
+                failures.append((case, backend, f"异常 {e!r}"))
+                continue
+            if got != expected:
+                failures.append((case, backend, f"{got!r} != {expected!r}"))
+    return failures
+
+
+def test_corpus_matches_stream_on_every_backend():
+    failures = check_corpus(available_backends() + [BACKEND_AUTO])
+    assert not failures, '\n'.join(f"[{backend}] {case}: {detail}" for case, backend, detail in failures)
+
+
+def test_scan_handles_the_standard_layout():
+    # 快速路径必须真正用于标准布局，否则 auto 退化为 stream
+    for case in ('empty', 'plain', 'unicode', 'entities', 'whitespace', 'no_count', 'bare_href'):
+        assert scan_tags(CORPUS[case]) is not None, case
+
+
+def test_extract_pairs_chunking_and_streaming_fallback():
+    html = tag_page([(f"tag {i} &amp; 中文", f"{i}K") for i in range(200)])
+    expected = parse_tags(html, BACKEND_STREAM)
+    for backend in available_backends() + [BACKEND_AUTO]:
+        if backend != BACKEND_SCAN:
+            assert extract_pairs(html, backend) == expected, backend
+    data = html.encode('utf-8')
+    # 二进制小块（跨越多字节字符），以及超过 limit 后改为流式解析
+    assert extract_pairs(iter([data[i:i + 7] for i in range(0, len(data), 7)])) == expected
+    assert extract_pairs(html, BACKEND_AUTO, chunk_size=100, limit=1000) == expected
+
+
+def test_unknown_backend_and_scan_mismatch_raise_value_error():
+    for backend, html in (('nope', ''), (BACKEND_SCAN, CORPUS['nested_anchor'])):
+        try:
+            parse_tags(html, backend)
+        except ValueError:
+            continue
+        raise AssertionError(backend)
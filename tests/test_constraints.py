@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""互斥组约束：重叠的组、容量计算"""
+
+import itertools
+import random
+
+import pytest
+
+from deerpipe.constraints import ConstrainedSampler, TagConstraints, max_packing
+from deerpipe.library import TagLibrary
+from deerpipe.sampling import SAMPLE_MODES
+from deerpipe.shards import Shard, ShardedLibrary, ShardedSampler
+
+OVERLAPPING = [['a', 'b'], ['b', 'c']]
+
+
+def make_library(extra=50):
+    return TagLibrary.from_tags(['a (1)', 'b (2)', 'c (3)'] + [f"t{i} ({i + 5})" for i in range(extra)])
+
+
+def violates(names, groups):
+    return any(len(names & set(group)) > 1 for group in groups)
+
+
+@pytest.mark.parametrize('mode', SAMPLE_MODES)
+def test_overlapping_groups_never_violated(mode):
+    library = make_library()
+    sampler = ConstrainedSampler(library, TagConstraints(groups=OVERLAPPING), mode, seed=1)
+    for _ in range(2000):
+        names = {library.name(i) for i in sampler.sample(2)}
+        assert not violates(names, OVERLAPPING)
+
+
+@pytest.mark.parametrize('mode', SAMPLE_MODES)
+def test_overlapping_groups_capacity(mode):
+    library = make_library(extra=0)
+    sampler = ConstrainedSampler(library, TagConstraints(groups=OVERLAPPING), mode, seed=1)
+    # a 与 c 可以同时出现，b 与两者都冲突
+    assert sampler.capacity == 2
+    for _ in range(200):
+        names = {library.name(i) for i in sampler.sample(3)}
+        assert names in ({'a', 'c'}, {'b'})
+
+
+def test_required_tag_blocks_every_group_it_is_in():
+    library = make_library()
+    constraints = TagConstraints(require=['b'], groups=OVERLAPPING)
+    sampler = ConstrainedSampler(library, constraints, seed=1)
+    for _ in range(500):
+        names = [library.name(i) for i in sampler.sample(3)]
+        assert names[0] == 'b'
+        assert 'a' not in names and 'c' not in names
+
+
+def brute_packing(items):
+    items = list(set(items))
+    for size in range(len(items), 0, -1):
+        for chosen in itertools.combinations(items, size):
+            if all(not x & y for x, y in itertools.combinations(chosen, 2)):
+                return size
+    return 0
+
+
+def test_max_packing_matches_brute_force():
+    rng = random.Random(1)
+    for _ in range(300):
+        items = [frozenset(rng.sample(range(6), rng.randint(1, 3))) for _ in range(rng.randint(1, 9))]
+        assert max_packing(items) == brute_packing(items)
+
+
+def make_sharded():
+    tags = Shard('tag', 'tags.txt', 0, TagLibrary.from_tags(['a (1)', 'x (2)'] + [f"t{i} (3)" for i in range(20)]))
+    artists = Shard('artist', 'artists.txt', 2, TagLibrary.from_tags(['a (4)', 'y (5)', 'z (6)']))
+    return ShardedLibrary([tags, artists])
+
+
+@pytest.mark.parametrize('mode', SAMPLE_MODES)
+def test_sharded_required_tag_appears_once(mode):
+    library = make_sharded()
+    sampler = ShardedSampler.for_library(library, mode, seed=1, constraints=TagConstraints(require=['a']))
+    for _ in range(500):
+        indices = sampler.sample(3)
+        names = [library.name(i) for i in indices]
+        assert names.count('a') == 1
+        # 必选标签计入所在分片的配额
+        assert len(indices) == 3 + 2
+
+
+@pytest.mark.parametrize('mode', SAMPLE_MODES)
+def test_sharded_group_spans_shards(mode):
+    library = make_sharded()
+    constraints = TagConstraints(groups=[['x', 'y']])
+    sampler = ShardedSampler.for_library(library, mode, seed=1, constraints=constraints)
+    for _ in range(2000):
+        names = {library.name(i) for i in sampler.sample(5)}
+        assert not {'x', 'y'} <= names
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""标签库缓存：截断或损坏的 .tagcache 按标签文件重新构建"""
+
+import os
+import struct
+
+import pytest
+
+from deerpipe.library import CACHE_SUFFIX, TagLibrary, _HEADER
+
+TAGS = ['big breasts (120)', 'glasses (45)', 'x-ray (3)', '中文 (7)']
+
+
+@pytest.fixture
+def tags_file(tmp_path):
+    path = tmp_path / 'tags.txt'
+    path.write_text('\n'.join(TAGS) + '\n', encoding='utf-8')
+    library = TagLibrary.load(str(path))
+    assert os.path.exists(str(path) + CACHE_SUFFIX)
+    return str(path), [library.display(i) for i in range(len(library))]
+
+
+def reload(path):
+    library = TagLibrary.load(path)
+    return [library.display(i) for i in range(len(library))]
+
+
+@pytest.mark.parametrize('cut', [_HEADER.size, _HEADER.size + 5, _HEADER.size + 17, -1])
+def test_truncated_cache_is_rebuilt(tags_file, cut):
+    path, expected = tags_file
+    cache = path + CACHE_SUFFIX
+    with open(cache, 'rb') as f:
+        data = f.read()
+    with open(cache, 'wb') as f:
+        f.write(data[:cut])
+    assert reload(path) == expected
+
+
+def test_bad_header_lengths_are_rebuilt(tags_file):
+    path, expected = tags_file
+    cache = path + CACHE_SUFFIX
+    with open(cache, 'rb') as f:
+        data = bytearray(f.read())
+    fields = list(_HEADER.unpack_from(data))
+    fields[4] += 1          # 标签数与数组长度不符
+    _HEADER.pack_into(data, 0, *fields)
+    with open(cache, 'wb') as f:
+        f.write(data)
+    assert reload(path) == expected
+
+
+def test_bad_offsets_are_rebuilt(tags_file):
+    path, expected = tags_file
+    cache = path + CACHE_SUFFIX
+    with open(cache, 'rb') as f:
+        data = bytearray(f.read())
+    n, text_len = _HEADER.unpack_from(data)[4:6]
+    struct.pack_into('<I', data, _HEADER.size + 4 * n, text_len - 1)   # offsets 的最后一项
+    with open(cache, 'wb') as f:
+        f.write(data)
+    assert reload(path) == expected
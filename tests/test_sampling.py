@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+"""采样引擎：抽样不改变 Fenwick 树"""
+
+import random
+
+import pytest
+
+from deerpipe.library import TagLibrary
+from deerpipe.sampling import SAMPLE_MODES, TagSampler
+
+
+@pytest.mark.parametrize('mode', SAMPLE_MODES)
+def test_tree_bit_identical_after_batch(mode):
+    rng = random.Random(3)
+    library = TagLibrary.from_tags([f"t{i} ({rng.randint(1, 100000)})" for i in range(5000)])
+    sampler = TagSampler.for_library(library, mode, alpha=0.37, seed=1)
+    table = sampler.tree.tree.tobytes()
+    for _ in range(20000):
+        sampler.sample(5)
+        sampler.sample(3, accept=lambda index: index % 3 != 0)
+    assert sampler.tree.tree.tobytes() == table
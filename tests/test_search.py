@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""标签搜索：拼写容错的召回与排序"""
+
+import random
+
+from deerpipe.library import TagLibrary
+from deerpipe.search import TagIndex
+
+WORDS = ['glasses', 'stockings', 'breasts', 'school', 'uniform', 'catgirl', 'maid']
+
+
+def make_index(noise=3000):
+    rng = random.Random(7)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    tags = [f"{word} ({i + 1})" for i, word in enumerate(WORDS)]
+    tags += ['school uniform (50)', 'catgirl maid (40)', 'big breasts (30)']
+    # 与常用词共有少量罕见三元组的噪声标签（如 laserhmgneqgz）
+    for i in range(noise):
+        word = rng.choice(WORDS)
+        start = rng.randrange(len(word) - 2)
+        junk = ''.join(rng.choice(letters) for _ in range(rng.randint(4, 10)))
+        tags.append(f"{word[start:start + 3]}{junk} ({rng.randint(1, 1000)})")
+    return TagIndex(TagLibrary.from_tags(tags))
+
+
+def names(index, query):
+    return [index.keys[i] for i in index.search(query)]
+
+
+def test_typo_ranks_intended_tag_first():
+    index = make_index()
+    for typo, word in [('glases', 'glasses'), ('stockngs', 'stockings'), ('brests', 'breasts'),
+                       ('unifrom', 'uniform')]:
+        found = names(index, typo)
+        assert found and word in found[0].split(), (typo, found[:3])
+
+
+def test_typo_results_contain_every_word():
+    index = make_index()
+    found = names(index, 'catgrl maid')
+    assert found[0] == 'catgirl maid'
+    assert all({'catgirl', 'maid'} <= set(name.split()) for name in found)
+    # 词序不同也能召回
+    assert names(index, 'uniform school') == ['school uniform']
+
+
+def test_unknown_word_returns_nothing():
+    assert names(make_index(), 'qqqqq') == []